@@ -0,0 +1,150 @@
+"""
+Check that the system prompt prefix is byte-stable across sessions, and
+measure LLM time to first token with the old and new prompt layouts
+
+- Stability: builds the opening messages for calls spread over a week
+  (every meal period, every minute of the day) and checks that the static
+  instruction is the same bytes in all of them. For comparison it reports
+  how many characters the old layout, with the date and time near the top,
+  shares across the same calls.
+- TTFB (needs GROQ_API_KEY): streams one short reply per run, alternating
+  old and new layouts, each run as a different call time so the old layout
+  never repeats its prefix. Reports time to first token and the cached
+  prompt tokens the provider returns, if it reports them.
+
+Works for T3's prompts too with --bot-dir ../T3
+
+Usage:
+    python bench_prompt_prefix.py [--bot-dir .] [--sessions 500] [--runs 20] [--model llama-3.1-8b-instant]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from statistics import mean, median
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+USER_MESSAGE = "Hi, what pizzas do you have?"
+
+
+def _call_times(sessions: int):
+    """(day, date, time) for calls spread over a week, like bot2.py formats them"""
+    start = datetime(2026, 1, 5, 7, 0)
+    step = timedelta(minutes=7 * 24 * 60 / sessions)
+    for i in range(sessions):
+        t = start + i * step
+        yield t.strftime("%A"), t.strftime("%Y-%m-%d"), t.strftime("%I:%M %p")
+
+
+def legacy_messages(prompts, day: str, date: str, time: str) -> list:
+    """The old layout: one system message with the date and time after the opening paragraph"""
+    head, rest = prompts.STATIC_INSTRUCTION.split("\n\n", 1)
+    content = f"{head}\n\n    {prompts.get_session_context(day, date, time)}\n\n{rest}"
+    return [{"role": "system", "content": content}]
+
+
+def _shared_prefix(texts: list) -> int:
+    """Length of the prefix common to all texts"""
+    return len(os.path.commonprefix(texts))
+
+
+def _serialized(messages: list) -> str:
+    return "".join(f"<{m['role']}>{m['content']}" for m in messages)
+
+
+def check_stability(prompts, sessions: int) -> bool:
+    new, old, digests = [], [], set()
+    for day, date, time_ in _call_times(sessions):
+        messages = prompts.build_prompt_messages(day, date, time_)
+        digests.add(hashlib.sha256(messages[0]["content"].encode()).hexdigest())
+        new.append(_serialized(messages))
+        old.append(_serialized(legacy_messages(prompts, day, date, time_)))
+
+    static_chars = len(prompts.STATIC_INSTRUCTION)
+    print(f"{sessions} calls over a week")
+    print(f"static instruction: {static_chars} chars, {len(digests)} distinct version(s)")
+    print(f"{'layout':<6} | {'prompt chars':>12} | {'shared prefix':>13} | {'cacheable':>9}")
+    print("-" * 50)
+    for name, texts in (("old", old), ("new", new)):
+        shared = _shared_prefix(texts)
+        print(f"{name:<6} | {len(texts[0]):>12} | {shared:>13} | {shared / len(texts[0]):9.1%}")
+    return len(digests) == 1
+
+
+async def _ttfb(client, model: str, messages: list) -> tuple:
+    start = time.perf_counter()
+    first = None
+    cached = None
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages + [{"role": "user", "content": USER_MESSAGE}],
+        stream=True,
+        max_tokens=32,
+        stream_options={"include_usage": True},
+    )
+    async for chunk in stream:
+        if first is None and chunk.choices and chunk.choices[0].delta.content:
+            first = (time.perf_counter() - start) * 1000
+        usage = getattr(chunk, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        if details is not None:
+            cached = getattr(details, "cached_tokens", None)
+    return first, cached
+
+
+async def measure_ttfb(prompts, runs: int, model: str):
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(api_key=os.getenv("GROQ_API_KEY"), base_url=GROQ_BASE_URL)
+    results = {"old": [], "new": []}
+    cached = {"old": [], "new": []}
+    # A different call time per run: the old layout changes its prefix every minute
+    for i, (day, date, time_) in enumerate(_call_times(runs * 2)):
+        layout = "old" if i % 2 == 0 else "new"
+        if layout == "old":
+            messages = legacy_messages(prompts, day, date, time_)
+        else:
+            messages = prompts.build_prompt_messages(day, date, time_)
+        ttfb, cached_tokens = await _ttfb(client, model, messages)
+        if ttfb is not None:
+            results[layout].append(ttfb)
+        if cached_tokens is not None:
+            cached[layout].append(cached_tokens)
+
+    print(f"\n{'layout':<6} | {'runs':>4} | {'p50 ms':>7} | {'mean ms':>7} | {'cached tokens':>13}")
+    print("-" * 50)
+    for layout in ("old", "new"):
+        values = results[layout]
+        cached_mean = f"{mean(cached[layout]):13.0f}" if cached[layout] else f"{'n/a':>13}"
+        print(f"{layout:<6} | {len(values):>4} | {median(values):7.0f} | {mean(values):7.0f} | {cached_mean}")
+    await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt prefix stability and TTFB benchmark")
+    parser.add_argument("--bot-dir", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Directory whose prompts.py is checked")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20, help="TTFB requests per layout")
+    parser.add_argument("--model", default="llama-3.1-8b-instant")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.bot_dir))
+    import prompts
+
+    stable = check_stability(prompts, args.sessions)
+    print("prefix stable across sessions" if stable else "PREFIX CHANGES BETWEEN SESSIONS")
+
+    if os.getenv("GROQ_API_KEY"):
+        asyncio.run(measure_ttfb(prompts, args.runs, args.model))
+    else:
+        print("\nGROQ_API_KEY is not set, skipping the TTFB measurement")
+    if not stable:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
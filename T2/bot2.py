@@ -50,16 +50,29 @@ import pytz
 from datetime import datetime
 
 #import modular components
-from prompts import get_system_instruction, get_greeting_prompt
+from prompts import build_prompt_messages, get_greeting_prompt, get_greeting_text, get_meal_period
 #system prompts for the voice assistant
+from greeting_cache import GreetingCache
+#pre-synthesized greeting audio played as soon as the caller connects
 from audio_handlers import AudioBufferHandlers
 #audio buffer event handlers for recording and analysis
+from context_manager import ContextBudgetManager
+#keeps the prompt under a token budget by summarizing older turns
 # from observers_handlers import LatencyJSONObserver
 from observers_handlers import SessionJSONObserver as LatencyJSONObserver
 #custom observer for storing latency metrics in JSON
 
 load_dotenv()
 
+VOICE_ID = "79a125e8-cd45-4c13-8a67-188112f4dd22"
+
+# Shared by all sessions: each greeting is synthesized once per voice, then
+# served from memory (and from disk after a restart)
+greeting_cache = GreetingCache(
+    api_key=os.getenv("CARTESIA_API_KEY"),
+    cache_dir=os.path.join(os.path.dirname(__file__), "greeting_cache"),
+)
+
 async def bot(runner_args: RunnerArguments):
     transport = SmallWebRTCTransport(
         webrtc_connection=runner_args.webrtc_connection,    #contains webrtc connection details
@@ -80,7 +93,7 @@ async def bot(runner_args: RunnerArguments):
     llm = GroqLLMService(api_key=os.getenv("GROQ_API_KEY"), model="llama-3.1-8b-instant")
     tts = CartesiaTTSService(
         api_key=os.getenv("CARTESIA_API_KEY"),
-        voice_id="79a125e8-cd45-4c13-8a67-188112f4dd22"
+        voice_id=VOICE_ID
     )
 
     # Get current time in Asia/Karachi timezone
@@ -90,11 +103,11 @@ async def bot(runner_args: RunnerArguments):
     date = current_time.strftime("%Y-%m-%d") # YYYY-MM-DD format
     time = current_time.strftime("%I:%M %p") # HH:MM AM/PM format
 
-    system_instruction = get_system_instruction(day, date, time)
-
-    messages = [{"role": "system", "content": system_instruction}]
+    # Static instruction first (same bytes every call, so the provider can cache it), then today's date and time
+    messages = build_prompt_messages(day, date, time)
     context = LLMContext(messages)
     context_aggregator = LLMContextAggregatorPair(context)
+    context_manager = ContextBudgetManager(pinned_messages=len(messages))  # compacts older turns into a summary over the token budget
     
     # Create audio recordings directory with timestamp
     session_timestamp = datetime.now(tz).strftime("%Y%m%d_%H%M%S")
@@ -124,6 +137,7 @@ async def bot(runner_args: RunnerArguments):
         transport.input(),
         stt,
         context_aggregator.user(),  #add user message to context
+        context_manager,            #summarize older turns once the prompt is over budget
         llm,
         tts,
         transport.output(),     #send bot speech back to user
@@ -143,21 +157,30 @@ async def bot(runner_args: RunnerArguments):
         await audiobuffer.start_recording()
         
         # Context-aware greeting based on time of day
-        if current_time.hour < 12:
-            time_context = "It's breakfast time"
-        elif current_time.hour < 17:
-            time_context = "It's lunch time"
+        meal_period = get_meal_period(current_time.hour)
+
+        # Play the cached greeting right away instead of waiting for LLM + TTS
+        try:
+            greeting_audio = await greeting_cache.get(VOICE_ID, meal_period)
+        except Exception as e:
+            print(f"⚠️  Cached greeting unavailable ({e}), generating one instead")
+            greeting_audio = None
+
+        if greeting_audio:
+            # Add what the caller hears to the context so the LLM knows it already greeted
+            messages.append({"role": "assistant", "content": get_greeting_text(meal_period)})
+            await task.queue_frames(greeting_cache.frames(greeting_audio))
         else:
-            time_context = "It's dinner time"
-        
-        greeting_prompt = get_greeting_prompt(time_context)
-        messages.append({"role": "system", "content": greeting_prompt})
-        await task.queue_frames([LLMRunFrame()])
+            greeting_prompt = get_greeting_prompt(f"It's {meal_period} time")
+            messages.append({"role": "system", "content": greeting_prompt})
+            await task.queue_frames([LLMRunFrame()])
 
     @transport.event_handler('on_client_disconnected')
     async def handle_client_disconnected(transport: SmallWebRTCTransport, client):
         # Stop recording and flush any remaining buffered audio
         await audiobuffer.stop_recording()
+        # Per-turn prompt size (estimated tokens before and after compaction)
+        context_manager.save_curve(os.path.join(audio_dir, "context_curve.json"))
         
         print("\n" + "="*80)
         print("👋 CLIENT DISCONNECTED")
@@ -193,5 +216,12 @@ async def bot(runner_args: RunnerArguments):
     await runner.run(task)
 
 if __name__ == "__main__":
+    import asyncio
     from pipecat.runner.run import main
+
+    # Synthesize the greetings before taking calls; on failure they are made on first use
+    try:
+        asyncio.run(greeting_cache.preload(VOICE_ID))
+    except Exception as e:
+        print(f"⚠️  Greeting preload failed: {e}")
     main()
\ No newline at end of file
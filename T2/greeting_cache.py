@@ -0,0 +1,133 @@
+"""
+Pre-synthesized greeting audio, cached per voice and meal period
+"""
+import asyncio
+import hashlib
+import os
+
+import aiohttp
+from loguru import logger
+
+from pipecat.frames.frames import OutputAudioRawFrame, TTSStartedFrame, TTSStoppedFrame
+
+from prompts import GREETING_TEXTS, get_greeting_text
+
+CARTESIA_TTS_URL = "https://api.cartesia.ai/tts/bytes"
+CARTESIA_VERSION = "2025-04-16"
+
+
+class GreetingCache:
+    """
+    Synthesizes each greeting once per voice_id and keeps the raw PCM in
+    memory and on disk, so a caller hears the greeting as soon as they connect
+    instead of waiting for an LLM round trip plus TTS
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        cache_dir: str,
+        model: str = "sonic-3",
+        sample_rate: int = 24000,
+    ):
+        """
+        Initialize the greeting cache
+
+        Args:
+            api_key: Cartesia API key used to synthesize missing greetings
+            cache_dir: Directory where synthesized PCM files are kept across restarts
+            model: Cartesia model, same as the live TTS so the voice matches
+            sample_rate: Sample rate of the stored 16-bit mono PCM
+        """
+        self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.model = model
+        self.sample_rate = sample_rate
+        self._audio = {}
+        self._locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, voice_id: str, meal_period: str) -> str:
+        # The text is part of the key so editing a greeting re-synthesizes it
+        text_hash = hashlib.sha1(get_greeting_text(meal_period).encode()).hexdigest()[:10]
+        filename = f"{voice_id}_{meal_period}_{self.model}_{self.sample_rate}_{text_hash}.pcm"
+        return os.path.join(self.cache_dir, filename)
+
+    async def _synthesize(self, voice_id: str, text: str) -> bytes:
+        payload = {
+            "model_id": self.model,
+            "transcript": text,
+            "voice": {"mode": "id", "id": voice_id},
+            "output_format": {
+                "container": "raw",
+                "encoding": "pcm_s16le",
+                "sample_rate": self.sample_rate,
+            },
+            "language": "en",
+        }
+        headers = {
+            "Cartesia-Version": CARTESIA_VERSION,
+            "X-API-Key": self.api_key,
+            "Content-Type": "application/json",
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.post(CARTESIA_TTS_URL, json=payload, headers=headers) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Cartesia returned {response.status}: {await response.text()}")
+                return await response.read()
+
+    async def get(self, voice_id: str, meal_period: str) -> bytes:
+        """
+        Get greeting PCM, synthesizing it on first use
+
+        Args:
+            voice_id: Cartesia voice the greeting is spoken in
+            meal_period: "breakfast", "lunch" or "dinner"
+
+        Returns:
+            16-bit mono PCM at self.sample_rate
+        """
+        path = self._path(voice_id, meal_period)
+        if path in self._audio:
+            return self._audio[path]
+
+        # Callers connecting at the same time share one synthesis
+        lock = self._locks.setdefault(path, asyncio.Lock())
+        async with lock:
+            if path in self._audio:
+                return self._audio[path]
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    audio = f.read()
+            else:
+                audio = await self._synthesize(voice_id, get_greeting_text(meal_period))
+                with open(path, "wb") as f:
+                    f.write(audio)
+                logger.info(f"Synthesized {meal_period} greeting for voice {voice_id}")
+            self._audio[path] = audio
+            return audio
+
+    async def preload(self, voice_id: str):
+        """
+        Load or synthesize every meal period's greeting for a voice
+
+        Args:
+            voice_id: Cartesia voice to prepare
+        """
+        await asyncio.gather(*(self.get(voice_id, meal) for meal in GREETING_TEXTS))
+
+    def frames(self, audio: bytes) -> list:
+        """
+        Wrap greeting PCM in the frames a TTS service would push
+
+        Args:
+            audio: PCM returned by get()
+
+        Returns:
+            Frames to queue on the pipeline task
+        """
+        return [
+            TTSStartedFrame(),
+            OutputAudioRawFrame(audio=audio, sample_rate=self.sample_rate, num_channels=1),
+            TTSStoppedFrame(),
+        ]
@@ -2,26 +2,14 @@
 System prompts for the Cheezious Restaurant voice assistant
 """
 
-def get_system_instruction(day: str, date: str, time: str) -> str:
-    """
-    Generate the system instruction for Ayesha, the AI voice assistant
-    
-    Args:
-        day: Full weekday name (e.g., "Monday")
-        date: Date in YYYY-MM-DD format
-        time: Time in HH:MM AM/PM format
-    
-    Returns:
-        Complete system instruction string
-    """
-    system_instruction = f"""
+# Identical for every session and every minute, so it stays a cacheable
+# prompt prefix. Anything that changes per call goes in get_session_context().
+STATIC_INSTRUCTION = """
     You are Ayesha, the AI voice assistant for Cheezious Restaurant in Lahore, Pakistan.
 
     If the user asks whether you can hear them, and a user transcription exists, respond clearly and confidently that you can hear them.
     Do not mention text chat or technical limitations.
 
-    Today is {day}, {date}. Current time is {time}.
-
     YOUR PERSONALITY
     - Warm, friendly, and professional
     - Sound like a real human server, not a robot
@@ -53,7 +41,7 @@ def get_system_instruction(day: str, date: str, time: str) -> str:
 
     USE CASE 1: Greeting & Onboarding
     - Warmly greet the customer
-    - Briefly mention it's {time} (breakfast/lunch/dinner time)
+    - Briefly mention the time of day (breakfast/lunch/dinner time)
     - Ask what they'd like to order
 
     USE CASE 2: Menu Browsing
@@ -108,7 +96,40 @@ def get_system_instruction(day: str, date: str, time: str) -> str:
 
     Remember: You're having a conversation, not filling a form. Be human, be helpful, be brief!
     """
-    return system_instruction
+
+
+def get_session_context(day: str, date: str, time: str) -> str:
+    """
+    Generate the per-call part of the system prompt, sent after the static instruction
+    
+    Args:
+        day: Full weekday name (e.g., "Monday")
+        date: Date in YYYY-MM-DD format
+        time: Time in HH:MM AM/PM format
+    
+    Returns:
+        Session context string
+    """
+    return f"Today is {day}, {date}. Current time is {time}."
+
+
+def build_prompt_messages(day: str, date: str, time: str) -> list:
+    """
+    Build the opening messages for Ayesha, the AI voice assistant: the byte-stable
+    static instruction first, then the small per-call context
+    
+    Args:
+        day: Full weekday name (e.g., "Monday")
+        date: Date in YYYY-MM-DD format
+        time: Time in HH:MM AM/PM format
+    
+    Returns:
+        List of system messages to start the LLM context with
+    """
+    return [
+        {"role": "system", "content": STATIC_INSTRUCTION},
+        {"role": "system", "content": get_session_context(day, date, time)},
+    ]
 
 
 def get_greeting_prompt(time_context: str) -> str:
@@ -127,3 +148,42 @@ def get_greeting_prompt(time_context: str) -> str:
         Be casual and friendly. Keep it short - 2 sentences max.
         """
     return greeting_prompt
+
+
+# Fixed greetings, one per meal period. These are spoken from pre-synthesized
+# audio (see greeting_cache.py), so they must not change per call.
+GREETING_TEXTS = {
+    "breakfast": "Good morning, and welcome to Cheezious! It's breakfast time, what would you like to order?",
+    "lunch": "Hi, welcome to Cheezious! It's lunch time, what can I get for you today?",
+    "dinner": "Good evening, and welcome to Cheezious! It's dinner time, what would you like to order?",
+}
+
+
+def get_meal_period(hour: int) -> str:
+    """
+    Map the hour of day to a meal period
+    
+    Args:
+        hour: Hour in 24h format (0-23)
+    
+    Returns:
+        "breakfast", "lunch" or "dinner"
+    """
+    if hour < 12:
+        return "breakfast"
+    if hour < 17:
+        return "lunch"
+    return "dinner"
+
+
+def get_greeting_text(meal_period: str) -> str:
+    """
+    Get the fixed greeting spoken at the start of a call
+    
+    Args:
+        meal_period: "breakfast", "lunch" or "dinner"
+    
+    Returns:
+        Greeting text
+    """
+    return GREETING_TEXTS[meal_period]
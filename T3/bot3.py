@@ -52,10 +52,12 @@ import asyncio
 #async task management
 
 #import modular components
-from prompts import get_system_instruction, get_greeting_prompt
+from prompts import build_prompt_messages, get_greeting_prompt
 #system prompts for the voice assistant (customer perspective)
 from audio_handlers import AudioBufferHandlers
 #audio buffer event handlers for recording and analysis
+from context_manager import ContextBudgetManager
+#keeps the prompt under a token budget by summarizing older turns
 from observers_handlers import SessionJSONObserver as LatencyJSONObserver
 #custom observer for storing latency metrics in JSON
 
@@ -91,11 +93,11 @@ async def bot(runner_args: RunnerArguments):
     date = current_time.strftime("%Y-%m-%d") # YYYY-MM-DD format
     time = current_time.strftime("%I:%M %p") # HH:MM AM/PM format
 
-    system_instruction = get_system_instruction(day, date, time)
-
-    messages = [{"role": "system", "content": system_instruction}]
+    # Static instruction first (same bytes every call, so the provider can cache it), then today's date and time
+    messages = build_prompt_messages(day, date, time)
     context = LLMContext(messages)
     context_aggregator = LLMContextAggregatorPair(context)
+    context_manager = ContextBudgetManager(pinned_messages=len(messages))  # compacts older turns into a summary over the token budget
     
     # Create audio recordings directory with timestamp
     session_timestamp = datetime.now(tz).strftime("%Y%m%d_%H%M%S")
@@ -124,6 +126,7 @@ async def bot(runner_args: RunnerArguments):
         transport.input(),
         stt,
         context_aggregator.user(),  #add user message to context
+        context_manager,            #summarize older turns once the prompt is over budget
         llm,
         tts,
         transport.output(),     #send bot speech back to user
@@ -171,6 +174,8 @@ async def bot(runner_args: RunnerArguments):
     async def handle_client_disconnected(transport: SmallWebRTCTransport, client):
         # Stop recording and flush any remaining buffered audio
         await audiobuffer.stop_recording()
+        # Per-turn prompt size (estimated tokens before and after compaction)
+        context_manager.save_curve(os.path.join(audio_dir, "context_curve.json"))
         
         print("\n" + "="*80)
         print("👋 CLIENT DISCONNECTED")
@@ -0,0 +1 @@
+../shared/context_manager.py
\ No newline at end of file
@@ -2,26 +2,14 @@
 System prompts for the Cheezious Restaurant voice assistant - Customer perspective
 """
 
-def get_system_instruction(day: str, date: str, time: str) -> str:
-    """
-    Generate the system instruction for the customer AI
-    
-    Args:
-        day: Full weekday name (e.g., "Monday")
-        date: Date in YYYY-MM-DD format
-        time: Time in HH:MM AM/PM format
-    
-    Returns:
-        Complete system instruction string
-    """
-    system_instruction = f"""
+# Identical for every session and every minute, so it stays a cacheable
+# prompt prefix. Anything that changes per call goes in get_session_context().
+STATIC_INSTRUCTION = """
     You are a customer calling Cheezious Restaurant in Lahore, Pakistan to place a food order.
 
     The person you're talking to is the restaurant assistant who will take your order.
     Respond naturally to their questions and prompts.
 
-    Today is {day}, {date}. Current time is {time}.
-
     YOUR PERSONALITY
     - Casual, friendly, and realistic customer
     - Sound like a real person ordering food, not scripted
@@ -115,7 +103,40 @@ def get_system_instruction(day: str, date: str, time: str) -> str:
 
     Remember: You're a hungry customer wanting to order food. Be natural, be human, keep it conversational!
     """
-    return system_instruction
+
+
+def get_session_context(day: str, date: str, time: str) -> str:
+    """
+    Generate the per-call part of the system prompt, sent after the static instruction
+    
+    Args:
+        day: Full weekday name (e.g., "Monday")
+        date: Date in YYYY-MM-DD format
+        time: Time in HH:MM AM/PM format
+    
+    Returns:
+        Session context string
+    """
+    return f"Today is {day}, {date}. Current time is {time}."
+
+
+def build_prompt_messages(day: str, date: str, time: str) -> list:
+    """
+    Build the opening messages for the customer AI: the byte-stable
+    static instruction first, then the small per-call context
+    
+    Args:
+        day: Full weekday name (e.g., "Monday")
+        date: Date in YYYY-MM-DD format
+        time: Time in HH:MM AM/PM format
+    
+    Returns:
+        List of system messages to start the LLM context with
+    """
+    return [
+        {"role": "system", "content": STATIC_INSTRUCTION},
+        {"role": "system", "content": get_session_context(day, date, time)},
+    ]
 
 
 def get_greeting_prompt(time_context: str) -> str:
@@ -26,6 +26,7 @@ from datetime import datetime
 import asyncio
 from prompts import get_system_instruction
 from audio_handlers import AudioBufferHandlers
+from context_manager import ContextBudgetManager
 from observers import JsonLatencyObserver, JsonTranscriptionObserver, UnifiedTurnLogger
 
 load_dotenv()
@@ -72,6 +73,8 @@ async def bot(runner_args: RunnerArguments):
     messages = [{"role": "system", "content": system_instruction}]
     context = LLMContext(messages)
     context_aggregator = LLMContextAggregatorPair(context)
+    # The customer prompt is short, so older turns are compacted sooner
+    context_manager = ContextBudgetManager(budget_tokens=1000)
 
     session_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     audio_dir = os.path.join(os.path.dirname(__file__), "audio_recordings", session_timestamp)
@@ -104,6 +107,7 @@ async def bot(runner_args: RunnerArguments):
         transport.input(),
         stt,
         context_aggregator.user(),
+        context_manager,
         llm,
         tts,
         transport.output(),
@@ -122,6 +126,7 @@ async def bot(runner_args: RunnerArguments):
     async def handle_client_disconnected(transport: SmallWebRTCTransport, client):
         print("Client disconnected:")
         await audiobuffer.stop_recording()
+        context_manager.save_curve(os.path.join(audio_dir, "context_curve.json"))
         await task.cancel()
 
     task = PipelineTask(
@@ -9,7 +9,6 @@ from dotenv import load_dotenv
 
 # Pipecat services
 from pipecat.services.groq.llm import GroqLLMService
-from pipecat.services.cartesia.tts import CartesiaTTSService
 from pipecat.services.groq.stt import GroqSTTService
 
 # Pipecat pipeline components
@@ -43,15 +42,22 @@ from pipecat.runner.types import RunnerArguments
 from pipecat_flows import FlowManager
 
 # Import our nodes
-from nodes import create_greet_node
+from nodes import GREET_CLASSIFIER, create_greet_node
+from intent_router import IntentRouter
 
 # Import observer
 from observer import SessionObserver
 
+# Cached TTS for repeated phrases
+from tts_cache import CachedCartesiaTTSService
+
 import pytz
 
 load_dotenv()
 
+# Upper bound on how long pre-synthesis (presynth.py) may delay startup
+PRESYNTH_TIMEOUT_SECS = 15.0
+
 async def bot(runner_args: RunnerArguments):
     
     transport = SmallWebRTCTransport(
@@ -76,7 +82,7 @@ async def bot(runner_args: RunnerArguments):
         model="llama-3.1-8b-instant"
     )
     
-    tts = CartesiaTTSService(
+    tts = CachedCartesiaTTSService(
         api_key=os.getenv("CARTESIA_API_KEY"),
         voice_id=os.getenv("CARTESIA_VOICE"),
     )
@@ -112,6 +118,9 @@ async def bot(runner_args: RunnerArguments):
     )
 
     llm_text_processor = LLMTextProcessor(text_aggregator=text_filter)
+
+    # Picks the scenario without the LLM when the transcript is clear
+    intent_router = IntentRouter(create_greet_node(), GREET_CLASSIFIER)
     
     # RECORDING SETUP
     session_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -129,6 +138,7 @@ async def bot(runner_args: RunnerArguments):
     pipeline = Pipeline([
         transport.input(),
         stt,
+        intent_router,
         context_aggregator.user(),
         llm,
         llm_text_processor, # Filters text before it hits TTS
@@ -152,6 +162,7 @@ async def bot(runner_args: RunnerArguments):
         context_aggregator=context_aggregator,
         transport=transport,
     )
+    intent_router.attach_flow_manager(flow_manager)
     
     @audiobuffer.event_handler("on_audio_data")
     async def on_audio_data(buffer, audio, sample_rate, num_channels):
@@ -188,5 +199,17 @@ async def bot(runner_args: RunnerArguments):
 
 
 if __name__ == "__main__":
+    import asyncio
     from pipecat.runner.run import main
+
+    # Scripted closing lines go into the TTS cache before the first call
+    if os.getenv("TTS_PRESYNTH", "1") != "0":
+        from loguru import logger
+        from presynth import presynthesize_flow
+
+        # A failure only costs cache hits; the bot starts either way
+        try:
+            asyncio.run(asyncio.wait_for(presynthesize_flow(), PRESYNTH_TIMEOUT_SECS))
+        except Exception as e:
+            logger.warning(f"Pre-synthesis failed: {e!r}")
     main()
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/intent_router.py
\ No newline at end of file
@@ -1,5 +1,9 @@
+import os
+
 from pipecat_flows import FlowManager, NodeConfig, FlowsFunctionSchema, FlowArgs, ContextStrategy, ContextStrategyConfig
 
+from intent_router import DEFAULT_MIN_CONFIDENCE, Intent, IntentClassifier
+
 # ==============================================================================
 # GREET / ROUTER NODE
 # ==============================================================================
@@ -69,6 +73,28 @@ def create_greet_node() -> NodeConfig:
     )
 
 
+# Keyword fast path for the router's functions (see intent_router.py),
+# built once per process. INTENT_MIN_CONFIDENCE above 1 leaves it to the LLM.
+GREET_INTENTS = [
+    Intent("place_order", [
+        "take your order", "ready to order", "what would you like", "place an order", "order",
+    ]),
+    Intent("ask_info", [
+        "any questions", "a question", "information", "opening hours", "hours", "menu",
+    ]),
+    Intent("make_reservation", [
+        "reservation", "reservations", "book a table", "booking", "table for",
+    ]),
+    Intent("check_status", [
+        "order status", "existing order", "check on an order", "order number", "status",
+    ]),
+]
+
+GREET_CLASSIFIER = IntentClassifier(
+    GREET_INTENTS, min_confidence=float(os.getenv("INTENT_MIN_CONFIDENCE", str(DEFAULT_MIN_CONFIDENCE)))
+)
+
+
 # ==============================================================================
 # ORDERING FLOW
 # ==============================================================================
@@ -0,0 +1 @@
+../shared/presynth.py
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Session admission control for a worker process.
+
+Every session in a worker shares one event loop. Once the loop is running
+late, accepting another caller makes audio choppy for everyone already
+connected, so new offers are checked against a budget before the peer
+connection is created:
+
+- active sessions below ADMISSION_MAX_SESSIONS
+- event-loop lag (moving average from LoopLagMonitor) below ADMISSION_MAX_LAG_MS
+- process CPU headroom, as a fraction of one core, above ADMISSION_MIN_CPU_HEADROOM
+
+An offer that does not fit waits in a short FIFO queue for a slot; if the
+queue is full or the wait times out it is rejected with AdmissionRejected,
+which the server turns into a 503 with Retry-After.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter, deque
+from typing import Deque, Optional
+
+from loguru import logger
+
+from loop_lag import LoopLagMonitor
+
+
+class AdmissionRejected(Exception):
+    """Raised when a new session does not fit the worker's budget."""
+
+    def __init__(self, reason: str, retry_after_secs: float):
+        super().__init__(f"Session rejected: {reason}")
+        self.reason = reason
+        self.retry_after_secs = retry_after_secs
+
+    def to_dict(self) -> dict:
+        return {
+            "error": "server_busy",
+            "reason": self.reason,
+            "retry_after_secs": self.retry_after_secs,
+        }
+
+
+class AdmissionController:
+    """
+    Decides whether a worker accepts a new session.
+
+    Args:
+        lag_monitor: Running LoopLagMonitor for this process's event loop
+        max_sessions: Hard cap on concurrent sessions
+        max_lag_ms: Reject or queue while the smoothed loop lag is above this
+        min_cpu_headroom: Fraction of one core that must stay free
+        queue_size: Offers allowed to wait for a slot at once (0 disables queueing)
+        queue_timeout_secs: Longest an offer waits before it is rejected
+        retry_after_secs: Hint returned to rejected callers
+    """
+
+    def __init__(
+        self,
+        lag_monitor: LoopLagMonitor,
+        max_sessions: int = 8,
+        max_lag_ms: float = 50.0,
+        min_cpu_headroom: float = 0.2,
+        queue_size: int = 4,
+        queue_timeout_secs: float = 5.0,
+        retry_after_secs: float = 2.0,
+    ):
+        self.lag_monitor = lag_monitor
+        self.max_sessions = max_sessions
+        self.max_lag_ms = max_lag_ms
+        self.min_cpu_headroom = min_cpu_headroom
+        self.queue_size = queue_size
+        self.queue_timeout_secs = queue_timeout_secs
+        self.retry_after_secs = retry_after_secs
+
+        self.active = 0
+        self.cpu_utilization = 0.0  # Process CPU time / wall time, 1.0 = one full core
+        self.decisions: Counter = Counter()
+        self.queue_waits_ms: Deque[float] = deque(maxlen=500)
+
+        self._waiters: Deque[object] = deque()
+        self._cpu_task: Optional[asyncio.Task] = None
+
+    # -- CPU sampling -------------------------------------------------------------
+
+    def start(self, interval_secs: float = 1.0):
+        if self._cpu_task is None:
+            self._cpu_task = asyncio.get_running_loop().create_task(self._sample_cpu(interval_secs))
+
+    def stop(self):
+        if self._cpu_task is not None:
+            self._cpu_task.cancel()
+            self._cpu_task = None
+
+    async def _sample_cpu(self, interval_secs: float):
+        last_cpu, last_wall = time.process_time(), time.perf_counter()
+        while True:
+            await asyncio.sleep(interval_secs)
+            cpu, wall = time.process_time(), time.perf_counter()
+            self.cpu_utilization = (cpu - last_cpu) / max(wall - last_wall, 1e-6)
+            last_cpu, last_wall = cpu, wall
+
+    # -- decisions ----------------------------------------------------------------
+
+    def over_budget(self) -> Optional[str]:
+        """Name of the first exceeded limit, or None if a session fits now."""
+        if self.active >= self.max_sessions:
+            return "max_sessions"
+        if self.lag_monitor.lag_ms > self.max_lag_ms:
+            return "loop_lag"
+        if 1.0 - self.cpu_utilization < self.min_cpu_headroom:
+            return "cpu"
+        return None
+
+    def _decide(self, decision: str, reason: Optional[str] = None):
+        key = f"{decision}:{reason}" if reason else decision
+        self.decisions[key] += 1
+        logger.info(
+            f"Admission {key} (active={self.active}, lag={self.lag_monitor.lag_ms:.1f}ms, "
+            f"cpu={self.cpu_utilization:.0%}, queued={len(self._waiters)})"
+        )
+
+    async def acquire(self):
+        """
+        Reserve a session slot, waiting in the queue if needed.
+
+        Raises:
+            AdmissionRejected: The worker is over budget and the offer could not wait
+        """
+        reason = self.over_budget()
+        if reason is None and not self._waiters:
+            self.active += 1
+            self._decide("admitted")
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self._decide("rejected", reason or "queue_full")
+            raise AdmissionRejected(reason or "queue_full", self.retry_after_secs)
+
+        token = object()
+        self._waiters.append(token)
+        start = time.perf_counter()
+        try:
+            while True:
+                # FIFO: only the head of the queue may take a freed slot
+                if self._waiters[0] is token:
+                    reason = self.over_budget()
+                    if reason is None:
+                        self.active += 1
+                        self.queue_waits_ms.append((time.perf_counter() - start) * 1000)
+                        self._decide("admitted_after_queue")
+                        return
+                if time.perf_counter() - start >= self.queue_timeout_secs:
+                    self._decide("rejected", f"queue_timeout:{reason}")
+                    raise AdmissionRejected(f"queue_timeout:{reason}", self.retry_after_secs)
+                await asyncio.sleep(0.05)
+        finally:
+            self._waiters.remove(token)
+
+    def release(self):
+        self.active = max(0, self.active - 1)
+
+    def snapshot(self) -> dict:
+        waits = sorted(self.queue_waits_ms)
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "cpu_utilization": round(self.cpu_utilization, 3),
+            "over_budget": self.over_budget(),
+            "decisions": dict(self.decisions),
+            "queue_wait_p50_ms": round(waits[len(waits) // 2], 1) if waits else 0.0,
+            "loop_lag": self.lag_monitor.snapshot(),
+            "limits": {
+                "max_sessions": self.max_sessions,
+                "max_lag_ms": self.max_lag_ms,
+                "min_cpu_headroom": self.min_cpu_headroom,
+                "queue_size": self.queue_size,
+            },
+        }
+
+
+def create_admission_controller(lag_monitor: LoopLagMonitor) -> AdmissionController:
+    """Build a controller configured from ADMISSION_* environment variables."""
+    return AdmissionController(
+        lag_monitor,
+        max_sessions=int(os.getenv("ADMISSION_MAX_SESSIONS", "8")),
+        max_lag_ms=float(os.getenv("ADMISSION_MAX_LAG_MS", "50")),
+        min_cpu_headroom=float(os.getenv("ADMISSION_MIN_CPU_HEADROOM", "0.2")),
+        queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "4")),
+        queue_timeout_secs=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECS", "5")),
+    )
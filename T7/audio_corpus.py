@@ -0,0 +1,59 @@
+"""
+Audio inputs for the offline VAD benchmarks.
+
+Loads recorded user turns (the user_turn_*.wav files AudioBufferHandlers
+writes) as 16 kHz mono int16, or synthesizes a speech-like signal with
+pauses and line noise when no recordings are available.
+"""
+
+import glob
+import wave
+from typing import List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def _to_16k_mono(samples: np.ndarray, sample_rate: int, channels: int) -> np.ndarray:
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if sample_rate != SAMPLE_RATE:
+        duration = len(samples) / sample_rate
+        target = np.linspace(0, len(samples) - 1, int(duration * SAMPLE_RATE))
+        samples = np.interp(target, np.arange(len(samples)), samples)
+    return samples.astype(np.int16)
+
+
+def load_wav(path: str) -> np.ndarray:
+    """Read a 16-bit PCM wav file as 16 kHz mono int16."""
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        return _to_16k_mono(samples.astype(np.float32), wf.getframerate(), wf.getnchannels())
+
+
+def synthetic_turn(seconds: float = 6.0, seed: int = 0) -> np.ndarray:
+    """Voiced bursts (harmonics + noise, syllable-rate envelope) separated by pauses."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = rng.normal(0, 60, len(t))  # Line noise floor
+    start = 0.8
+    while start < seconds - 0.5:
+        length = rng.uniform(0.6, 1.6)
+        mask = (t >= start) & (t < start + length)
+        f0 = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t[mask]) / k for k in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * (t[mask] - start))
+        audio[mask] += 4000 * voiced * envelope + rng.normal(0, 300, mask.sum())
+        start += length + rng.uniform(0.4, 1.2)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def load_corpus(pattern: str = "") -> List[Tuple[str, np.ndarray]]:
+    """(name, audio) pairs for every file matching pattern, or synthetic turns."""
+    paths = sorted(glob.glob(pattern, recursive=True)) if pattern else []
+    if paths:
+        return [(path, load_wav(path)) for path in paths]
+    return [(f"synthetic_{i}", synthetic_turn(seed=i)) for i in range(4)]
@@ -0,0 +1,111 @@
+"""
+Cross-session micro-batching for small model calls.
+
+Each session's analyzers call their model from their own executor thread, so
+with many callers a process issues a stream of tiny, concurrent inference
+calls that contend for the same cores. A MicroBatcher sits between those
+threads and the model: callers submit one item and block, a single batcher
+thread gathers whatever arrives within max_wait_ms (or until max_batch
+items), runs them as one call and hands each caller its own result.
+
+The first item in a batch waits at most max_wait_ms before the batch runs,
+so that is the added latency bound on top of the inference itself.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from loguru import logger
+
+
+class MicroBatcher:
+    """
+    Collects single-item requests from many threads into batched calls.
+
+    Args:
+        run_batch: Runs a list of items and returns one result per item, in order
+        max_batch: Largest batch passed to run_batch
+        max_wait_ms: Longest the oldest queued item waits for company
+        name: Thread name, used in logs
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+    ):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait_secs = max_wait_ms / 1000
+        self.name = name
+
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes: Counter = Counter()
+
+        self._queue: "queue.SimpleQueue[Tuple[Any, Future, float]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Any:
+        """Queue one item and block until its result is ready."""
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _collect(self) -> List[Tuple[Any, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_secs
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                if timeout <= 0:
+                    # Past the deadline: still take anything already queued
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.run_batch([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    # Which result belongs to which caller is unknown: fail them all
+                    raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.exception(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,138 @@
+"""
+Benchmark clause-first TTS chunking against sentence chunking.
+
+Streams each reply token by token through the aggregator at LLM speed
+(--ttft-ms to the first token, then --tokens-per-sec), and plays the chunks
+it emits on a simulated TTS: each chunk's audio starts --tts-ttfb-ms after
+the chunk is sent (or when the previous chunk's audio ends, if later) and
+lasts its word count at --words-per-sec.
+
+Reported per reply and mode:
+
+- first audio: first token -> first audio byte, the latency the caller hears
+- chunks and mean words per chunk. Every chunk boundary is a point where
+  Cartesia restarts its intonation, so fewer, longer chunks is the prosody
+  proxy; "short" counts chunks under 4 words, the ones that sound clipped.
+- gaps: silences between chunks, when a chunk's audio was not ready by the
+  time the previous one finished playing.
+
+The sentence mode is the same aggregator with clause cuts disabled, so the
+comparison runs without NLTK's punkt data (pipecat's SimpleTextAggregator
+needs it).
+
+Usage:
+    python bench_clause_aggregator.py [--replies replies.txt] [--ttft-ms 250] [--tokens-per-sec 250]
+                                      [--tts-ttfb-ms 90] [--words-per-sec 2.7]
+"""
+
+import argparse
+import asyncio
+import re
+from typing import List, Tuple
+
+from clause_aggregator import FIRST_MAX_WORDS, FIRST_MIN_WORDS, MIN_WORDS, ClauseTextAggregator
+
+REPLIES = [
+    "Sure, the Zinger Burger is 550 rupees and it comes with fries. Would you like a drink with that?",
+    "Great choice! I've added one large Chicken Tikka pizza to your order. Anything else you'd like to add?",
+    "Just to confirm, your order is two Zinger Burgers, one large fries and two Pepsis, "
+    "for a total of 1,640 rupees. Shall I place the order?",
+    "Okay.",
+    "I'm sorry, we don't deliver to that area yet, but you can pick up your order from our Gulberg branch.",
+    "Could you please tell me your delivery address, including the street and house number?",
+    "Thank you! Your order has been placed and it will reach you in about 40 minutes.",
+]
+SENTENCE = {"first_min_words": 10**6, "first_max_words": 10**6, "min_words": 1}
+
+
+def _tokens(text: str) -> List[str]:
+    """Roughly how an LLM streams text: words with their leading space, punctuation apart."""
+    return re.findall(r"\s*[\w']+|\s*[^\w\s]", text)
+
+
+async def _chunk_times(text: str, params: dict, ttft_ms: float, tokens_per_sec: float) -> List[Tuple[float, str]]:
+    """(ms after the request, chunk) for every chunk the aggregator sends to TTS."""
+    aggregator = ClauseTextAggregator(**params)
+    sent = []
+    now = ttft_ms
+    for token in _tokens(text):
+        async for aggregation in aggregator.aggregate(token):
+            sent.append((now, aggregation.text))
+        now += 1000 / tokens_per_sec
+    remaining = await aggregator.flush()
+    if remaining:
+        sent.append((now, remaining.text))
+    return sent
+
+
+def _playout(sent: List[Tuple[float, str]], tts_ttfb_ms: float, words_per_sec: float) -> Tuple[float, int, float]:
+    """First audio (ms), number of gaps and total gap ms for the chunks as sent."""
+    first_audio = None
+    playing_until = 0.0
+    gaps, gap_ms = 0, 0.0
+    for sent_at, chunk in sent:
+        ready = sent_at + tts_ttfb_ms
+        if first_audio is None:
+            first_audio, start = ready, ready
+        else:
+            start = max(ready, playing_until)
+            if ready > playing_until:
+                gaps += 1
+                gap_ms += ready - playing_until
+        playing_until = start + len(chunk.split()) / words_per_sec * 1000
+    return first_audio, gaps, gap_ms
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Clause vs sentence TTS chunking benchmark")
+    parser.add_argument("--replies", default=None, help="Text file, one bot reply per line")
+    parser.add_argument("--ttft-ms", type=float, default=250.0, help="LLM request -> first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=250.0)
+    parser.add_argument("--tts-ttfb-ms", type=float, default=90.0, help="TTS text -> first audio byte")
+    parser.add_argument("--words-per-sec", type=float, default=2.7, help="Speaking rate")
+    parser.add_argument("--first-min-words", type=int, default=FIRST_MIN_WORDS)
+    parser.add_argument("--first-max-words", type=int, default=FIRST_MAX_WORDS)
+    parser.add_argument("--min-words", type=int, default=MIN_WORDS)
+    args = parser.parse_args()
+
+    replies = REPLIES
+    if args.replies:
+        with open(args.replies) as f:
+            replies = [line.strip() for line in f if line.strip()]
+    modes = {
+        "sentence": SENTENCE,
+        "clause": {
+            "first_min_words": args.first_min_words,
+            "first_max_words": args.first_max_words,
+            "min_words": args.min_words,
+        },
+    }
+
+    print(f"{'reply':<32} | {'mode':<8} | {'first audio ms':>14} | {'chunks':>6} | {'words/chunk':>11} | "
+          f"{'short':>5} | {'gaps':>4} | first chunk")
+    print("-" * 120)
+    totals = {mode: [0.0, 0, 0, 0, 0] for mode in modes}
+    for reply in replies:
+        for mode, params in modes.items():
+            sent = await _chunk_times(reply, params, args.ttft_ms, args.tokens_per_sec)
+            first_audio, gaps, _ = _playout(sent, args.tts_ttfb_ms, args.words_per_sec)
+            words = [len(chunk.split()) for _, chunk in sent]
+            short = sum(1 for n in words if n < 4)
+            total = totals[mode]
+            total[0] += first_audio
+            total[1] += len(sent)
+            total[2] += sum(words)
+            total[3] += short
+            total[4] += gaps
+            print(f"{reply[:32]:<32} | {mode:<8} | {first_audio:14.0f} | {len(sent):6} | "
+                  f"{sum(words) / len(sent):11.1f} | {short:5} | {gaps:4} | {sent[0][1][:40]}")
+        print()
+
+    for mode, (first_audio, chunks, words, short, gaps) in totals.items():
+        print(f"{mode:<8}  mean first audio {first_audio / len(replies):6.0f} ms | "
+              f"{chunks / len(replies):.1f} chunks/reply | {words / chunks:.1f} words/chunk | "
+              f"{short} short chunks | {gaps} gaps")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Benchmark the client pool against local stand-in servers.
+
+Starts an OpenAI-compatible HTTP stand-in (GET /v1/models) and a WebSocket
+stand-in, then simulates N sessions arriving one after another. For each
+session we time its first STT/LLM-style request and its TTS socket setup,
+once with fresh clients (today's behaviour) and once through the pool.
+
+The stand-ins add --handshake-ms of latency to every new connection to
+approximate the TCP + TLS round trips a real endpoint costs; requests on an
+already-open connection do not pay it.
+
+Usage:
+    python bench_client_pool.py [--sessions 20] [--handshake-ms 60]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from openai import AsyncOpenAI
+from websockets.asyncio.client import connect as websocket_connect
+from websockets.asyncio.server import serve as websocket_serve
+
+from client_pool import HTTPClientPool, WebSocketPool
+
+HTTP_PORT = 18081
+WS_PORT = 18082
+
+
+async def _start_http_standin(handshake_ms: float):
+    seen_connections = set()
+
+    @web.middleware
+    async def handshake_delay(request, handler):
+        # Charge the handshake once per TCP connection
+        peer = request.transport.get_extra_info("peername")
+        if peer not in seen_connections:
+            seen_connections.add(peer)
+            await asyncio.sleep(handshake_ms / 1000)
+        return await handler(request)
+
+    async def models(request):
+        return web.json_response({"object": "list", "data": [{"id": "stand-in", "object": "model",
+                                                              "created": 0, "owned_by": "bench"}]})
+
+    app = web.Application(middlewares=[handshake_delay])
+    app.router.add_get("/v1/models", models)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", HTTP_PORT).start()
+    return runner
+
+
+async def _start_ws_standin(handshake_ms: float):
+    async def process_request(connection, request):
+        await asyncio.sleep(handshake_ms / 1000)
+
+    async def handler(websocket):
+        async for message in websocket:
+            await websocket.send(message)
+
+    return await websocket_serve(handler, "127.0.0.1", WS_PORT, process_request=process_request)
+
+
+async def _session_cold(base_url: str, ws_url: str):
+    start = time.perf_counter()
+    client = AsyncOpenAI(api_key="bench", base_url=base_url)
+    await client.models.list()
+    http_ms = (time.perf_counter() - start) * 1000
+    await client.close()
+
+    start = time.perf_counter()
+    websocket = await websocket_connect(ws_url)
+    ws_ms = (time.perf_counter() - start) * 1000
+    await websocket.close()
+    return http_ms, ws_ms
+
+
+async def _session_pooled(http_pool: HTTPClientPool, ws_pool: WebSocketPool, base_url: str, ws_url: str):
+    start = time.perf_counter()
+    await http_pool.get("bench", base_url).models.list()
+    http_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    websocket = ws_pool.acquire_nowait() or await websocket_connect(ws_url)
+    ws_ms = (time.perf_counter() - start) * 1000
+    await websocket.close()
+    return http_ms, ws_ms
+
+
+def _report(label, results):
+    http = sorted(r[0] for r in results)
+    ws = sorted(r[1] for r in results)
+    p50 = lambda xs: xs[len(xs) // 2]
+    p95 = lambda xs: xs[min(len(xs) - 1, int(len(xs) * 0.95))]
+    print(f"{label:>7} | {p50(http):9.1f} | {p95(http):9.1f} | {p50(ws):9.1f} | {p95(ws):9.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Client pool benchmark")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--handshake-ms", type=float, default=60.0)
+    parser.add_argument("--arrival-ms", type=float, default=250.0,
+                        help="Gap between session arrivals (lets the pool refill)")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{HTTP_PORT}/v1"
+    ws_url = f"ws://127.0.0.1:{WS_PORT}"
+    http_runner = await _start_http_standin(args.handshake_ms)
+    ws_server = await _start_ws_standin(args.handshake_ms)
+
+    cold = []
+    for _ in range(args.sessions):
+        cold.append(await _session_cold(base_url, ws_url))
+        await asyncio.sleep(args.arrival_ms / 1000)
+
+    http_pool = HTTPClientPool()
+    ws_pool = WebSocketPool(ws_url, size=2)
+    http_pool.get("bench", base_url)
+    await http_pool.warm_up()
+    await ws_pool.refill()
+
+    pooled = []
+    for _ in range(args.sessions):
+        pooled.append(await _session_pooled(http_pool, ws_pool, base_url, ws_url))
+        await asyncio.sleep(args.arrival_ms / 1000)
+
+    print(f"{'mode':>7} | {'http p50':>9} | {'http p95':>9} | {'ws p50':>9} | {'ws p95':>9}   (ms)")
+    print("-" * 58)
+    _report("cold", cold)
+    _report("pooled", pooled)
+    print(f"\nws leases: {ws_pool.leases}, misses: {ws_pool.misses}")
+
+    await http_pool.close()
+    await ws_pool.close()
+    ws_server.close()
+    await http_runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
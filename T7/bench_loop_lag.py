@@ -0,0 +1,109 @@
+"""
+Event-loop lag under N synthetic sessions, asyncio vs uvloop.
+
+Each synthetic session mimics what a bot pipeline does on the event loop:
+every 20 ms an audio frame arrives and costs --frame-us of CPU (resampling,
+VAD bookkeeping, frame routing), and every --turn-frames frames a "turn" ends
+and the session does what our observers do today: a synchronous JSON file
+write, a print(), and optionally an inline inference call (--inference-ms of
+CPU held on the loop).
+
+For every loop implementation and session count we report the scheduling
+delay percentiles and the stalls the watchdog caught.
+
+Usage:
+    python bench_loop_lag.py [--sessions 1 10 50 100] [--duration 10] [--inference-ms 0]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from loop_lag import LoopLagMonitor
+
+FRAME_SECS = 0.02
+
+
+def _burn(us: float):
+    end = time.perf_counter() + us / 1e6
+    while time.perf_counter() < end:
+        pass
+
+
+async def _session(index: int, args, log_dir: str, stop: asyncio.Event):
+    path = os.path.join(log_dir, f"session_{index}.json")
+    events = []
+    frame = 0
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        next_at += FRAME_SECS
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        frame += 1
+        _burn(args.frame_us)
+
+        if frame % args.turn_frames == 0:
+            events.append({"turn": frame // args.turn_frames, "text": "I'd like a large pizza " * 4})
+            with open(path, "w") as f:
+                json.dump(events, f, indent=2)
+            print(f"session {index} turn {len(events)}")
+            if args.inference_ms:
+                _burn(args.inference_ms * 1000)
+
+
+async def _run(num_sessions: int, args) -> dict:
+    monitor = LoopLagMonitor(interval_secs=0.02, window=100_000, stall_threshold_ms=args.stall_ms)
+    monitor.start()
+    stop = asyncio.Event()
+    with tempfile.TemporaryDirectory() as log_dir, redirect_stdout(io.StringIO()):
+        # Stagger starts so turns do not all land on the same tick
+        tasks = []
+        for i in range(num_sessions):
+            tasks.append(asyncio.create_task(_session(i, args, log_dir, stop)))
+            await asyncio.sleep(FRAME_SECS / max(num_sessions, 1))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    monitor.stop()
+    return monitor.snapshot()
+
+
+def _loop_factories():
+    factories = {"asyncio": asyncio.new_event_loop}
+    try:
+        import uvloop
+
+        factories["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        print("uvloop not installed; benchmarking asyncio only\n")
+    return factories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag benchmark")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--frame-us", type=float, default=150.0)
+    parser.add_argument("--turn-frames", type=int, default=150, help="Frames per turn (150 = 3s)")
+    parser.add_argument("--inference-ms", type=float, default=0.0)
+    parser.add_argument("--stall-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    factories = _loop_factories()
+    print(f"{'loop':>8} | {'sessions':>8} | {'p50 ms':>7} | {'p90 ms':>7} | {'p99 ms':>7} | "
+          f"{'max ms':>7} | {'stalls':>6}")
+    print("-" * 68)
+    for loop_name, factory in factories.items():
+        for num_sessions in args.sessions:
+            with asyncio.Runner(loop_factory=factory) as runner:
+                s = runner.run(_run(num_sessions, args))
+            print(f"{loop_name:>8} | {num_sessions:>8} | {s['p50_ms']:7.2f} | {s['p90_ms']:7.2f} | "
+                  f"{s['p99_ms']:7.2f} | {s['max_ms']:7.2f} | {s['stalls']:>6}")
+
+
+if __name__ == "__main__":
+    main()
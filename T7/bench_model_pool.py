@@ -0,0 +1,89 @@
+"""
+Compare per-session VAD/Smart Turn setup with and without the model registry.
+
+For each mode, N sessions are created one after another. For every session we
+record the connect-to-ready time (analyzer construction + sample rate setup +
+first VAD chunk + first turn prediction) and the resident memory added.
+
+Usage:
+    python bench_model_pool.py [--sessions 10]
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+
+import numpy as np
+
+from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADParams
+
+from model_pool import create_turn_analyzer, create_vad_analyzer, get_model_registry
+
+SAMPLE_RATE = 16000
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux)."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def _make_ready_session(shared: bool):
+    params = VADParams(stop_secs=0.2)
+    if shared:
+        vad = create_vad_analyzer(params=params)
+        turn = create_turn_analyzer()
+    else:
+        vad = SileroVADAnalyzer(params=params)
+        turn = LocalSmartTurnAnalyzerV3()
+
+    vad.set_sample_rate(SAMPLE_RATE)
+    turn.set_sample_rate(SAMPLE_RATE)
+
+    chunk = (np.random.randn(512) * 1000).astype(np.int16).tobytes()
+    await vad.analyze_audio(chunk)
+    turn.append_audio(chunk, is_speech=True)
+    await turn.analyze_end_of_turn()
+    return vad, turn
+
+
+async def _run(shared: bool, sessions: int):
+    keep_alive = []
+    times, deltas = [], []
+    for _ in range(sessions):
+        gc.collect()
+        before = rss_mb()
+        start = time.perf_counter()
+        keep_alive.append(await _make_ready_session(shared))
+        times.append((time.perf_counter() - start) * 1000)
+        deltas.append(rss_mb() - before)
+    return times, deltas
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Model registry benchmark")
+    parser.add_argument("--sessions", type=int, default=10)
+    args = parser.parse_args()
+
+    registry = get_model_registry()
+    start = time.perf_counter()
+    registry.warm_up()
+    print(f"Registry startup (load + warm-up): {(time.perf_counter() - start) * 1000:.0f}ms\n")
+
+    print(f"{'mode':>8} | {'first ready ms':>14} | {'avg ready ms':>12} | {'RSS/extra session MB':>20}")
+    print("-" * 64)
+    for shared in (False, True):
+        times, deltas = await _run(shared, args.sessions)
+        extra = deltas[1:] or deltas
+        print(f"{'shared' if shared else 'private':>8} | {times[0]:14.1f} | "
+              f"{sum(times) / len(times):12.1f} | {sum(extra) / len(extra):20.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Connect-to-first-audio latency with and without the pipeline pool.
+
+Each simulated caller is a real aiortc peer on loopback. It posts its offer
+to a SmallWebRTCRequestHandler the way the worker's /api/offer does; the
+connection callback takes a session (pooled or built on the spot), attaches
+the connection and runs it. The latency is measured at the caller, from
+creating the offer to the first non-silent audio frame it receives.
+
+The greeting itself needs the LLM and TTS, which are not part of what the
+pool changes, so the benchmark greets with a short pre-rendered tone sent
+from on_client_connected. Dummy API keys are set if none are configured;
+the flow's own LLM greeting then fails in the background, which is fine.
+
+Usage:
+    python bench_pipeline_pool.py [--callers 10] [--pool-size 2] [--gap 2.0]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("CARTESIA_API_KEY", "")
+
+from aiortc import RTCPeerConnection, RTCSessionDescription  # noqa: E402
+from aiortc.mediastreams import AudioStreamTrack, MediaStreamError  # noqa: E402
+
+from pipecat.frames.frames import OutputAudioRawFrame  # noqa: E402
+from pipecat.pipeline.runner import PipelineRunner  # noqa: E402
+from pipecat.transports.smallwebrtc.request_handler import (  # noqa: E402
+    SmallWebRTCRequest,
+    SmallWebRTCRequestHandler,
+)
+
+from main import create_session  # noqa: E402
+from pipeline_pool import PipelinePool, SessionTemplate  # noqa: E402
+from warmup import wait_until_ready  # noqa: E402
+
+TONE_RATE = 24000
+TONE = (np.sin(np.arange(TONE_RATE // 5) * 2 * np.pi * 440 / TONE_RATE) * 8000).astype(np.int16)
+
+
+def _build_with_tone() -> SessionTemplate:
+    session = create_session()
+
+    @session.transport.event_handler("on_client_connected")
+    async def greet(transport, client):
+        await transport.send_audio(OutputAudioRawFrame(TONE.tobytes(), TONE_RATE, 1))
+
+    return session
+
+
+async def _first_audio(track, done: asyncio.Future, start: float):
+    while not done.done():
+        try:
+            frame = await track.recv()
+        except MediaStreamError:
+            return
+        if np.abs(frame.to_ndarray()).max() > 1000:
+            done.set_result(time.perf_counter() - start)
+
+
+async def _call(handler: SmallWebRTCRequestHandler, pool: PipelinePool, sessions: set) -> float:
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    pc = RTCPeerConnection()
+    pc.addTrack(AudioStreamTrack())  # Silent microphone
+    start = time.perf_counter()
+
+    @pc.on("track")
+    def on_track(track):
+        asyncio.ensure_future(_first_audio(track, done, start))
+
+    async def run_session(connection):
+        session = await pool.take()
+        session.attach(connection)
+        try:
+            await PipelineRunner(handle_sigint=False).run(session.task)
+        finally:
+            session.close()
+
+    async def connection_callback(connection):
+        task = asyncio.create_task(run_session(connection))
+        sessions.add(task)
+        task.add_done_callback(sessions.discard)
+
+    await pc.setLocalDescription(await pc.createOffer())
+    answer = await handler.handle_web_request(
+        request=SmallWebRTCRequest(sdp=pc.localDescription.sdp, type=pc.localDescription.type),
+        webrtc_connection_callback=connection_callback,
+    )
+    await pc.setRemoteDescription(RTCSessionDescription(sdp=answer["sdp"], type=answer["type"]))
+    try:
+        return await asyncio.wait_for(done, timeout=15)
+    finally:
+        await pc.close()
+
+
+async def _run(label: str, pool_size: int, callers: int, gap: float):
+    handler = SmallWebRTCRequestHandler()
+    pool = PipelinePool(_build_with_tone, size=pool_size)
+    pool.start()
+    await asyncio.sleep(gap)
+    sessions: set = set()
+    latencies = []
+    with redirect_stdout(io.StringIO()):  # The bot's connect/disconnect banners
+        for _ in range(callers):
+            latencies.append(await _call(handler, pool, sessions) * 1000)
+            await asyncio.sleep(gap)  # Lets the pool refill between callers
+        for task in list(sessions):
+            task.cancel()
+        await asyncio.gather(*sessions, return_exceptions=True)
+    await pool.close()
+    await handler.close()
+
+    latencies.sort()
+    build = pool.snapshot()["mean_build_ms"] or 0.0
+    print(f"{label:>10} | {latencies[len(latencies) // 2]:8.1f} | {latencies[-1]:8.1f} | "
+          f"{pool.hits:>4}/{pool.misses:<4} | {build:8.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Pipeline pool benchmark")
+    parser.add_argument("--callers", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--gap", type=float, default=2.0, help="Seconds between callers")
+    args = parser.parse_args()
+
+    await wait_until_ready()
+    print(f"{'mode':>10} | {'p50 ms':>8} | {'max ms':>8} | {'hit/miss':>9} | {'build ms':>8}")
+    print("-" * 56)
+    await _run("no pool", 0, args.callers, args.gap)
+    await _run("pool", args.pool_size, args.callers, args.gap)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
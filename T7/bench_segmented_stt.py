@@ -0,0 +1,169 @@
+"""
+Benchmark pipelined segment transcription against a local Whisper stand-in.
+
+Plays each recording in real time through the STT service, with the VAD
+events the shared Silero analyzer (stop_secs=0.2) finds in it, and the
+confirmed end of turn --endpoint-ms after the last VAD stop. Each file runs
+twice: whole-turn transcription (today's behaviour) and
+PipelinedGroqSTTService. Reported per file: segments sent while the user
+was talking, and confirmed stop -> TranscriptionFrame.
+
+The stand-in answers POST /v1/audio/transcriptions after --base-ms plus
+--ms-per-sec for every second of audio in the request, roughly how a
+hosted Whisper's upload + inference time grows with utterance length.
+
+Usage:
+    python bench_segmented_stt.py [--wav "recordings/**/user_turn_*.wav"] [--min-segment-secs 1.0]
+                                  [--base-ms 250] [--ms-per-sec 40] [--endpoint-ms 100]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import wave
+from typing import List
+
+import numpy as np
+from aiohttp import web
+
+from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+from pipecat.frames.frames import (
+    Frame,
+    InputAudioRawFrame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.tests.utils import SleepFrame, run_test
+
+from audio_corpus import SAMPLE_RATE, load_corpus
+from model_pool import SharedSileroVADAnalyzer
+from segmented_stt import PipelinedGroqSTTService, get_segmentation_stats
+
+HTTP_PORT = 18083
+WINDOW_SAMPLES = 512
+
+
+async def _start_whisper_standin(base_ms: float, ms_per_sec: float):
+    async def transcriptions(request):
+        form = await request.post()
+        with wave.open(io.BytesIO(form["file"].file.read())) as wav:
+            seconds = wav.getnframes() / wav.getframerate()
+        await asyncio.sleep((base_ms + ms_per_sec * seconds) / 1000)
+        return web.json_response({"text": f"{seconds:.1f} seconds of speech"})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/audio/transcriptions", transcriptions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", HTTP_PORT).start()
+    return runner
+
+
+def _turn_frames(audio: np.ndarray, endpoint_ms: float) -> List[Frame]:
+    """The turn as the STT service sees it: audio windows in real time, with VAD events."""
+    vad = SharedSileroVADAnalyzer(params=VADParams(stop_secs=0.2))
+    vad.set_sample_rate(SAMPLE_RATE)
+    vad._last_reset_time = float("inf")  # No wall-clock resets in offline runs
+
+    window_secs = WINDOW_SAMPLES / SAMPLE_RATE
+    frames: List[Frame] = []
+    speaking = started = False
+    for offset in range(0, len(audio) - WINDOW_SAMPLES + 1, WINDOW_SAMPLES):
+        window = audio[offset:offset + WINDOW_SAMPLES].tobytes()
+        state = vad._run_analyzer(window)
+        frames.append(InputAudioRawFrame(audio=window, sample_rate=SAMPLE_RATE, num_channels=1))
+        if not speaking and state == VADState.SPEAKING:
+            speaking = True
+            if not started:
+                started = True
+                frames.append(UserStartedSpeakingFrame())
+            frames.append(VADUserStartedSpeakingFrame())
+        elif speaking and state == VADState.QUIET:
+            speaking = False
+            frames.append(VADUserStoppedSpeakingFrame())
+        frames.append(SleepFrame(window_secs))
+    if speaking:
+        frames.append(VADUserStoppedSpeakingFrame())
+    # Smart-turn confirms endpoint_ms after the last VAD stop, trailing audio is dropped
+    last_stop = max(i for i, frame in enumerate(frames) if isinstance(frame, VADUserStoppedSpeakingFrame))
+    frames = frames[:last_stop + 1]
+
+    silence = np.zeros(WINDOW_SAMPLES, dtype=np.int16).tobytes()
+    for _ in range(int(endpoint_ms / 1000 / window_secs)):
+        frames.append(InputAudioRawFrame(audio=silence, sample_rate=SAMPLE_RATE, num_channels=1))
+        frames.append(SleepFrame(window_secs))
+    frames.append(UserStoppedSpeakingFrame())
+    frames.append(SleepFrame(3.0))
+    return frames
+
+
+class _StopToText(FrameProcessor):
+    """Times confirmed stop -> TranscriptionFrame behind the STT service."""
+
+    def __init__(self):
+        super().__init__()
+        self.stopped_at = None
+        self.latency_ms = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, UserStoppedSpeakingFrame):
+            self.stopped_at = time.perf_counter()
+        elif isinstance(frame, TranscriptionFrame) and self.stopped_at is not None:
+            self.latency_ms = (time.perf_counter() - self.stopped_at) * 1000
+        await self.push_frame(frame, direction)
+
+
+async def _run(frames: List[Frame], min_segment_secs) -> float:
+    stt = PipelinedGroqSTTService(
+        api_key="bench",
+        base_url=f"http://127.0.0.1:{HTTP_PORT}/v1",
+        model="whisper-large-v3",
+        sample_rate=SAMPLE_RATE,
+        min_segment_secs=min_segment_secs,
+    )
+    timer = _StopToText()
+    await run_test(Pipeline([stt, timer]), frames_to_send=frames, expected_down_frames=None)
+    return timer.latency_ms
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Pipelined STT benchmark")
+    parser.add_argument("--wav", default="", help="Glob of user_turn_*.wav recordings")
+    parser.add_argument("--min-segment-secs", type=float, default=1.0)
+    parser.add_argument("--base-ms", type=float, default=250.0)
+    parser.add_argument("--ms-per-sec", type=float, default=40.0)
+    parser.add_argument("--endpoint-ms", type=float, default=100.0,
+                        help="VAD stop -> confirmed end of turn (smart-turn inference)")
+    args = parser.parse_args()
+
+    runner = await _start_whisper_standin(args.base_ms, args.ms_per_sec)
+
+    print(f"{'file':<28} | {'secs':>5} | {'segments':>8} | {'whole ms':>8} | {'pipelined ms':>12}")
+    print("-" * 74)
+    whole_total = pipelined_total = 0.0
+    corpus = load_corpus(args.wav)
+    for name, audio in corpus:
+        frames = _turn_frames(audio, args.endpoint_ms)
+        whole = await _run(frames, None)
+        segments_before = get_segmentation_stats().segments
+        pipelined = await _run(frames, args.min_segment_secs)
+        segments = get_segmentation_stats().segments - segments_before
+        whole_total += whole
+        pipelined_total += pipelined
+        label = name[-28:]
+        print(f"{label:<28} | {len(audio) / SAMPLE_RATE:5.1f} | {segments:>8} | {whole:8.0f} | {pipelined:12.0f}")
+
+    print(f"\nmean stop -> text: whole {whole_total / len(corpus):.0f} ms, "
+          f"pipelined {pipelined_total / len(corpus):.0f} ms")
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Event-loop lag and worker CPU with inference in-process vs in the sidecar.
+
+N synthetic sessions feed the corpus in real time, one 20 ms frame per tick,
+through a (VAD, turn) analyzer pair the way BaseInputTransport does: VAD on
+every frame, turn append_audio, and a Smart Turn check when the VAD goes
+quiet. For each mode and session count we report the loop's scheduling
+delay percentiles and the worker process's own CPU per audio-second (the
+sidecar's CPU is not included; that is the point).
+
+Usage:
+    python bench_sidecar.py [--sessions 1 10 25] [--duration 10] [--wav "recordings/**/user_turn_*.wav"]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from pipecat.audio.turn.base_turn_analyzer import EndOfTurnState
+from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+
+from audio_corpus import SAMPLE_RATE, load_corpus
+from loop_lag import LoopLagMonitor
+from model_pool import close_analyzers, create_analyzers, get_model_registry
+from sidecar import get_sidecar_client
+
+FRAME_SAMPLES = SAMPLE_RATE // 50
+
+
+async def _session(index: int, audio: np.ndarray, stop: asyncio.Event, counts: dict):
+    vad, turn = create_analyzers(VADParams(stop_secs=0.2))
+    vad.set_sample_rate(SAMPLE_RATE)
+    turn.set_sample_rate(SAMPLE_RATE)
+    offset = (index * 7919 * FRAME_SAMPLES) % len(audio)
+    previous = VADState.QUIET
+    next_at = time.perf_counter()
+    try:
+        while not stop.is_set():
+            next_at += FRAME_SAMPLES / SAMPLE_RATE
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            start = offset % (len(audio) - FRAME_SAMPLES)
+            chunk = audio[start:start + FRAME_SAMPLES].tobytes()
+            offset += FRAME_SAMPLES
+            counts["frames"] += 1
+
+            state = await vad.analyze_audio(chunk)
+            is_speech = state in (VADState.SPEAKING, VADState.STARTING)
+            if turn.append_audio(chunk, is_speech) == EndOfTurnState.INCOMPLETE:
+                if state == VADState.QUIET and previous != VADState.QUIET:
+                    await turn.analyze_end_of_turn()
+                    counts["turns"] += 1
+            previous = state
+    finally:
+        close_analyzers(vad, turn)
+
+
+async def _run(num_sessions: int, audio: np.ndarray, duration: float) -> dict:
+    monitor = LoopLagMonitor(interval_secs=0.02, window=100_000)
+    monitor.start()
+    stop = asyncio.Event()
+    counts = {"frames": 0, "turns": 0}
+    tasks = []
+    for i in range(num_sessions):
+        tasks.append(asyncio.create_task(_session(i, audio, stop, counts)))
+        await asyncio.sleep(0.02 / num_sessions)
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    await asyncio.gather(*tasks)
+    monitor.stop()
+
+    result = monitor.snapshot()
+    result["cpu_per_audio_sec"] = cpu / max(counts["frames"] * FRAME_SAMPLES / SAMPLE_RATE, 1e-9)
+    result["turns"] = counts["turns"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference sidecar benchmark")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 25])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--wav", default="", help="Glob of user_turn_*.wav recordings")
+    args = parser.parse_args()
+
+    audio = np.concatenate([a for _, a in load_corpus(args.wav)])
+    get_model_registry().warm_up()
+
+    print(f"{'mode':>10} | {'sessions':>8} | {'p50 ms':>7} | {'p99 ms':>7} | {'max ms':>7} | "
+          f"{'worker cpu/s':>12} | {'turns':>5}")
+    print("-" * 76)
+    for mode in ("in-process", "sidecar"):
+        os.environ["INFERENCE_SIDECAR"] = "1" if mode == "sidecar" else "0"
+        if mode == "sidecar":
+            get_sidecar_client()
+        for num_sessions in args.sessions:
+            s = asyncio.run(_run(num_sessions, audio, args.duration))
+            print(f"{mode:>10} | {num_sessions:>8} | {s['p50_ms']:7.2f} | {s['p99_ms']:7.2f} | "
+                  f"{s['max_ms']:7.2f} | {s['cpu_per_audio_sec']:12.4f} | {s['turns']:>5}")
+    get_sidecar_client().stop()
+
+
+if __name__ == "__main__":
+    main()
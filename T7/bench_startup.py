@@ -0,0 +1,140 @@
+"""
+Startup profiling for the bot entry points.
+
+Two modes:
+
+    python bench_startup.py imports ../T2/bot2.py [--top 15]
+        Import-time breakdown (python -X importtime) of a bot module, grouped
+        by top-level package, so we can see what dominates cold start.
+
+    python bench_startup.py ready main.py [--runs 3]
+        Time-to-ready: spawns the bot under the pipecat runner and measures
+        how long until the HTTP listener accepts connections and, for entry
+        points with background warm-up, until warm-up completes.
+"""
+
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+WARM_MARKER = "Warm-up complete"
+
+
+def profile_imports(bot_path: str, top: int):
+    bot_path = os.path.abspath(bot_path)
+    code = (
+        "import importlib.util, sys; "
+        f"spec = importlib.util.spec_from_file_location('bot_under_test', {bot_path!r}); "
+        "module = importlib.util.module_from_spec(spec); "
+        "spec.loader.exec_module(module)"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(bot_path),
+        capture_output=True,
+        text=True,
+    )
+
+    self_us = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us[match.group(4).split(".")[0]] += int(match.group(1))
+
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        print(f"⚠️  Import failed with exit code {proc.returncode}; partial profile below")
+
+    total = sum(self_us.values())
+    print(f"Import profile for {os.path.basename(bot_path)}: {total / 1e6:.2f}s total\n")
+    print(f"{'package':<28} | {'seconds':>8} | {'share':>6}")
+    print("-" * 48)
+    for package, us in sorted(self_us.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{package:<28} | {us / 1e6:8.3f} | {us / total:6.1%}")
+
+
+def _port_open(port: int) -> bool:
+    with socket.socket() as s:
+        s.settimeout(0.05)
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+
+def measure_ready(bot_path: str, port: int, timeout: float):
+    bot_path = os.path.abspath(bot_path)
+    with open(bot_path) as f:
+        has_warmup = "start_background_warmup" in f.read()
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", bot_path, "--port", str(port)],
+        cwd=os.path.dirname(bot_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    # Read the raw fd: a non-blocking TextIOWrapper returns None instead of ""
+    fd = proc.stdout.fileno()
+    os.set_blocking(fd, False)
+
+    listening = warm = None
+    output = ""
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                output += os.read(fd, 65536).decode("utf-8", "replace")
+            except BlockingIOError:
+                pass
+            now = time.perf_counter() - start
+            if listening is None and _port_open(port):
+                listening = now
+            if warm is None and WARM_MARKER in output:
+                warm = now
+            if listening is not None and (warm is not None or not has_warmup):
+                break
+            if proc.poll() is not None:
+                print(output[-2000:])
+                break
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    # Entry points without background warm-up are fully loaded once listening
+    return listening, warm if warm is not None else listening
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot startup profiling")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    imports = sub.add_parser("imports", help="Import-time breakdown")
+    imports.add_argument("bot")
+    imports.add_argument("--top", type=int, default=15)
+
+    ready = sub.add_parser("ready", help="Time-to-listen / time-to-ready")
+    ready.add_argument("bot")
+    ready.add_argument("--runs", type=int, default=3)
+    ready.add_argument("--port", type=int, default=7871)
+    ready.add_argument("--timeout", type=float, default=120.0)
+
+    args = parser.parse_args()
+
+    if args.mode == "imports":
+        profile_imports(args.bot, args.top)
+        return
+
+    print(f"{'run':>4} | {'listening s':>11} | {'ready s':>8}")
+    print("-" * 30)
+    for run in range(1, args.runs + 1):
+        listening, warm = measure_ready(args.bot, args.port, args.timeout)
+        fmt = lambda v: f"{v:.2f}" if v is not None else "timeout"
+        print(f"{run:>4} | {fmt(listening):>11} | {fmt(warm):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark compressed STT uploads against a local Whisper stand-in.
+
+Sends every recording through PooledGroqSTTService._transcribe() once per
+upload codec (wav, flac, opus and the auto policy) and reports bytes sent,
+encode time and end-to-end request time per uplink bandwidth.
+
+The stand-in decodes each upload with PyAV (so a broken encoding fails the
+run), then answers after the time the body would take over --uplink-kbps,
+plus --base-ms and --ms-per-sec per second of audio for inference. Loopback
+itself is effectively free, so the uplink is simulated on the server side.
+
+Usage:
+    python bench_stt_upload.py [--wav "recordings/**/user_turn_*.wav"] [--uplink-kbps 500 2000 20000]
+                               [--base-ms 150] [--ms-per-sec 20]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import wave
+
+import av
+from aiohttp import web
+
+from audio_corpus import SAMPLE_RATE, load_corpus
+from client_pool import PooledGroqSTTService
+from stt_upload import UploadPolicy
+
+HTTP_PORT = 18084
+CODECS = ["wav", "flac", "opus", "auto"]
+
+
+async def _start_whisper_standin(uplink: dict, base_ms: float, ms_per_sec: float):
+    async def transcriptions(request):
+        form = await request.post()
+        data = form["file"].file.read()
+        with av.open(io.BytesIO(data)) as container:
+            seconds = sum(frame.samples / frame.sample_rate for frame in container.decode(audio=0))
+        upload_ms = len(data) * 8 / uplink["kbps"]
+        await asyncio.sleep((upload_ms + base_ms + ms_per_sec * seconds) / 1000)
+        return web.json_response({"text": f"{seconds:.1f} seconds of speech"})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/audio/transcriptions", transcriptions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", HTTP_PORT).start()
+    return runner
+
+
+def _wav(audio) -> bytes:
+    content = io.BytesIO()
+    with wave.open(content, "wb") as wav:
+        wav.setsampwidth(2)
+        wav.setnchannels(1)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(audio.tobytes())
+    return content.getvalue()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compressed STT upload benchmark")
+    parser.add_argument("--wav", default="", help="Glob of user_turn_*.wav recordings")
+    parser.add_argument("--uplink-kbps", type=float, nargs="+", default=[500.0, 2000.0, 20000.0])
+    parser.add_argument("--base-ms", type=float, default=150.0)
+    parser.add_argument("--ms-per-sec", type=float, default=20.0)
+    args = parser.parse_args()
+
+    uplink = {"kbps": args.uplink_kbps[0]}
+    runner = await _start_whisper_standin(uplink, args.base_ms, args.ms_per_sec)
+    requests = [_wav(audio) for _, audio in load_corpus(args.wav)]
+    audio_secs = sum((len(r) - 44) / (2 * SAMPLE_RATE) for r in requests)
+    print(f"{len(requests)} requests, {audio_secs:.1f}s of audio\n")
+
+    print(f"{'uplink kbps':>11} | {'codec':<5} | {'KB sent':>8} | {'vs wav':>6} | {'encode ms':>9} | {'e2e ms':>7} | chosen")
+    print("-" * 78)
+    for kbps in args.uplink_kbps:
+        uplink["kbps"] = kbps
+        for codec in CODECS:
+            policy = UploadPolicy(codec=codec, uplink_kbps=kbps)
+            stt = PooledGroqSTTService(
+                api_key="bench",
+                base_url=f"http://127.0.0.1:{HTTP_PORT}/v1",
+                model="whisper-large-v3",
+                upload_policy=policy,
+            )
+            elapsed = []
+            for request in requests:
+                start = time.perf_counter()
+                await stt._transcribe(request)
+                elapsed.append((time.perf_counter() - start) * 1000)
+
+            n = len(requests)
+            chosen = ", ".join(f"{c}:{count}" for c, count in policy.requests.items() if count)
+            print(f"{kbps:>11.0f} | {codec:<5} | {policy.sent_bytes / n / 1024:8.1f} | "
+                  f"{policy.sent_bytes / policy.raw_bytes:6.1%} | {policy.encode_ms / n:9.1f} | "
+                  f"{sum(elapsed) / n:7.0f} | {chosen}")
+        print()
+
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
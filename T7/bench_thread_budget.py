@@ -0,0 +1,112 @@
+"""
+Inference tail latency vs concurrency for different thread budgets.
+
+For each thread setting a fresh ModelRegistry is built, then N caller
+threads (one per simulated session) run Silero windows every 32 ms and
+Smart Turn predictions every --turn-interval-ms, as the analyzers' executor
+threads would. We report p50/p99 latency of each model per setting and
+concurrency. "ort-default" leaves every pool at onnxruntime's default
+(one thread per core), which is what we had before the budget.
+
+Usage:
+    python bench_thread_budget.py [--sessions 1 4 16 64] [--duration 5]
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from model_pool import ModelRegistry, SharedSileroModel
+from thread_budget import ThreadBudget, available_cpus
+
+SAMPLE_RATE = 16000
+
+
+def _settings():
+    cores = len(available_cpus())
+    settings = {
+        "ort-default": ThreadBudget(0, 0, 0, cores),
+        "1/1": ThreadBudget(1, 1, 1, 1),
+        "1/2": ThreadBudget(1, 2, 1, 1),
+    }
+    if cores > 2:
+        settings[f"1/{cores}"] = ThreadBudget(1, cores, 1, 1)
+    return settings
+
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def _run(registry: ModelRegistry, sessions: int, duration: float, turn_interval: float):
+    vad_ms, turn_ms = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+    rng = np.random.default_rng(0)
+    window = (rng.standard_normal(512) * 0.05).astype(np.float32)
+    features = registry.smart_turn_features(
+        (rng.standard_normal(SAMPLE_RATE * 3) * 0.1).astype(np.float32)
+    )
+
+    def vad_session():
+        model = SharedSileroModel(registry.silero_session)
+        local = []
+        next_at = time.perf_counter()
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            model(window, SAMPLE_RATE)
+            local.append((time.perf_counter() - start) * 1000)
+            next_at += 0.032
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+        with lock:
+            vad_ms.extend(local)
+
+    def turn_session(index: int):
+        local = []
+        # Spread the first predictions so sessions do not fire in lockstep
+        time.sleep(turn_interval * index / max(sessions, 1))
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            registry.smart_turn_session.run(None, {"input_features": features})
+            local.append((time.perf_counter() - start) * 1000)
+            time.sleep(turn_interval)
+        with lock:
+            turn_ms.extend(local)
+
+    threads = [threading.Thread(target=vad_session) for _ in range(sessions)]
+    threads += [threading.Thread(target=turn_session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return vad_ms, turn_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference thread budget benchmark")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--turn-interval-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    print(f"{len(available_cpus())} CPUs available; setting = silero/smart-turn intra-op threads\n")
+    print(f"{'setting':>12} | {'sessions':>8} | {'vad p50':>8} | {'vad p99':>8} | "
+          f"{'turn p50':>9} | {'turn p99':>9}   (ms)")
+    print("-" * 72)
+    for label, budget in _settings().items():
+        registry = ModelRegistry(threads=budget, smart_turn_batch_wait_ms=0)
+        registry.warm_up()
+        for sessions in args.sessions:
+            vad_ms, turn_ms = _run(registry, sessions, args.duration, args.turn_interval_ms / 1000)
+            print(f"{label:>12} | {sessions:>8} | {_percentile(vad_ms, 50):8.2f} | "
+                  f"{_percentile(vad_ms, 99):8.2f} | {_percentile(turn_ms, 50):9.1f} | "
+                  f"{_percentile(turn_ms, 99):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for TurnTracingObserver overhead.
+
+Replays a synthetic turn (audio frames interleaved with the VAD/STT/LLM/TTS
+control frames the observer traces) through the observer and reports the
+cost per observed frame push for several sampling ratios.
+
+Usage:
+    python bench_tracing.py [--turns 2000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    InputAudioRawFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    LLMTextFrame,
+    TranscriptionFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.observers.base_observer import FramePushed
+from pipecat.processors.frame_processor import FrameDirection
+
+from tracing import BatchSpanProcessor, InMemorySpanCollector, TurnSampler, TurnTracingObserver
+
+AUDIO_FRAMES_PER_TURN = 200  # ~4s of 20ms input frames
+HOPS_PER_FRAME = 6           # observers see a frame once per processor it passes
+
+
+def _synthetic_turn():
+    audio = b"\x00" * 640
+    frames = [VADUserStartedSpeakingFrame(), UserStartedSpeakingFrame()]
+    frames += [InputAudioRawFrame(audio=audio, sample_rate=16000, num_channels=1)
+               for _ in range(AUDIO_FRAMES_PER_TURN)]
+    frames += [
+        VADUserStoppedSpeakingFrame(),
+        UserStoppedSpeakingFrame(),
+        TranscriptionFrame(text="a large chicken tikka pizza please", user_id="", timestamp=""),
+        LLMFullResponseStartFrame(),
+        FunctionCallInProgressFrame(function_name="add_item", tool_call_id="call_1", arguments={}),
+        FunctionCallResultFrame(function_name="add_item", tool_call_id="call_1", arguments={}, result={}),
+        *[LLMTextFrame(text="word ") for _ in range(20)],
+        LLMFullResponseEndFrame(),
+        TTSStartedFrame(),
+        BotStartedSpeakingFrame(),
+        TTSStoppedFrame(),
+        BotStoppedSpeakingFrame(),
+    ]
+    return frames
+
+
+async def _run(turns: int, ratio):
+    collector = InMemorySpanCollector()
+    processor = BatchSpanProcessor(collector)
+    observer = None
+    if ratio is not None:
+        observer = TurnTracingObserver(processor, session_id="bench", sampler=TurnSampler(ratio))
+
+    pushes = 0
+    elapsed = 0.0
+    for _ in range(turns):
+        # Fresh frames every turn so frame ids are unique, as in a real session
+        events = [
+            FramePushed(source=None, destination=None, frame=frame,
+                        direction=FrameDirection.DOWNSTREAM, timestamp=0)
+            for frame in _synthetic_turn()
+        ]
+        start = time.perf_counter()
+        for event in events:
+            for _ in range(HOPS_PER_FRAME):
+                if observer is not None:
+                    await observer.on_push_frame(event)
+                pushes += 1
+        elapsed += time.perf_counter() - start
+
+    processor.shutdown()
+    return elapsed, pushes, len(collector.spans)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Tracing overhead benchmark")
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'sampling':>10} | {'ns/push':>8} | {'us/turn':>8} | {'spans':>7}")
+    print("-" * 44)
+    for ratio in (None, 0.0, 0.1, 1.0):
+        elapsed, pushes, spans = await _run(args.turns, ratio)
+        label = "off" if ratio is None else f"{ratio:.0%}"
+        print(f"{label:>10} | {elapsed / pushes * 1e9:8.0f} | "
+              f"{elapsed / args.turns * 1e6:8.1f} | {spans:7d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
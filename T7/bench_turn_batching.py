@@ -0,0 +1,100 @@
+"""
+Smart Turn throughput vs added latency, direct calls vs micro-batching.
+
+Each simulated session is a thread (like the analyzer's executor thread)
+that issues end-of-turn predictions on precomputed features, pausing
+--think-ms between requests. For each concurrency level we run the shared
+session directly and through MicroBatcher at several max-wait settings, and
+report predictions per second and per-call latency percentiles.
+
+Usage:
+    python bench_turn_batching.py [--sessions 1 10 50 100] [--waits 1 3 10] [--duration 5]
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from batching import MicroBatcher
+from model_pool import ModelRegistry
+
+SAMPLE_RATE = 16000
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def _run(predict, features, sessions: int, duration: float, think_secs: float):
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def session(index: int):
+        local = []
+        i = index
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            predict(features[i % len(features)])
+            local.append((time.perf_counter() - start) * 1000)
+            i += 1
+            if think_secs:
+                time.sleep(think_secs)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart Turn batching benchmark")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--waits", type=float, nargs="+", default=[1.0, 3.0, 10.0],
+                        help="Batcher max-wait settings in ms")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--think-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(smart_turn_batch_wait_ms=0)
+    registry.warm_up()
+    rng = np.random.default_rng(0)
+    features = [
+        registry.smart_turn_features((rng.standard_normal(SAMPLE_RATE * 3) * 0.1).astype(np.float32))
+        for _ in range(16)
+    ]
+
+    modes = [("direct", registry.smart_turn_probability)]
+    batchers = []
+    for wait in args.waits:
+        batcher = MicroBatcher(registry._run_smart_turn_batch, max_batch=args.max_batch,
+                               max_wait_ms=wait, name=f"batch-{wait}")
+        batchers.append(batcher)
+        modes.append((f"wait {wait:g}ms", batcher.submit))
+
+    print(f"{'mode':>12} | {'sessions':>8} | {'pred/s':>8} | {'p50 ms':>7} | {'p99 ms':>7} | {'mean batch':>10}")
+    print("-" * 68)
+    for sessions in args.sessions:
+        for (label, predict), batcher in zip(modes, [None] + batchers):
+            before = (batcher.batches, batcher.items) if batcher else (0, 0)
+            throughput, latencies = _run(predict, features, sessions, args.duration,
+                                         args.think_ms / 1000)
+            mean_batch = "-"
+            if batcher and batcher.batches > before[0]:
+                mean_batch = f"{(batcher.items - before[1]) / (batcher.batches - before[0]):.1f}"
+            print(f"{label:>12} | {sessions:>8} | {throughput:8.1f} | {_percentile(latencies, 50):7.1f} | "
+                  f"{_percentile(latencies, 99):7.1f} | {mean_batch:>10}")
+
+
+if __name__ == "__main__":
+    main()
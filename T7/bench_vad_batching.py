@@ -0,0 +1,104 @@
+"""
+CPU per audio-second for Silero VAD, per-session calls vs batched.
+
+N sessions each run their own SharedSileroVADAnalyzer over the corpus
+(recorded user turns, or synthetic speech when none are given), fed in
+lockstep one 32 ms window per tick as fast as the process allows. For each
+session count we report process CPU seconds per second of audio analyzed,
+and check that the batched path produced the same VAD states and the same
+confidences as the per-session path.
+
+Usage:
+    python bench_vad_batching.py [--sessions 1 10 50 100] [--wav "recordings/**/user_turn_*.wav"]
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from pipecat.audio.vad.vad_analyzer import VADParams
+
+from audio_corpus import SAMPLE_RATE, load_corpus
+from model_pool import ModelRegistry, SharedSileroVADAnalyzer
+
+CHUNK_SAMPLES = 512
+
+
+def _make_analyzer(registry: ModelRegistry, confidences: list) -> SharedSileroVADAnalyzer:
+    vad = SharedSileroVADAnalyzer(params=VADParams(stop_secs=0.2), registry=registry)
+    vad.set_sample_rate(SAMPLE_RATE)
+    # Periodic state resets are wall-clock based; disable them so both runs
+    # see identical state histories regardless of how fast they go
+    vad._last_reset_time = float("inf")
+
+    voice_confidence = vad.voice_confidence
+
+    def recording_confidence(buffer):
+        confidence = voice_confidence(buffer)
+        confidences.append(float(np.ravel(confidence)[0]))
+        return confidence
+
+    vad.voice_confidence = recording_confidence
+    return vad
+
+
+async def _run(registry: ModelRegistry, audio: np.ndarray, sessions: int, seconds: float):
+    confidences = [[] for _ in range(sessions)]
+    analyzers = [_make_analyzer(registry, confidences[i]) for i in range(sessions)]
+    ticks = int(seconds * SAMPLE_RATE / CHUNK_SAMPLES)
+    # Different sessions start at different points of the corpus
+    offsets = [(i * 7919 * CHUNK_SAMPLES) % len(audio) for i in range(sessions)]
+    looped = np.concatenate([audio, audio])
+
+    states = [[] for _ in range(sessions)]
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for tick in range(ticks):
+        chunks = []
+        for offset in offsets:
+            start = (offset + tick * CHUNK_SAMPLES) % len(audio)
+            chunks.append(looped[start:start + CHUNK_SAMPLES].tobytes())
+        results = await asyncio.gather(*(vad.analyze_audio(c) for vad, c in zip(analyzers, chunks)))
+        for i, state in enumerate(results):
+            states[i].append(state)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    audio_secs = sessions * ticks * CHUNK_SAMPLES / SAMPLE_RATE
+    return cpu / audio_secs, wall, states, confidences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Silero VAD batching benchmark")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--seconds", type=float, default=10.0, help="Audio seconds per session")
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    parser.add_argument("--wav", default="", help="Glob of user_turn_*.wav recordings")
+    args = parser.parse_args()
+
+    audio = np.concatenate([a for _, a in load_corpus(args.wav)])
+    direct = ModelRegistry(silero_batch_wait_ms=0)
+    batched = ModelRegistry(silero_batch_wait_ms=args.wait_ms, silero_max_batch=max(args.sessions))
+    direct.warm_up()
+    batched.warm_up()
+
+    print(f"{'sessions':>8} | {'direct cpu/s':>12} | {'batched cpu/s':>13} | {'saving':>7} | "
+          f"{'mean batch':>10} | {'states equal':>12} | {'max |Δconf|':>11}")
+    print("-" * 92)
+    for sessions in args.sessions:
+        d_cpu, _, d_states, d_conf = asyncio.run(_run(direct, audio, sessions, args.seconds))
+        before = (batched.silero_batcher.batches, batched.silero_batcher.items)
+        b_cpu, _, b_states, b_conf = asyncio.run(_run(batched, audio, sessions, args.seconds))
+        batches = batched.silero_batcher.batches - before[0]
+        items = batched.silero_batcher.items - before[1]
+
+        max_diff = max(
+            float(np.max(np.abs(np.array(d) - np.array(b)))) for d, b in zip(d_conf, b_conf)
+        )
+        print(f"{sessions:>8} | {d_cpu:12.4f} | {b_cpu:13.4f} | {1 - b_cpu / d_cpu:7.1%} | "
+              f"{items / max(batches, 1):10.1f} | {str(d_states == b_states):>12} | {max_diff:11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Clause-first text chunking between the LLM and TTS.
+
+The TTS service only starts on a full sentence: every LLM reply waits for
+its first ".", "!" or "?" before Cartesia is asked for audio. Replies here
+usually open with a long sentence ("Sure, the Zinger Burger is 550 rupees
+and it comes with fries."), so time to first audio carries the whole first
+sentence's worth of LLM tokens. ClauseTextAggregator changes where replies
+are cut:
+
+- The first chunk of a reply is cut at the first clause boundary once it
+  has first_min_words words: after a comma, semicolon, colon or dash, or
+  before a conjunction ("and", "but", "so", "because", ...). A sentence end
+  cuts it regardless of length, and with no boundary at all it is cut at
+  first_max_words words.
+- Later chunks are cut only at sentence ends, and only once they hold
+  min_words words, so short sentences are merged. Cartesia gets fewer,
+  longer inputs to plan intonation over while the first chunk is playing.
+
+A boundary is only taken when whitespace follows it, so "$29.95" and
+"1,500" are never split, and common abbreviations ("Mr.", "Rs.") do not end
+sentences. Text inside an unclosed <tag> is never split.
+
+create_text_processor() wraps the aggregator in pipecat's LLMTextProcessor,
+placed between the LLM and TTS. TTS_CHUNKING=clause turns it on (default:
+sentence, unchanged behaviour); TTS_FIRST_CHUNK_MIN_WORDS,
+TTS_FIRST_CHUNK_MAX_WORDS and TTS_CHUNK_MIN_WORDS tune it. split_chunks()
+gives the chunks a finished text produces, for pre-synthesis (presynth.py).
+bench_clause_aggregator.py measures the effect on time to first audio.
+"""
+
+import os
+from typing import AsyncIterator, List, Optional
+
+from pipecat.processors.aggregators.llm_text_processor import LLMTextProcessor
+from pipecat.utils.text.base_text_aggregator import Aggregation, AggregationType, BaseTextAggregator
+
+FIRST_MIN_WORDS = 3
+FIRST_MAX_WORDS = 10
+MIN_WORDS = 12
+
+_SENTENCE_END = ".!?"
+_CLAUSE_END = ",;:—–"
+_CLOSING = "\"')]”’"
+_CONJUNCTIONS = frozenset({"and", "but", "or", "so", "because", "then", "which", "who", "while", "although"})
+_ABBREVIATIONS = frozenset({"mr", "mrs", "ms", "dr", "st", "rs", "no", "vs"})
+
+
+class ClauseTextAggregator(BaseTextAggregator):
+    """
+    Cuts the first chunk of a reply at a clause, the rest at sentence ends.
+
+    Args:
+        first_min_words: Words the first chunk needs before a clause boundary cuts it
+        first_max_words: Words after which the first chunk is cut without a boundary
+        min_words: Words a later chunk needs before a sentence end cuts it
+    """
+
+    def __init__(
+        self,
+        first_min_words: int = FIRST_MIN_WORDS,
+        first_max_words: int = FIRST_MAX_WORDS,
+        min_words: int = MIN_WORDS,
+    ):
+        self.first_min_words = first_min_words
+        self.first_max_words = first_max_words
+        self.min_words = min_words
+
+        self._text = ""
+        self._first = True
+
+    @property
+    def text(self) -> Aggregation:
+        return Aggregation(text=self._text.strip(" "), type=AggregationType.SENTENCE)
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text, return the chunks it completes."""
+        chunks = []
+        for char in text:
+            self._text += char
+            cut = self._cut_point(char)
+            if cut:
+                chunk, self._text = self._text[:cut], self._text[cut:]
+                if chunk.strip():
+                    chunks.append(chunk.strip(" "))
+                    self._first = False
+        return chunks
+
+    def _cut_point(self, char: str) -> Optional[int]:
+        """Where to cut the buffer, checked at the first whitespace after a word."""
+        if not char.isspace():
+            return None
+        head = self._text[:-1]
+        if not head or head[-1].isspace() or head.rfind("<") > head.rfind(">"):
+            return None
+
+        words = head.split()
+        end = head.rstrip(_CLOSING)[-1:]
+        if end and end in _SENTENCE_END:
+            if words[-1].rstrip(_SENTENCE_END + _CLOSING).lower() in _ABBREVIATIONS:
+                return None
+            return len(head) if self._first or len(words) >= self.min_words else None
+        if not self._first:
+            return None
+        if end and end in _CLAUSE_END and len(words) >= self.first_min_words:
+            return len(head)
+        if words[-1].lower() in _CONJUNCTIONS and len(words) - 1 >= self.first_min_words:
+            return len(head) - len(words[-1])
+        if len(words) >= self.first_max_words:
+            return len(head)
+        return None
+
+    async def aggregate(self, text: str) -> AsyncIterator[Aggregation]:
+        for chunk in self.feed(text):
+            yield Aggregation(text=chunk, type=AggregationType.SENTENCE)
+
+    async def flush(self) -> Optional[Aggregation]:
+        """End of the reply: return what is left and start over for the next one."""
+        remaining = self._text.strip(" ")
+        await self.reset()
+        if remaining.strip():
+            return Aggregation(text=remaining, type=AggregationType.SENTENCE)
+        return None
+
+    async def handle_interruption(self):
+        await self.reset()
+
+    async def reset(self):
+        self._text = ""
+        self._first = True
+
+
+def chunking_params() -> Optional[dict]:
+    """Aggregator settings from the environment, or None when TTS_CHUNKING is not "clause"."""
+    if os.getenv("TTS_CHUNKING", "sentence") != "clause":
+        return None
+    return {
+        "first_min_words": int(os.getenv("TTS_FIRST_CHUNK_MIN_WORDS", str(FIRST_MIN_WORDS))),
+        "first_max_words": int(os.getenv("TTS_FIRST_CHUNK_MAX_WORDS", str(FIRST_MAX_WORDS))),
+        "min_words": int(os.getenv("TTS_CHUNK_MIN_WORDS", str(MIN_WORDS))),
+    }
+
+
+def split_chunks(text: str, **params) -> List[str]:
+    """The chunks one complete reply is sent to TTS in."""
+    aggregator = ClauseTextAggregator(**params)
+    chunks = aggregator.feed(text)
+    remaining = aggregator._text.strip()
+    return chunks + [remaining] if remaining else chunks
+
+
+def create_text_processor() -> Optional[LLMTextProcessor]:
+    """Per-session LLM -> TTS chunker, or None to keep the TTS service's sentence aggregation."""
+    params = chunking_params()
+    if params is None:
+        return None
+    return LLMTextProcessor(text_aggregator=ClauseTextAggregator(**params))
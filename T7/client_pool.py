@@ -0,0 +1,393 @@
+"""
+Process-wide client pool for Groq (STT + LLM) and Cartesia (TTS).
+
+GroqSTTService, GroqLLMService and CartesiaTTSService are built fresh for
+every connection, so each new caller pays DNS + TCP + TLS (and for Cartesia
+a WebSocket upgrade) on the first turn. This module keeps those connections
+warm across sessions:
+
+- HTTP: one httpx.AsyncClient per base URL (HTTP/2 when the optional `h2`
+  package is installed, HTTP/1.1 keep-alive otherwise) wrapped in a shared
+  AsyncOpenAI client. A background health check hits GET /models so idle
+  keep-alive connections are refreshed instead of expiring.
+- WebSocket: a small set of pre-opened Cartesia sockets. A session leases
+  one when its TTS service starts; the lease is consumed (the session closes
+  the socket as usual) and the pool refills in the background. Idle sockets
+  older than max_idle_secs are evicted and pings weed out dead ones.
+  PooledCartesiaTTSService also serves repeated phrases from the TTS phrase
+  cache (tts_cache.py) without touching the socket at all.
+
+PooledGroqSTTService can also compress its uploads (stt_upload.py) and
+keep short utterances on a local Whisper (local_stt.py).
+
+All endpoints are plain constructor arguments, so the pool can be pointed at
+local stand-in servers (see bench_client_pool.py).
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+from websockets.asyncio.client import ClientConnection
+from websockets.asyncio.client import connect as websocket_connect
+from websockets.protocol import State
+
+from pipecat.frames.frames import (
+    AudioRawFrame,
+    Frame,
+    UserStartedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.groq.llm import GroqLLMService
+from pipecat.services.groq.stt import GroqSTTService
+
+from local_stt import LocalSTTRouter
+from stt_upload import UploadPolicy
+from tts_cache import CachedCartesiaTTSService
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ModuleNotFoundError:
+    HTTP2_AVAILABLE = False
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+CARTESIA_WS_URL = "wss://api.cartesia.ai/tts/websocket"
+CARTESIA_VERSION = "2025-04-16"
+
+
+# ============================================================================
+# HTTP CLIENTS (Groq STT / LLM)
+# ============================================================================
+
+class HTTPClientPool:
+    """
+    Shared AsyncOpenAI clients keyed by (base_url, api_key).
+
+    Args:
+        keepalive_expiry: Seconds an idle connection is kept open
+        max_keepalive_connections: Idle connections retained per client
+        health_interval_secs: Period of the background GET /models check
+    """
+
+    def __init__(
+        self,
+        keepalive_expiry: float = 120.0,
+        max_keepalive_connections: int = 32,
+        health_interval_secs: float = 30.0,
+    ):
+        self.keepalive_expiry = keepalive_expiry
+        self.max_keepalive_connections = max_keepalive_connections
+        self.health_interval_secs = health_interval_secs
+
+        self._clients: Dict[tuple, AsyncOpenAI] = {}
+        self.healthy: Dict[str, bool] = {}
+
+    def get(self, api_key: Optional[str], base_url: str = GROQ_BASE_URL) -> AsyncOpenAI:
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    max_connections=1000,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+            )
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            self._clients[key] = client
+        return client
+
+    async def check(self, client: AsyncOpenAI) -> bool:
+        """One lightweight authenticated request; also (re)opens the connection."""
+        base_url = str(client.base_url)
+        try:
+            await client.models.list()
+            self.healthy[base_url] = True
+        except Exception as e:
+            logger.warning(f"HTTP pool health check failed for {base_url}: {e}")
+            self.healthy[base_url] = False
+        return self.healthy[base_url]
+
+    async def warm_up(self):
+        await asyncio.gather(*(self.check(c) for c in self._clients.values()))
+
+    async def run_health_checks(self):
+        while True:
+            await asyncio.sleep(self.health_interval_secs)
+            await self.warm_up()
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+
+
+# ============================================================================
+# WEBSOCKET CONNECTIONS (Cartesia TTS)
+# ============================================================================
+
+@dataclass
+class _IdleSocket:
+    websocket: ClientConnection
+    opened_at: float
+
+
+class WebSocketPool:
+    """
+    Pre-opened WebSocket connections handed out as single-use leases.
+
+    Args:
+        url: Full WebSocket URL including auth query parameters
+        size: Number of idle connections to keep ready
+        max_idle_secs: Idle connections older than this are closed and replaced
+            (keep it below the server's idle timeout)
+        health_interval_secs: Period of ping checks and refills
+    """
+
+    def __init__(
+        self,
+        url: str,
+        size: int = 2,
+        max_idle_secs: float = 240.0,
+        health_interval_secs: float = 15.0,
+    ):
+        self.url = url
+        self.size = size
+        self.max_idle_secs = max_idle_secs
+        self.health_interval_secs = health_interval_secs
+
+        self.leases = 0
+        self.misses = 0
+        self.evictions = 0
+        self._idle: List[_IdleSocket] = []
+        self._refill_lock = asyncio.Lock()
+
+    def acquire_nowait(self) -> Optional[ClientConnection]:
+        """Lease an open connection, or None if the pool is empty."""
+        while self._idle:
+            entry = self._idle.pop()
+            if entry.websocket.state is State.OPEN:
+                self.leases += 1
+                asyncio.get_running_loop().create_task(self.refill())
+                return entry.websocket
+        self.misses += 1
+        asyncio.get_running_loop().create_task(self.refill())
+        return None
+
+    async def refill(self):
+        async with self._refill_lock:
+            while len(self._idle) < self.size:
+                try:
+                    websocket = await websocket_connect(self.url)
+                except Exception as e:
+                    logger.warning(f"WebSocket pool could not pre-open connection: {e}")
+                    return
+                self._idle.append(_IdleSocket(websocket, time.monotonic()))
+
+    async def check(self):
+        """Drop dead or stale connections, then top the pool back up."""
+        now = time.monotonic()
+        # Iterate over a snapshot: sessions may lease sockets while we await pings
+        for entry in list(self._idle):
+            alive = False
+            if now - entry.opened_at <= self.max_idle_secs and entry.websocket.state is State.OPEN:
+                try:
+                    pong = await entry.websocket.ping()
+                    await asyncio.wait_for(pong, timeout=2.0)
+                    alive = True
+                except Exception:
+                    pass
+            if not alive and entry in self._idle:
+                self._idle.remove(entry)
+                self.evictions += 1
+                await entry.websocket.close()
+        await self.refill()
+
+    async def run_health_checks(self):
+        while True:
+            await asyncio.sleep(self.health_interval_secs)
+            await self.check()
+
+    async def close(self):
+        for entry in self._idle:
+            await entry.websocket.close()
+        self._idle.clear()
+
+
+# ============================================================================
+# PROCESS-WIDE POOL
+# ============================================================================
+
+class ClientPool:
+    """HTTP clients and TTS sockets shared by every session in this process."""
+
+    def __init__(self, http: HTTPClientPool, tts: Optional[WebSocketPool] = None):
+        self.http = http
+        self.tts = tts
+        self._tasks: List[asyncio.Task] = []
+        self._start_task: Optional[asyncio.Task] = None
+
+    async def start(self, groq_api_key: Optional[str] = None, groq_base_url: str = GROQ_BASE_URL):
+        """Open the initial connections and start background health checks."""
+        if groq_api_key:
+            self.http.get(groq_api_key, groq_base_url)
+        await self.http.warm_up()
+        self._tasks.append(asyncio.create_task(self.http.run_health_checks()))
+        if self.tts:
+            await self.tts.refill()
+            self._tasks.append(asyncio.create_task(self.tts.run_health_checks()))
+
+    def ensure_started(self, groq_api_key: Optional[str] = None):
+        """Start the pool in the background on first call; later calls are no-ops."""
+        if self._start_task is None:
+            self._start_task = asyncio.get_running_loop().create_task(self.start(groq_api_key))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await self.http.close()
+        if self.tts:
+            await self.tts.close()
+
+
+_pool: Optional[ClientPool] = None
+
+
+def get_client_pool() -> ClientPool:
+    """
+    Return the process-wide pool. The Cartesia socket pool is enabled when
+    CARTESIA_API_KEY is set; TTS_POOL_SIZE controls how many sockets are
+    kept open (default: 2).
+    """
+    global _pool
+    if _pool is None:
+        tts_pool = None
+        cartesia_key = os.getenv("CARTESIA_API_KEY")
+        if cartesia_key:
+            tts_pool = WebSocketPool(
+                f"{CARTESIA_WS_URL}?api_key={cartesia_key}&cartesia_version={CARTESIA_VERSION}",
+                size=int(os.getenv("TTS_POOL_SIZE", "2")),
+            )
+        _pool = ClientPool(HTTPClientPool(), tts_pool)
+    return _pool
+
+
+# ============================================================================
+# POOLED SERVICES
+# ============================================================================
+
+class PooledGroqSTTService(GroqSTTService):
+    """
+    GroqSTTService whose Whisper requests go through the shared HTTP client.
+
+    Args:
+        upload_policy: Re-encodes each request's audio (FLAC / Opus) before
+            upload; None sends WAV as GroqSTTService does
+        local_router: Transcribes short utterances on the local model
+            instead; None sends everything to Groq. Utterances are measured
+            in speech (VAD start to VAD stop), not in buffered audio, which
+            also holds the pre-roll and the silence before the end of turn
+    """
+
+    def __init__(
+        self,
+        *,
+        upload_policy: Optional[UploadPolicy] = None,
+        local_router: Optional[LocalSTTRouter] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._upload_policy = upload_policy
+        self._local_router = local_router
+        self._vad_speaking = False
+        self._speech_bytes = 0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, UserStartedSpeakingFrame) and not frame.emulated:
+            self._speech_bytes = 0
+        elif isinstance(frame, VADUserStartedSpeakingFrame):
+            self._vad_speaking = True
+        elif isinstance(frame, VADUserStoppedSpeakingFrame):
+            self._vad_speaking = False
+        await super().process_frame(frame, direction)
+
+    async def process_audio_frame(self, frame: AudioRawFrame, direction: FrameDirection):
+        await super().process_audio_frame(frame, direction)
+        if self._vad_speaking:
+            self._speech_bytes += len(frame.audio)
+
+    def speech_secs(self) -> Optional[float]:
+        """Speech in the current turn so far, or None if no VAD speech was seen."""
+        if not self._speech_bytes:
+            return None
+        return self._speech_bytes / (self.sample_rate * 2)
+
+    def _create_client(self, api_key: Optional[str], base_url: Optional[str]):
+        return get_client_pool().http.get(api_key, base_url or GROQ_BASE_URL)
+
+    async def _transcribe(self, audio: bytes, speech_secs: Optional[float] = None):
+        """
+        Args:
+            audio: WAV of the request
+            speech_secs: Speech the local router decides on; defaults to the
+                current turn's (speech_secs()), or the audio's length
+                outside a pipeline
+        """
+        if self._local_router is not None:
+            if speech_secs is None:
+                speech_secs = self.speech_secs()
+            response = await self._local_router.transcribe(audio, speech_secs)
+            if response is not None:
+                return response
+
+        if self._upload_policy is None:
+            return await super()._transcribe(audio)
+
+        encoded = await asyncio.to_thread(self._upload_policy.encode, audio)
+        kwargs = {
+            "file": (encoded.filename, encoded.data, encoded.content_type),
+            "model": self.model_name,
+            "response_format": "verbose_json" if self._include_prob_metrics else "json",
+            "language": self._language,
+        }
+        if self._prompt is not None:
+            kwargs["prompt"] = self._prompt
+        if self._temperature is not None:
+            kwargs["temperature"] = self._temperature
+        return await self._client.audio.transcriptions.create(**kwargs)
+
+
+class PooledGroqLLMService(GroqLLMService):
+    """GroqLLMService whose completions go through the shared HTTP client."""
+
+    def create_client(self, api_key=None, base_url=None, **kwargs):
+        return get_client_pool().http.get(api_key, base_url or GROQ_BASE_URL)
+
+
+class PooledCartesiaTTSService(CachedCartesiaTTSService):
+    """
+    CachedCartesiaTTSService that starts on a pre-opened socket when one is
+    available, falling back to a normal connect otherwise.
+    """
+
+    async def _connect_websocket(self):
+        pool = get_client_pool().tts
+        if pool is not None and not (self._websocket and self._websocket.state is State.OPEN):
+            websocket = pool.acquire_nowait()
+            if websocket is not None:
+                logger.debug("Using pre-opened Cartesia connection")
+                self._websocket = websocket
+                await self._call_event_handler("on_connected")
+                return
+        await super()._connect_websocket()
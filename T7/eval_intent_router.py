@@ -0,0 +1,167 @@
+"""
+Offline evaluation of the greet node's keyword fast path.
+
+Classifies recorded transcripts with GREET_CLASSIFIER and reports:
+
+- coverage: share of transcripts routed locally (the rest go to the LLM)
+- accuracy of the local routes against the labels, and a per-intent
+  breakdown of routed / correct / fell back
+- classifier latency per transcript
+- latency saved: each routed transcript skips the router's LLM call. Its
+  cost is taken from traced turns (traces/spans.jsonl): the first "llm"
+  span of turns that started on the router node and left it.
+
+Transcripts are JSON lines {"text": ..., "label": <function or "none">}.
+SessionObserver's conversation_metrics.json files are read as well; their
+user turns have no label and only count towards coverage. Without any
+file a small built-in set of example requests is used.
+
+Usage:
+    python eval_intent_router.py [--transcripts "labels/*.jsonl" "Recordings/**/conversation_metrics.json"]
+                                 [--spans traces/spans.jsonl] [--min-confidence 0.5]
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from intent_router import DEFAULT_MIN_CONFIDENCE, IntentClassifier
+from nodes import GREET_INTENTS, create_greet_node
+
+EXAMPLES = [
+    ("Hi, can I see the menu please?", "go_to_menu"),
+    ("What do you have for vegetarians?", "go_to_menu"),
+    ("What's on the menu today", "go_to_menu"),
+    ("Do you have any specials tonight?", "go_to_menu"),
+    ("I'd like to place an order for pickup", "go_to_order"),
+    ("I want to order two pizzas", "go_to_order"),
+    ("Can I get some takeout", "go_to_order"),
+    ("Hey, I'd like to order some food", "go_to_order"),
+    ("Where is my order? It's order number 4521", "go_to_status"),
+    ("Can you check on my order, order 1187", "go_to_status"),
+    ("Where's my order", "go_to_status"),
+    ("I want to track my order", "go_to_status"),
+    ("I want to book a table for four tonight", "go_to_reserve"),
+    ("Can I make a reservation for Friday at 7", "go_to_reserve"),
+    ("Table for two at eight please", "go_to_reserve"),
+    ("Can I talk to a real person", "go_to_human"),
+    ("Get me a manager", "go_to_human"),
+    ("I need to speak to someone", "go_to_human"),
+    ("Hello", "none"),
+    ("Hi there, how are you?", "none"),
+    ("Yes", "none"),
+    ("I'd like to order something from the menu", "go_to_order"),
+    ("Is my order ready? Order 33", "go_to_status"),
+    ("Can I reserve a table and see the menu", "go_to_reserve"),
+]
+
+
+def load_transcripts(patterns: List[str]) -> List[Tuple[str, Optional[str]]]:
+    transcripts = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            if path.endswith(".jsonl"):
+                with open(path) as f:
+                    for line in f:
+                        if line.strip():
+                            row = json.loads(line)
+                            transcripts.append((row["text"], row.get("label")))
+            else:
+                with open(path) as f:
+                    turns = json.load(f)
+                transcripts.extend((t["user_transcript"], None) for t in turns if t.get("user_transcript"))
+    return transcripts
+
+
+def router_llm_ms(spans_path: str, router_node: str) -> List[float]:
+    """Duration of the router's LLM call in turns that transitioned out of it."""
+    if not os.path.exists(spans_path):
+        return []
+    spans = []
+    with open(spans_path) as f:
+        for line in f:
+            if line.strip():
+                spans.append(json.loads(line))
+    left_router = {
+        s["span_id"] for s in spans
+        if s["name"] == "turn"
+        and s["attributes"].get("flow.node") == router_node
+        and s["attributes"].get("flow.node.end") not in (None, router_node)
+    }
+    first_llm = {}
+    for s in spans:
+        if s["name"] == "llm" and s["parent_span_id"] in left_router and s["duration_ms"] is not None:
+            current = first_llm.get(s["parent_span_id"])
+            if current is None or s["start_time_unix_nano"] < current["start_time_unix_nano"]:
+                first_llm[s["parent_span_id"]] = s
+    return [s["duration_ms"] for s in first_llm.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intent fast path evaluation")
+    parser.add_argument("--transcripts", nargs="*", default=[], help="Globs of labelled .jsonl / conversation_metrics.json")
+    parser.add_argument("--spans", default=os.path.join(os.path.dirname(__file__), "traces", "spans.jsonl"))
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    args = parser.parse_args()
+
+    transcripts = load_transcripts(args.transcripts) if args.transcripts else []
+    if not transcripts:
+        print("No transcripts given, using the built-in examples\n")
+        transcripts = EXAMPLES
+
+    classifier = IntentClassifier(GREET_INTENTS, min_confidence=args.min_confidence)
+    classify_us = []
+    per_intent = defaultdict(lambda: {"routed": 0, "correct": 0, "fallback": 0})
+    routed = correct = labelled_routed = 0
+    errors = []
+    for text, label in transcripts:
+        start = time.perf_counter()
+        match = classifier.classify(text)
+        classify_us.append((time.perf_counter() - start) * 1e6)
+        key = label or "(unlabelled)"
+        if classifier.routable(match):
+            routed += 1
+            per_intent[key]["routed"] += 1
+            if label is not None:
+                labelled_routed += 1
+                if match.function == label:
+                    correct += 1
+                    per_intent[key]["correct"] += 1
+                else:
+                    errors.append((text, label, match.function, match.confidence))
+        else:
+            per_intent[key]["fallback"] += 1
+
+    print(f"{'label':<16} | {'routed':>6} | {'correct':>7} | {'to LLM':>6}")
+    print("-" * 46)
+    for label in sorted(per_intent):
+        row = per_intent[label]
+        print(f"{label:<16} | {row['routed']:>6} | {row['correct']:>7} | {row['fallback']:>6}")
+    for text, label, predicted, confidence in errors:
+        print(f"  wrong: [{text}] {label} -> {predicted} ({confidence:.2f})")
+
+    classify_us.sort()
+    print()
+    print(f"transcripts:        {len(transcripts)}")
+    print(f"coverage:           {routed / len(transcripts):.1%} routed locally")
+    if labelled_routed:
+        print(f"accuracy (routed):  {correct / labelled_routed:.1%} ({correct}/{labelled_routed})")
+    print(f"classify p50 / max: {classify_us[len(classify_us) // 2]:.1f} / {classify_us[-1]:.1f} us")
+
+    router_node = create_greet_node()["name"]
+    llm_ms = sorted(router_llm_ms(args.spans, router_node))
+    if llm_ms:
+        median = llm_ms[len(llm_ms) // 2]
+        print(f"router LLM call:    p50 {median:.0f} ms over {len(llm_ms)} traced turns")
+        print(f"latency saved:      ~{median:.0f} ms per routed turn, "
+              f"~{median * routed / len(transcripts):.0f} ms per router turn on average")
+    else:
+        print(f"router LLM call:    no traced '{router_node}' turns in {args.spans}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compare the local Whisper with Groq on recorded user turns.
+
+Transcribes every recording with the local model and with Groq
+whisper-large-v3 (when GROQ_API_KEY is set), and reports per file:
+
+- duration and the routing decision at --max-secs
+- latency of each path (local: in-process inference; Groq: full request)
+- word error rate of the local transcript. The reference is the file's
+  entry in --references (JSON lines {"file": ..., "text": ...}) if given,
+  the Groq transcript otherwise.
+
+The summary gives the share of turns that would stay local and, over
+those turns, median latency of both paths and the local word error rate.
+
+Usage:
+    python eval_local_stt.py --wav "recordings/**/user_turn_*.wav" --model-dir models/whisper-base.en
+                             [--max-secs 2.0] [--references refs.jsonl]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import time
+import wave
+from typing import Dict, List, Optional
+
+from audio_corpus import SAMPLE_RATE, load_corpus
+from local_stt import DEFAULT_MAX_SECS, LocalWhisper
+
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _load_references(path: Optional[str]) -> Dict[str, str]:
+    if not path:
+        return {}
+    references = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                references[os.path.basename(row["file"])] = row["text"]
+    return references
+
+
+async def _groq_transcribe(stt, audio) -> tuple:
+    content = io.BytesIO()
+    with wave.open(content, "wb") as wav:
+        wav.setsampwidth(2)
+        wav.setnchannels(1)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(audio.tobytes())
+
+    start = time.perf_counter()
+    response = await stt._transcribe(content.getvalue())
+    return response.text.strip(), (time.perf_counter() - start) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local vs Groq Whisper comparison")
+    parser.add_argument("--wav", required=True, help="Glob of user_turn_*.wav recordings")
+    parser.add_argument("--model-dir", default=os.getenv("LOCAL_STT_MODEL_DIR"), help="ONNX Whisper export")
+    parser.add_argument("--max-secs", type=float, default=DEFAULT_MAX_SECS)
+    parser.add_argument("--references", default=None, help="JSON lines {file, text}")
+    args = parser.parse_args()
+    if not args.model_dir:
+        parser.error("--model-dir (or LOCAL_STT_MODEL_DIR) is required")
+
+    model = LocalWhisper(args.model_dir)
+    model.warm_up()
+    print(f"Local model loaded in {model.load_time_secs * 1000:.0f} ms\n")
+
+    stt = None
+    if os.getenv("GROQ_API_KEY"):
+        from client_pool import PooledGroqSTTService
+
+        stt = PooledGroqSTTService(api_key=os.getenv("GROQ_API_KEY"), model="whisper-large-v3")
+    else:
+        print("GROQ_API_KEY is not set, comparing against --references only\n")
+    references = _load_references(args.references)
+
+    print(f"{'file':<28} | {'secs':>5} | {'route':<6} | {'local ms':>8} | {'groq ms':>7} | {'WER':>5} | local / reference")
+    print("-" * 110)
+    rows = []
+    for path, audio in load_corpus(args.wav):
+        secs = len(audio) / SAMPLE_RATE
+        start = time.perf_counter()
+        local_text = model.transcribe(audio.astype("float32") / 32768.0)
+        local_ms = (time.perf_counter() - start) * 1000
+
+        groq_text, groq_ms = await _groq_transcribe(stt, audio) if stt else (None, None)
+        reference = references.get(os.path.basename(path), groq_text)
+        wer = word_error_rate(reference, local_text) if reference is not None else None
+
+        route = "local" if secs <= args.max_secs else "groq"
+        rows.append((secs, route, local_ms, groq_ms, wer))
+        print(f"{os.path.basename(path)[-28:]:<28} | {secs:5.1f} | {route:<6} | {local_ms:8.0f} | "
+              f"{groq_ms if groq_ms is not None else float('nan'):7.0f} | "
+              f"{wer if wer is not None else float('nan'):5.2f} | {local_text} / {reference}")
+
+    local_rows = [row for row in rows if row[1] == "local"]
+    median = lambda values: sorted(values)[len(values) // 2] if values else float("nan")
+    print(f"\nrouted locally:     {len(local_rows)}/{len(rows)} turns at <= {args.max_secs}s")
+    if local_rows:
+        print(f"local p50:          {median([r[2] for r in local_rows]):.0f} ms")
+        groq = [r[3] for r in local_rows if r[3] is not None]
+        if groq:
+            print(f"groq p50:           {median(groq):.0f} ms (same turns)")
+        wers = [r[4] for r in local_rows if r[4] is not None]
+        if wers:
+            print(f"local WER:          {sum(wers) / len(wers):.1%} (mean over routed turns)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Offline evaluation of the VAD energy pre-gate.
+
+Runs every recording twice through a VAD analyzer on the shared Silero
+session, once plain and once with an EnergyGate, and reports per file:
+
+- share of model calls the gate saved (skipped windows minus replays)
+- CPU time of each run
+- speech start / stop events found by each run, and how far the gated
+  events moved relative to the plain ones (positive = later)
+
+Usage:
+    python eval_vad_gate.py --wav "recordings/**/user_turn_*.wav" [--silence-db -50] [--hangover 8]
+"""
+
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+
+from audio_corpus import SAMPLE_RATE, load_corpus
+from model_pool import SharedSileroVADAnalyzer, get_model_registry
+from vad_gate import EnergyGate
+
+WINDOW_SAMPLES = 512
+WINDOW_MS = WINDOW_SAMPLES * 1000 / SAMPLE_RATE
+
+
+def _events(states: List[VADState]) -> List[Tuple[str, float]]:
+    """("start"|"stop", ms) transitions into and out of SPEAKING."""
+    events = []
+    speaking = False
+    for i, state in enumerate(states):
+        if not speaking and state == VADState.SPEAKING:
+            speaking = True
+            events.append(("start", i * WINDOW_MS))
+        elif speaking and state == VADState.QUIET:
+            speaking = False
+            events.append(("stop", i * WINDOW_MS))
+    return events
+
+
+def _run(audio: np.ndarray, gate) -> Tuple[List[VADState], float]:
+    vad = SharedSileroVADAnalyzer(params=VADParams(stop_secs=0.2), energy_gate=gate)
+    vad.set_sample_rate(SAMPLE_RATE)
+    vad._last_reset_time = float("inf")  # No wall-clock resets in offline runs
+
+    states = []
+    start = time.process_time()
+    for offset in range(0, len(audio) - WINDOW_SAMPLES + 1, WINDOW_SAMPLES):
+        states.append(vad._run_analyzer(audio[offset:offset + WINDOW_SAMPLES].tobytes()))
+    return states, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD energy gate evaluation")
+    parser.add_argument("--wav", default="", help="Glob of user_turn_*.wav recordings")
+    parser.add_argument("--silence-db", type=float, default=-50.0)
+    parser.add_argument("--noise-margin-db", type=float, default=10.0)
+    parser.add_argument("--noise-zcr", type=float, default=0.35)
+    parser.add_argument("--hangover", type=int, default=8)
+    parser.add_argument("--replay", type=int, default=4)
+    args = parser.parse_args()
+
+    get_model_registry().warm_up()
+
+    print(f"{'file':<28} | {'saved':>7} | {'cpu ms':>7} | {'gated ms':>8} | {'events':>7} | "
+          f"{'start Δms':>9} | {'stop Δms':>8}")
+    print("-" * 90)
+    total_plain = total_gated = 0.0
+    total_windows = total_saved = 0
+    for name, audio in load_corpus(args.wav):
+        gate = EnergyGate(args.silence_db, args.noise_margin_db, args.noise_zcr, args.hangover,
+                          args.replay)
+        plain_states, plain_cpu = _run(audio, None)
+        gated_states, gated_cpu = _run(audio, gate)
+        total_plain += plain_cpu
+        total_gated += gated_cpu
+        total_windows += gate.windows
+        total_saved += gate.windows - gate.inferences
+
+        plain_events, gated_events = _events(plain_states), _events(gated_states)
+        shifts = {"start": [], "stop": []}
+        if [kind for kind, _ in plain_events] == [kind for kind, _ in gated_events]:
+            for (kind, plain_ms), (_, gated_ms) in zip(plain_events, gated_events):
+                shifts[kind].append(gated_ms - plain_ms)
+            events = f"{len(plain_events)}"
+        else:
+            events = f"{len(plain_events)}≠{len(gated_events)}"
+        fmt = lambda xs: f"{max(xs, key=abs):+.0f}" if xs else "-"
+
+        label = name[-28:]
+        print(f"{label:<28} | {1 - gate.inferences / max(gate.windows, 1):7.1%} | {plain_cpu * 1000:7.1f} | "
+              f"{gated_cpu * 1000:8.1f} | {events:>7} | {fmt(shifts['start']):>9} | {fmt(shifts['stop']):>8}")
+
+    print(f"\nSaved {total_saved}/{total_windows} model calls "
+          f"({total_saved / max(total_windows, 1):.1%}); "
+          f"CPU {total_plain * 1000:.0f}ms → {total_gated * 1000:.0f}ms "
+          f"({1 - total_gated / max(total_plain, 1e-9):.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+On-box CPU Whisper for short utterances.
+
+A large share of turns are a few words: "yes", "that's correct", "large
+please". Each still pays a Groq round trip (upload, queueing, inference,
+download) that dwarfs the compute a tiny Whisper needs for one second of
+audio. LocalSTTRouter sends utterances up to max_secs of speech to a local
+model and everything longer to Groq as before:
+
+- LocalWhisper runs an ONNX export of a small Whisper (whisper-tiny.en /
+  base.en, int8-quantized: encoder_model_quantized.onnx and
+  decoder_model_quantized.onnx, next to the tokenizer and preprocessor
+  files) on onnxruntime with the process thread budget. It is loaded and
+  warmed once per process, by warm-up, and shared by every session;
+  InferenceSession.run() is thread-safe.
+- Decoding is greedy and without a KV cache: the decoder re-reads the
+  (short) token sequence at every step. For the handful of tokens a short
+  utterance produces that costs less than carrying the cache through the
+  merged decoder's extra inputs.
+- PooledGroqSTTService asks the router first (see client_pool.py). Local
+  inference runs in a worker thread; if it fails the request goes to Groq.
+
+The router counts local / remote decisions, fallbacks and local latency;
+/health reports them. LOCAL_STT_MODEL_DIR enables it, LOCAL_STT_MAX_SECS
+(default 2.0) sets the cut-off. eval_local_stt.py compares both paths on
+recorded user_turn_*.wav files.
+"""
+
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+import wave
+from collections import deque
+from typing import Deque, List, Optional
+
+import numpy as np
+from loguru import logger
+from openai.types.audio import Transcription
+
+from thread_budget import ThreadBudget, get_thread_budget
+
+SAMPLE_RATE = 16000
+DEFAULT_MAX_SECS = 2.0
+
+# Whisper's decoder context is 448 tokens; speech runs at ~3-5 tokens/second
+MAX_TOKENS = 224
+TOKENS_PER_SEC = 8
+
+
+def _find(model_dir: str, names: List[str]) -> str:
+    for name in names:
+        for folder in (model_dir, os.path.join(model_dir, "onnx")):
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                return path
+    raise FileNotFoundError(f"None of {names} in {model_dir}")
+
+
+def wav_to_float(wav_bytes: bytes) -> np.ndarray:
+    """16-bit mono WAV as 16 kHz float32 in [-1, 1]."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+        sample_rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16).astype(np.float32)
+    if sample_rate != SAMPLE_RATE and len(samples):
+        target = np.linspace(0, len(samples) - 1, int(len(samples) * SAMPLE_RATE / sample_rate))
+        samples = np.interp(target, np.arange(len(samples)), samples)
+    return (samples / 32768.0).astype(np.float32)
+
+
+class LocalWhisper:
+    """
+    Greedy Whisper transcription on onnxruntime.
+
+    Args:
+        model_dir: ONNX export of a Whisper model (encoder/decoder .onnx plus
+            tokenizer and preprocessor_config.json)
+        language: Language token for multilingual models
+        threads: Thread settings (defaults to the process budget)
+    """
+
+    def __init__(self, model_dir: str, language: str = "en", threads: Optional[ThreadBudget] = None):
+        self.model_dir = model_dir
+        self.language = language
+        self.threads = threads or get_thread_budget()
+
+        self.encoder = None
+        self.decoder = None
+        self.feature_extractor = None
+        self.tokenizer = None
+        self.load_time_secs = 0.0
+        self._prompt: List[int] = []
+        self._eos = 0
+        self._suppress: List[int] = []
+        self._begin_suppress: List[int] = []
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.encoder is not None
+
+    def load(self):
+        """Load the model. Safe to call repeatedly and from several threads."""
+        with self._lock:
+            if self.loaded:
+                return
+            import onnxruntime as ort
+            from transformers import WhisperFeatureExtractor, WhisperTokenizer
+
+            start = time.perf_counter()
+            opts = ort.SessionOptions()
+            opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            opts.inter_op_num_threads = self.threads.inter_op_threads
+            opts.intra_op_num_threads = self.threads.whisper_intra_threads
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            encoder = ort.InferenceSession(
+                _find(self.model_dir, ["encoder_model_quantized.onnx", "encoder_model.onnx"]),
+                sess_options=opts,
+                providers=["CPUExecutionProvider"],
+            )
+            self.decoder = ort.InferenceSession(
+                _find(self.model_dir, ["decoder_model_quantized.onnx", "decoder_model.onnx"]),
+                sess_options=opts,
+                providers=["CPUExecutionProvider"],
+            )
+            self.feature_extractor = WhisperFeatureExtractor.from_pretrained(self.model_dir)
+            self.tokenizer = WhisperTokenizer.from_pretrained(self.model_dir)
+
+            with open(os.path.join(self.model_dir, "config.json")) as f:
+                config = json.load(f)
+            token = self.tokenizer.convert_tokens_to_ids
+            self._prompt = [token("<|startoftranscript|>")]
+            if config.get("vocab_size", 0) >= 51865:
+                # Multilingual checkpoints need the language and task; .en ones must not get them
+                self._prompt += [token(f"<|{self.language}|>"), token("<|transcribe|>")]
+            self._prompt.append(token("<|notimestamps|>"))
+            self._eos = token("<|endoftext|>")
+
+            generation_config = os.path.join(self.model_dir, "generation_config.json")
+            if os.path.exists(generation_config):
+                with open(generation_config) as f:
+                    generation = json.load(f)
+                self._suppress = generation.get("suppress_tokens") or []
+                self._begin_suppress = generation.get("begin_suppress_tokens") or []
+
+            self.encoder = encoder
+            self.load_time_secs = time.perf_counter() - start
+            logger.info(f"Local Whisper loaded from {self.model_dir} in {self.load_time_secs * 1000:.0f}ms")
+
+    def warm_up(self):
+        """Load if needed and transcribe a second of silence (first-run arena allocation)."""
+        self.load()
+        self.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        """Text of 16 kHz float32 audio. Blocking."""
+        self.load()
+        features = self.feature_extractor(
+            audio, sampling_rate=SAMPLE_RATE, return_tensors="np"
+        ).input_features.astype(np.float32)
+        hidden = self.encoder.run(None, {"input_features": features})[0]
+
+        tokens = list(self._prompt)
+        max_tokens = min(MAX_TOKENS, 10 + int(len(audio) / SAMPLE_RATE * TOKENS_PER_SEC))
+        for step in range(max_tokens):
+            logits = self.decoder.run(None, {
+                "input_ids": np.array([tokens], dtype=np.int64),
+                "encoder_hidden_states": hidden,
+            })[0][0, -1]
+            logits[self._suppress] = -np.inf
+            if step == 0:
+                logits[self._begin_suppress] = -np.inf
+            token = int(np.argmax(logits))
+            if token == self._eos:
+                break
+            tokens.append(token)
+        return self.tokenizer.decode(tokens[len(self._prompt):], skip_special_tokens=True).strip()
+
+
+class LocalSTTRouter:
+    """
+    Sends short utterances to the local model.
+
+    Args:
+        model: The process's LocalWhisper
+        max_secs: Longest utterance transcribed locally
+    """
+
+    def __init__(self, model: LocalWhisper, max_secs: float = DEFAULT_MAX_SECS):
+        self.model = model
+        self.max_secs = max_secs
+
+        self.local = 0
+        self.remote = 0
+        self.fallbacks = 0
+        self.local_ms: Deque[float] = deque(maxlen=1000)
+
+    def routes_locally(self, speech_secs: float) -> bool:
+        return self.model.loaded and speech_secs <= self.max_secs
+
+    async def transcribe(self, wav_bytes: bytes, speech_secs: Optional[float] = None) -> Optional[Transcription]:
+        """
+        Local transcript, or None when the request should go to the remote service.
+
+        Args:
+            wav_bytes: The request's audio
+            speech_secs: Speech in the whole turn the audio belongs to (VAD
+                start to stop), without the pre-roll and trailing silence
+                the audio also holds; defaults to the audio's length
+        """
+        if speech_secs is None:
+            with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+                speech_secs = wav.getnframes() / wav.getframerate()
+        if not self.routes_locally(speech_secs):
+            self.remote += 1
+            return None
+
+        start = time.perf_counter()
+        try:
+            text = await asyncio.to_thread(lambda: self.model.transcribe(wav_to_float(wav_bytes)))
+        except Exception as e:
+            self.fallbacks += 1
+            logger.warning(f"Local Whisper failed ({e}), using the remote service")
+            return None
+        self.local += 1
+        self.local_ms.append((time.perf_counter() - start) * 1000)
+        return Transcription(text=text)
+
+    def snapshot(self) -> dict:
+        timings = sorted(self.local_ms)
+        return {
+            "max_secs": self.max_secs,
+            "loaded": self.model.loaded,
+            "local": self.local,
+            "remote": self.remote,
+            "fallbacks": self.fallbacks,
+            "p50_local_ms": round(timings[len(timings) // 2], 1) if timings else None,
+        }
+
+
+_router: Optional[LocalSTTRouter] = None
+
+
+def get_local_stt_router() -> Optional[LocalSTTRouter]:
+    """Process-wide router, or None when LOCAL_STT_MODEL_DIR is not set."""
+    global _router
+    model_dir = os.getenv("LOCAL_STT_MODEL_DIR")
+    if not model_dir:
+        return None
+    if _router is None:
+        _router = LocalSTTRouter(
+            LocalWhisper(model_dir),
+            max_secs=float(os.getenv("LOCAL_STT_MAX_SECS", str(DEFAULT_MAX_SECS))),
+        )
+    return _router
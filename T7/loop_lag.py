@@ -0,0 +1,192 @@
+"""
+Event-loop lag measurement and stall detection.
+
+A background task sleeps for a fixed interval and records how late it wakes
+up. That delay is the scheduling lag every other coroutine on the loop (audio
+input/output, VAD, observers) is experiencing at the same moment, so it is a
+direct measure of how overloaded a worker process is.
+
+The lag task can only report a stall after it has ended. To see what caused
+it, a watchdog thread checks the task's heartbeat and, once the loop has
+been blocked for longer than stall_threshold_ms, captures the loop thread's
+current stack: the synchronous call (file write, print, ONNX run) that is
+holding the loop, under the coroutine that made it.
+
+configure_event_loop() selects asyncio or uvloop from BOT_EVENT_LOOP.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class Stall:
+    """One blocked-loop episode seen by the watchdog."""
+
+    started_at: float  # time.time() when the loop last made progress
+    blocked_ms: float  # How long it had been blocked when the stack was taken
+    stack: str
+
+    def to_dict(self) -> dict:
+        return {"started_at": self.started_at, "blocked_ms": round(self.blocked_ms, 1), "stack": self.stack}
+
+
+class LoopLagMonitor:
+    """
+    Periodically samples event-loop scheduling delay.
+
+    Args:
+        interval_secs: Sleep between samples
+        window: Number of recent samples kept for percentiles
+        smoothing: Weight of the newest sample in the moving average
+        stall_threshold_ms: Capture the loop thread's stack once the loop has
+            been blocked this long; None disables the watchdog
+    """
+
+    def __init__(
+        self,
+        interval_secs: float = 0.1,
+        window: int = 600,
+        smoothing: float = 0.2,
+        stall_threshold_ms: Optional[float] = None,
+    ):
+        self.interval_secs = interval_secs
+        self.smoothing = smoothing
+        self.stall_threshold_ms = stall_threshold_ms
+
+        self.lag_ms = 0.0       # Exponential moving average
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.stalls: Deque[Stall] = deque(maxlen=20)
+        self.stall_count = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._heartbeat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop = threading.Event()
+
+    def start(self):
+        if self._task is None:
+            self._heartbeat = time.perf_counter()
+            self._loop_thread_id = threading.get_ident()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            if self.stall_threshold_ms is not None:
+                self._watchdog_stop.clear()
+                self._watchdog = threading.Thread(
+                    target=self._watch, name="loop-watchdog", daemon=True
+                )
+                self._watchdog.start()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog_stop.set()
+            self._watchdog = None
+
+    def percentile(self, p: float) -> float:
+        """p-th percentile (0-100) of the recent samples, in ms."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "lag_ms": round(self.lag_ms, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p90_ms": round(self.percentile(90), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max_lag_ms, 2),
+            "stalls": self.stall_count,
+        }
+
+    def recent_stalls(self) -> List[dict]:
+        return [stall.to_dict() for stall in self.stalls]
+
+    def record(self, lag_ms: float):
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.lag_ms += self.smoothing * (lag_ms - self.lag_ms)
+        self.samples.append(lag_ms)
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval_secs
+            await asyncio.sleep(self.interval_secs)
+            now = time.perf_counter()
+            self._heartbeat = now
+            self.record(max(0.0, (now - expected) * 1000))
+
+    def _watch(self):
+        # The heartbeat is expected every interval_secs; anything beyond that
+        # is time the loop thread spent not returning to the scheduler
+        threshold = self.interval_secs + self.stall_threshold_ms / 1000
+        reported_heartbeat = None
+        while not self._watchdog_stop.wait(min(self.interval_secs, threshold) / 2):
+            heartbeat = self._heartbeat
+            blocked = time.perf_counter() - heartbeat
+            if blocked < threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<loop thread not found>"
+            stall = Stall(
+                started_at=time.time() - blocked,
+                blocked_ms=(blocked - self.interval_secs) * 1000,
+                stack=stack,
+            )
+            self.stalls.append(stall)
+            self.stall_count += 1
+            logger.warning(f"Event loop blocked for {stall.blocked_ms:.0f}ms, stack:\n{stack}")
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """
+    Process-wide monitor, with the stall watchdog configured from
+    LOOP_STALL_MS (0 disables it). Call start() from the loop to run it;
+    starting an already-running monitor is a no-op.
+    """
+    global _monitor
+    if _monitor is None:
+        stall_ms = float(os.getenv("LOOP_STALL_MS", "250"))
+        _monitor = LoopLagMonitor(stall_threshold_ms=stall_ms or None)
+    return _monitor
+
+
+def configure_event_loop(name: Optional[str] = None) -> str:
+    """
+    Select the event loop implementation for this process.
+
+    Reads BOT_EVENT_LOOP ("asyncio" or "uvloop") when name is not given.
+    Falls back to asyncio if uvloop is not installed. Returns the name of the
+    loop in use, in the form uvicorn.run(loop=...) accepts.
+    """
+    name = (name or os.getenv("BOT_EVENT_LOOP", "asyncio")).lower()
+    if name == "uvloop":
+        try:
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return "uvloop"
+        except ImportError:
+            logger.warning("BOT_EVENT_LOOP=uvloop but uvloop is not installed; using asyncio")
+    asyncio.set_event_loop_policy(None)
+    return "asyncio"
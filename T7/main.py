@@ -9,49 +9,24 @@ This bot demonstrates:
 """
 
 import os
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
-# Pipecat services
-from pipecat.services.groq.llm import GroqLLMService
-from pipecat.services.cartesia.tts import CartesiaTTSService
-from pipecat.services.groq.stt import GroqSTTService
-
-# Pipecat observers
-from pipecat.observers.loggers.llm_log_observer import LLMLogObserver
-from pipecat.observers.loggers.transcription_log_observer import TranscriptionLogObserver
-from pipecat.observers.turn_tracking_observer import TurnTrackingObserver
-from pipecat.observers.loggers.user_bot_latency_log_observer import UserBotLatencyLogObserver as LatencyObserver
-
-# Pipecat pipeline components
-from pipecat.pipeline.pipeline import Pipeline
-from pipecat.pipeline.runner import PipelineRunner
-from pipecat.pipeline.task import PipelineParams, PipelineTask
-
-# Pipecat aggregators and context
-from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
-from pipecat.processors.aggregators.llm_context import LLMContext
-
-# Voice Activity Detection
-from pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
-
-# Transport
-from pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
-from pipecat.transports.base_transport import TransportParams
-from pipecat.runner.types import RunnerArguments
-
-# Pipecat Flows
-from pipecat_flows import FlowManager
-
-# Import our nodes
-from nodes import create_greet_node
-
 import pytz
 from datetime import datetime
 
+# Heavy imports (pipecat services, ONNX / torch models) are loaded on a
+# background thread so the runner can start listening right away
+from warmup import start_background_warmup, wait_until_ready
+
+if TYPE_CHECKING:
+    from pipecat.runner.types import RunnerArguments
+    from pipeline_pool import SessionTemplate
+
 load_dotenv()
 
+TTS_VOICE_ID = "79a125e8-cd45-4c13-8a67-188112f4dd22"
+
 
 def _require_env(key: str, fallback_key: str | None = None) -> str:
     """Fetch required API key with optional fallback and raise a clear error if missing."""
@@ -62,45 +37,117 @@ def _require_env(key: str, fallback_key: str | None = None) -> str:
     return value
 
 
-async def bot(runner_args: RunnerArguments):
+def create_session() -> "SessionTemplate":
     """
-    Main bot function that sets up the Pipecat pipeline with Flows.
-    
-    Args:
-        runner_args: WebRTC connection details and configuration
+    Build one session's pipeline, services and flow, everything except the
+    WebRTC connection. Called ahead of time by the pipeline pool.
     """
+    # Pipecat services (pooled connections shared across sessions)
+    from client_pool import (
+        PooledCartesiaTTSService,
+        PooledGroqLLMService,
+        PooledGroqSTTService,
+        get_client_pool,
+    )
+    from clause_aggregator import create_text_processor
+    from local_stt import get_local_stt_router
+    from stt_upload import get_upload_policy
+
+    # Pipecat observers
+    from pipecat.observers.loggers.llm_log_observer import LLMLogObserver
+    from pipecat.observers.loggers.transcription_log_observer import TranscriptionLogObserver
+    from pipecat.observers.turn_tracking_observer import TurnTrackingObserver
+    from pipecat.observers.loggers.user_bot_latency_log_observer import UserBotLatencyLogObserver as LatencyObserver
+
+    # Pipecat pipeline components
+    from pipecat.pipeline.pipeline import Pipeline
+    from pipecat.pipeline.task import PipelineParams, PipelineTask
+
+    # Pipecat aggregators and context
+    from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
+    from pipecat.processors.aggregators.llm_context import LLMContext
+
+    # Voice Activity Detection (shared, pre-warmed models)
+    from pipecat.audio.vad.vad_analyzer import VADParams
+    from model_pool import create_analyzers
+
+    # Transport (connection attached when a caller arrives)
+    from pipecat.transports.base_transport import TransportParams
+    from pipeline_pool import AttachableSmallWebRTCTransport, SessionTemplate
+
+    # Pipecat Flows
+    from pipecat_flows import FlowManager
+
+    # Import our nodes
+    from nodes import GREET_CLASSIFIER, create_greet_node
+    from intent_router import IntentRouter
+
+    # Per-turn tracing
+    from tracing import create_turn_tracer
+
+    # STT + LLM started at VAD stop, used once smart-turn confirms the turn
+    speculative = os.getenv("SPECULATIVE_TURNS") == "1"
+    if speculative:
+        from speculation import SpeculativeGroqLLMService, SpeculativeGroqSTTService
+
+    # Long turns transcribed segment by segment at internal pauses
+    segmented = os.getenv("STT_SEGMENTED") == "1"
+    if segmented:
+        from segmented_stt import PipelinedGroqSTTService
     
     # ========================================================================
     # TRANSPORT SETUP
     # ========================================================================
-    transport = SmallWebRTCTransport(
-        webrtc_connection=runner_args.webrtc_connection,
+    # In-process, or proxies to the inference sidecar with INFERENCE_SIDECAR=1
+    vad_analyzer, turn_analyzer = create_analyzers(VADParams(stop_secs=0.2))
+
+    transport = AttachableSmallWebRTCTransport(
         params=TransportParams(
             audio_in_enabled=True,      # Capture user microphone input
             audio_out_enabled=True,     # Send bot speech back to user
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            turn_analyzer=LocalSmartTurnAnalyzerV3(),  # Natural turn completion
+            vad_analyzer=vad_analyzer,
+            turn_analyzer=turn_analyzer,  # Natural turn completion
         )
     )
     
     # ========================================================================
     # SERVICES SETUP (STT, LLM, TTS)
     # ========================================================================
-    stt = GroqSTTService(
+    # Warm connections are opened in the background by the first session
+    get_client_pool().ensure_started(os.getenv("GROQ_API_KEY"))
+
+    stt_kwargs = {
+        "upload_policy": get_upload_policy(),     # FLAC / Opus with STT_UPLOAD_CODEC
+        "local_router": get_local_stt_router(),   # Short turns on CPU with LOCAL_STT_MODEL_DIR
+    }
+    if speculative or segmented:
+        stt_kwargs["min_segment_secs"] = float(os.getenv("STT_SEGMENT_MIN_SECS", "1.0")) if segmented else None
+    if speculative:
+        stt_class = SpeculativeGroqSTTService
+    elif segmented:
+        stt_class = PipelinedGroqSTTService
+    else:
+        stt_class = PooledGroqSTTService
+
+    stt = stt_class(
         api_key=os.getenv("GROQ_API_KEY"),
         model="whisper-large-v3",
-        audio_passthrough=True
+        audio_passthrough=True,
+        **stt_kwargs
     )
     
-    llm = GroqLLMService(
+    llm = (SpeculativeGroqLLMService if speculative else PooledGroqLLMService)(
         api_key=os.getenv("GROQ_API_KEY"),
         model="llama-3.1-8b-instant"
     )
     
-    tts = CartesiaTTSService(
+    tts = PooledCartesiaTTSService(
         api_key=os.getenv("CARTESIA_API_KEY"),
-        voice_id="79a125e8-cd45-4c13-8a67-188112f4dd22"
+        voice_id=TTS_VOICE_ID
     )
+
+    # First chunk of each reply cut at a clause with TTS_CHUNKING=clause
+    text_processor = create_text_processor()
     
     # ========================================================================
     # CONTEXT SETUP
@@ -109,6 +156,11 @@ async def bot(runner_args: RunnerArguments):
     messages = []
     context = LLMContext(messages)
     context_aggregator = LLMContextAggregatorPair(context)
+    if speculative:
+        stt.attach_llm(llm, context)
+
+    # Takes the greet node's transitions without the LLM when the transcript is clear
+    intent_router = IntentRouter(create_greet_node(), GREET_CLASSIFIER)
     
     # ========================================================================
     # PIPELINE SETUP
@@ -116,8 +168,10 @@ async def bot(runner_args: RunnerArguments):
     pipeline = Pipeline([
         transport.input(),
         stt,
+        intent_router,                  # Keyword fast path for the greet node
         context_aggregator.user(),      # Add user message to context
         llm,
+        *([text_processor] if text_processor else []),
         tts,
         transport.output(),              # Send bot speech back to user
         context_aggregator.assistant()   # Add assistant message to context
@@ -126,6 +180,8 @@ async def bot(runner_args: RunnerArguments):
     # ========================================================================
     # TASK SETUP
     # ========================================================================
+    turn_tracer = create_turn_tracer()
+
     task = PipelineTask(
         pipeline,
         params=PipelineParams(
@@ -135,6 +191,7 @@ async def bot(runner_args: RunnerArguments):
                 TranscriptionLogObserver(),    # Console: User speech-to-text
                 TurnTrackingObserver(),        # Track: Turn management
                 LatencyObserver(),             # Console: Response latency
+                turn_tracer,                   # Trace: Per-turn spans to traces/spans.jsonl
             ]
         )
     )
@@ -148,12 +205,14 @@ async def bot(runner_args: RunnerArguments):
         context_aggregator=context_aggregator,
         transport=transport,
     )
+    turn_tracer.attach_flow_manager(flow_manager)  # Tag spans with the current node
+    intent_router.attach_flow_manager(flow_manager)
     
     # ========================================================================
     # TRANSPORT EVENT HANDLERS
     # ========================================================================
     @transport.event_handler('on_client_connected')
-    async def handle_client_connected(transport: SmallWebRTCTransport, client):
+    async def handle_client_connected(transport: AttachableSmallWebRTCTransport, client):
         """
         Initialize the flow when client connects.
         """
@@ -174,7 +233,7 @@ async def bot(runner_args: RunnerArguments):
         await flow_manager.initialize(create_greet_node())
     
     @transport.event_handler('on_client_disconnected')
-    async def handle_client_disconnected(transport: SmallWebRTCTransport, client):
+    async def handle_client_disconnected(transport: AttachableSmallWebRTCTransport, client):
         """
         Clean up when client disconnects.
         """
@@ -185,13 +244,52 @@ async def bot(runner_args: RunnerArguments):
         # Cancel the task to clean up resources
         await task.cancel()
     
+    return SessionTemplate(
+        transport=transport,
+        task=task,
+        analyzers=(vad_analyzer, turn_analyzer),
+        extras={"flow_manager": flow_manager, "turn_tracer": turn_tracer},
+    )
+
+
+async def bot(runner_args: "RunnerArguments"):
+    """
+    Main bot function: attach the caller to a pre-built session and run it.
+    
+    Args:
+        runner_args: WebRTC connection details and configuration
+    """
+    # Callers arriving during warm-up wait here; afterwards this is instant
+    await wait_until_ready()
+
+    # Loop lag / stall watchdog for this process (started once, shared by sessions)
+    from loop_lag import get_loop_monitor
+
+    get_loop_monitor().start()
+
+    from pipecat.pipeline.runner import PipelineRunner
+    from pipeline_pool import get_pipeline_pool
+
+    # Pre-built session from the pool (built here if the pool is empty)
+    session = await get_pipeline_pool(create_session).take()
+    session.attach(runner_args.webrtc_connection)
+    # Built before the caller arrived: spans now carry the WebRTC pc_id, as the session logs do
+    session.extras["turn_tracer"].session_id = runner_args.webrtc_connection.pc_id
+
     # ========================================================================
     # RUN PIPELINE
     # ========================================================================
     runner = PipelineRunner(handle_sigint=runner_args.handle_sigint)
-    await runner.run(task)
+    try:
+        await runner.run(session.task)
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
     from pipecat.runner.run import main
+
+    # Import pipecat services and load/warm VAD + Smart Turn in the background
+    # while the runner brings the listener up
+    start_background_warmup()
     main()
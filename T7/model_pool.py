@@ -0,0 +1,425 @@
+"""
+Process-wide model registry for Silero VAD and Smart Turn v3.
+
+SileroVADAnalyzer and LocalSmartTurnAnalyzerV3 each load their ONNX model
+and create a new onnxruntime InferenceSession in __init__, so every new
+connection pays the model load (and Smart Turn also builds a Whisper
+feature extractor) before the bot can greet the caller.
+
+The registry loads and warms both models once per process. Each session
+gets a lightweight analyzer that keeps its own per-stream state (Silero's
+recurrent state and context window, Smart Turn's audio buffer) but runs
+inference on the shared sessions. onnxruntime's InferenceSession.run() is
+thread-safe, so concurrent sessions can use the same session object.
+
+Smart Turn calls from all sessions go through a MicroBatcher (batching.py)
+so end-of-turn checks that land within SMART_TURN_BATCH_WAIT_MS of each
+other run as one batched ONNX call. Set it to 0 to call the session directly.
+Silero can be batched the same way with SILERO_BATCH_WAIT_MS: each session
+keeps its own recurrent state and context, and the chunks of all sessions
+that arrive within the wait run as one call.
+
+With VAD_ENERGY_GATE=1 each VAD analyzer also gets an EnergyGate
+(vad_gate.py) that skips Silero inference on clearly silent windows.
+
+With INFERENCE_SIDECAR=1, create_analyzers() returns proxies that run all
+of this in a separate sidecar process instead (sidecar.py).
+"""
+
+import os
+import threading
+import time
+from importlib import resources
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from batching import MicroBatcher
+from thread_budget import ThreadBudget, get_thread_budget
+from vad_gate import EnergyGate
+
+import onnxruntime as ort
+from transformers import WhisperFeatureExtractor
+
+from pipecat.audio.turn.smart_turn.base_smart_turn import BaseSmartTurn
+from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+
+def _bundled_model_path(package: str, model_name: str) -> str:
+    return str(resources.files(package).joinpath(model_name))
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class ModelRegistry:
+    """
+    Holds the shared inference sessions for the VAD and turn models.
+
+    Args:
+        threads: Thread settings for both sessions (defaults to the process budget)
+        smart_turn_batch_wait_ms: Max wait for batching Smart Turn calls, 0 disables
+        smart_turn_max_batch: Largest batched Smart Turn call
+        silero_batch_wait_ms: Max wait for batching Silero chunks, 0 disables
+        silero_max_batch: Largest batched Silero call
+    """
+
+    def __init__(
+        self,
+        threads: Optional[ThreadBudget] = None,
+        smart_turn_batch_wait_ms: float = 3.0,
+        smart_turn_max_batch: int = 16,
+        silero_batch_wait_ms: float = 0.0,
+        silero_max_batch: int = 128,
+    ):
+        self.threads = threads or get_thread_budget()
+        self.smart_turn_batcher: Optional[MicroBatcher] = None
+        if smart_turn_batch_wait_ms > 0:
+            self.smart_turn_batcher = MicroBatcher(
+                self._run_smart_turn_batch,
+                max_batch=smart_turn_max_batch,
+                max_wait_ms=smart_turn_batch_wait_ms,
+                name="smart-turn-batcher",
+            )
+        self._smart_turn_batchable = True
+
+        self.silero_batcher: Optional[MicroBatcher] = None
+        if silero_batch_wait_ms > 0:
+            self.silero_batcher = MicroBatcher(
+                self._run_silero_batch,
+                max_batch=silero_max_batch,
+                max_wait_ms=silero_batch_wait_ms,
+                name="silero-batcher",
+            )
+
+        self.silero_session: Optional[ort.InferenceSession] = None
+        self.smart_turn_session: Optional[ort.InferenceSession] = None
+        self.feature_extractor: Optional[WhisperFeatureExtractor] = None
+
+        self.load_time_secs = 0.0
+        self.warmup_time_secs = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.silero_session is not None and self.smart_turn_session is not None
+
+    def load(self):
+        """Load both models. Safe to call repeatedly and from several threads."""
+        with self._lock:
+            if self.loaded:
+                return
+            start = time.perf_counter()
+
+            silero_opts = ort.SessionOptions()
+            silero_opts.inter_op_num_threads = self.threads.inter_op_threads
+            silero_opts.intra_op_num_threads = self.threads.silero_intra_threads
+            self.silero_session = ort.InferenceSession(
+                _bundled_model_path("pipecat.audio.vad.data", "silero_vad.onnx"),
+                providers=["CPUExecutionProvider"],
+                sess_options=silero_opts,
+            )
+
+            turn_opts = ort.SessionOptions()
+            turn_opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            turn_opts.inter_op_num_threads = self.threads.inter_op_threads
+            turn_opts.intra_op_num_threads = self.threads.smart_turn_intra_threads
+            turn_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.smart_turn_session = ort.InferenceSession(
+                _bundled_model_path("pipecat.audio.turn.smart_turn.data", "smart-turn-v3.1-cpu.onnx"),
+                sess_options=turn_opts,
+            )
+            self.feature_extractor = WhisperFeatureExtractor(chunk_length=8)
+
+            self.load_time_secs = time.perf_counter() - start
+            logger.info(f"Model registry loaded in {self.load_time_secs * 1000:.0f}ms")
+
+    def warm_up(self):
+        """
+        Load the models if needed and run one dummy inference on each.
+
+        The first run() of an onnxruntime session allocates its memory arena
+        and finalizes kernels, which would otherwise land on the first
+        caller's first turn.
+        """
+        self.load()
+        start = time.perf_counter()
+
+        silero = SharedSileroModel(self.silero_session)
+        silero(np.zeros(512, dtype=np.float32), 16000)
+
+        features = self.smart_turn_features(np.zeros(8 * 16000, dtype=np.float32))
+        self.smart_turn_session.run(None, {"input_features": features})
+
+        self.warmup_time_secs = time.perf_counter() - start
+        logger.info(f"Model registry warmed up in {self.warmup_time_secs * 1000:.0f}ms")
+
+    def _run_silero_batch(self, items: List[tuple]) -> List[tuple]:
+        """
+        Run (input, state, sample_rate) items as batched Silero calls.
+
+        Rows of a batch do not interact, so each session gets the output and
+        next state it would have got from its own call.
+        """
+        results: List[Optional[tuple]] = [None] * len(items)
+        by_rate: Dict[int, List[int]] = {}
+        for i, (_, _, sr) in enumerate(items):
+            by_rate.setdefault(sr, []).append(i)
+
+        for sr, indices in by_rate.items():
+            out, state = self.silero_session.run(None, {
+                "input": np.concatenate([items[i][0] for i in indices], axis=0),
+                "state": np.concatenate([items[i][1] for i in indices], axis=1),
+                "sr": np.array(sr, dtype="int64"),
+            })
+            for row, i in enumerate(indices):
+                results[i] = (out[row:row + 1], np.ascontiguousarray(state[:, row:row + 1]))
+        return results
+
+    def smart_turn_features(self, audio_array: np.ndarray) -> np.ndarray:
+        """Whisper features of shape (1, 80, 800) for the last 8s of 16 kHz audio."""
+        max_samples = 8 * 16000
+        if len(audio_array) > max_samples:
+            audio_array = audio_array[-max_samples:]
+        elif len(audio_array) < max_samples:
+            audio_array = np.pad(audio_array, (max_samples - len(audio_array), 0), mode="constant")
+        features = self.feature_extractor(
+            audio_array,
+            sampling_rate=16000,
+            return_tensors="np",
+            padding="max_length",
+            max_length=max_samples,
+            truncation=True,
+            do_normalize=True,
+        ).input_features
+        return features.astype(np.float32).reshape(1, *features.shape[-2:])
+
+    def smart_turn_probability(self, features: np.ndarray) -> float:
+        """Completion probability for one (1, 80, 800) feature array."""
+        if self.smart_turn_batcher is not None:
+            return self.smart_turn_batcher.submit(features)
+        return self.smart_turn_session.run(None, {"input_features": features})[0][0].item()
+
+    def _run_smart_turn_batch(self, features: List[np.ndarray]) -> List[float]:
+        if len(features) > 1 and self._smart_turn_batchable:
+            try:
+                outputs = self.smart_turn_session.run(
+                    None, {"input_features": np.concatenate(features, axis=0)}
+                )
+                return outputs[0].reshape(len(features), -1)[:, 0].tolist()
+            except Exception as e:
+                # A model exported with a fixed batch dimension cannot batch
+                logger.warning(f"Smart Turn model rejected a batch of {len(features)} ({e}); "
+                               "falling back to one call per item")
+                self._smart_turn_batchable = False
+        return [
+            self.smart_turn_session.run(None, {"input_features": f})[0][0].item() for f in features
+        ]
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide registry (models are loaded on first use)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(
+                smart_turn_batch_wait_ms=float(os.getenv("SMART_TURN_BATCH_WAIT_MS", "3")),
+                smart_turn_max_batch=int(os.getenv("SMART_TURN_MAX_BATCH", "16")),
+                silero_batch_wait_ms=float(os.getenv("SILERO_BATCH_WAIT_MS", "0")),
+                silero_max_batch=int(os.getenv("SILERO_MAX_BATCH", "128")),
+            )
+        return _registry
+
+
+# ============================================================================
+# PER-SESSION WRAPPERS
+# ============================================================================
+
+class SharedSileroModel(SileroOnnxModel):
+    """
+    Silero model wrapper that reuses an existing InferenceSession.
+
+    Only the recurrent state and context window are per-instance; see
+    SileroOnnxModel.__call__ for how they are carried between chunks.
+    """
+
+    def __init__(self, session: ort.InferenceSession):
+        self.session = session
+        self.sample_rates = [8000, 16000]
+        self.reset_states()
+
+    def skip_window(self, x: np.ndarray, sr: int):
+        """
+        Account for a window that was not run through the model.
+
+        The recurrent state is kept as is; the context (the tail of the
+        previous window that is prepended to the next one) is refreshed so
+        the next real inference sees the audio that actually preceded it.
+        """
+        if self._last_batch_size:
+            context_size = 64 if sr == 16000 else 32
+            self._context = np.asarray(x, dtype=np.float32).reshape(1, -1)[:, -context_size:]
+
+
+class BatchedSileroModel(SharedSileroModel):
+    """
+    Silero model wrapper whose inference goes through the registry's batcher.
+
+    Mirrors SileroOnnxModel.__call__: the per-session state and context are
+    prepared and updated here, only session.run() is shared with other
+    sessions' chunks.
+    """
+
+    def __init__(self, session: ort.InferenceSession, batcher: MicroBatcher):
+        super().__init__(session)
+        self._batcher = batcher
+
+    def __call__(self, x, sr: int):
+        x, sr = self._validate_input(x, sr)
+        num_samples = 512 if sr == 16000 else 256
+        if np.shape(x)[-1] != num_samples:
+            raise ValueError(f"Provided number of samples is {np.shape(x)[-1]}")
+
+        if np.shape(x)[0] != 1:
+            raise ValueError("BatchedSileroModel takes one chunk per call")
+
+        context_size = 64 if sr == 16000 else 32
+        if not self._last_batch_size or (self._last_sr and self._last_sr != sr):
+            self.reset_states(1)
+        if not np.shape(self._context)[1]:
+            self._context = np.zeros((1, context_size), dtype="float32")
+
+        x = np.concatenate((self._context, x), axis=1)
+        out, self._state = self._batcher.submit((x, self._state, sr))
+
+        self._context = x[..., -context_size:]
+        self._last_sr = sr
+        self._last_batch_size = 1
+        return out
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """
+    Drop-in SileroVADAnalyzer that runs on the registry's shared session.
+
+    Args:
+        sample_rate: Audio sample rate (8000 or 16000 Hz), set later if None
+        params: VAD parameters for detection thresholds and timing
+        registry: Registry to take the session from (defaults to the process one)
+        energy_gate: Optional pre-gate that skips inference on silent windows
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: Optional[int] = None,
+        params: Optional[VADParams] = None,
+        registry: Optional[ModelRegistry] = None,
+        energy_gate: Optional[EnergyGate] = None,
+    ):
+        # Skip SileroVADAnalyzer.__init__, it would load a private model
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        registry = registry or get_model_registry()
+        registry.load()
+        if registry.silero_batcher is not None:
+            self._model = BatchedSileroModel(registry.silero_session, registry.silero_batcher)
+        else:
+            self._model = SharedSileroModel(registry.silero_session)
+        self._energy_gate = energy_gate
+        self._last_reset_time = 0
+
+    def voice_confidence(self, buffer) -> float:
+        if self._energy_gate is not None:
+            audio = np.frombuffer(buffer, np.int16).astype(np.float32) / 32768.0
+            if self._energy_gate.should_skip(audio):
+                self._model.skip_window(audio, self.sample_rate)
+                return 0.0
+            # Bring the recurrent state up to date with the silence it missed
+            for window in self._energy_gate.take_replay():
+                self._model(window, self.sample_rate)
+        return super().voice_confidence(buffer)
+
+
+class SharedSmartTurnAnalyzerV3(LocalSmartTurnAnalyzerV3):
+    """
+    Drop-in LocalSmartTurnAnalyzerV3 that runs on the registry's shared
+    session and feature extractor, batched with other sessions' calls.
+    Audio buffering and silence tracking stay per-session in BaseSmartTurn.
+
+    Args:
+        registry: Registry to take the session from (defaults to the process one)
+        **kwargs: Passed to BaseSmartTurn (sample_rate, params)
+    """
+
+    def __init__(self, *, registry: Optional[ModelRegistry] = None, **kwargs):
+        # Skip LocalSmartTurnAnalyzerV3.__init__, it would load a private model
+        BaseSmartTurn.__init__(self, **kwargs)
+        registry = registry or get_model_registry()
+        registry.load()
+        self._registry = registry
+        self._feature_extractor = registry.feature_extractor
+        self._session = registry.smart_turn_session
+
+    def _predict_endpoint(self, audio_array: np.ndarray) -> Dict[str, Any]:
+        """Predict end-of-turn; runs on this session's executor thread."""
+        features = self._registry.smart_turn_features(audio_array)
+        probability = self._registry.smart_turn_probability(features)
+        return {
+            "prediction": 1 if probability > 0.5 else 0,
+            "probability": probability,
+        }
+
+
+def create_energy_gate() -> Optional[EnergyGate]:
+    """EnergyGate configured from VAD_GATE_* variables, or None unless VAD_ENERGY_GATE=1."""
+    if os.getenv("VAD_ENERGY_GATE", "0") != "1":
+        return None
+    return EnergyGate(
+        silence_db=float(os.getenv("VAD_GATE_SILENCE_DB", "-50")),
+        noise_margin_db=float(os.getenv("VAD_GATE_NOISE_MARGIN_DB", "10")),
+        noise_zcr=float(os.getenv("VAD_GATE_NOISE_ZCR", "0.35")),
+        hangover_windows=int(os.getenv("VAD_GATE_HANGOVER", "8")),
+    )
+
+
+def create_vad_analyzer(params: Optional[VADParams] = None) -> SharedSileroVADAnalyzer:
+    """Per-session VAD analyzer backed by the shared Silero session."""
+    return SharedSileroVADAnalyzer(params=params, energy_gate=create_energy_gate())
+
+
+def create_turn_analyzer(**kwargs) -> SharedSmartTurnAnalyzerV3:
+    """Per-session Smart Turn analyzer backed by the shared ONNX session."""
+    return SharedSmartTurnAnalyzerV3(**kwargs)
+
+
+def create_analyzers(vad_params: Optional[VADParams] = None, **turn_kwargs):
+    """
+    (VAD analyzer, turn analyzer) for one session.
+
+    In-process analyzers on the shared sessions, or sidecar proxies sharing
+    one audio ring when INFERENCE_SIDECAR=1. Pass both to close_analyzers()
+    when the session ends.
+    """
+    from sidecar import SidecarSmartTurnAnalyzer, SidecarVADAnalyzer, get_sidecar_client, sidecar_enabled
+
+    if sidecar_enabled():
+        client = get_sidecar_client()
+        vad_analyzer = SidecarVADAnalyzer(client, params=vad_params)
+        return vad_analyzer, SidecarSmartTurnAnalyzer(client, vad_analyzer, **turn_kwargs)
+    return create_vad_analyzer(vad_params), create_turn_analyzer(**turn_kwargs)
+
+
+def close_analyzers(*analyzers):
+    """Release per-session resources held outside the analyzer (sidecar rings)."""
+    for analyzer in analyzers:
+        close = getattr(analyzer, "close", None)
+        if close is not None:
+            close()
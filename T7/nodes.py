@@ -5,6 +5,8 @@ Each node is created by a factory function that returns a NodeConfig.
 Uses FlowsFunctionSchema for transitions and function calls.
 """
 
+import os
+import re
 from typing import Optional
 from pipecat_flows import (
     FlowManager,
@@ -14,6 +16,8 @@ from pipecat_flows import (
     FlowArgs,
 )
 
+from intent_router import DEFAULT_MIN_CONFIDENCE, Intent, IntentClassifier
+
 
 # ============================================================================
 # GREET NODE - Initial entry point
@@ -153,6 +157,43 @@ def create_greet_node() -> NodeConfig:
     )
 
 
+# Keyword fast path for the greet node's functions (see intent_router.py).
+# Built once per process.
+
+def _order_id_arguments(text: str) -> Optional[dict]:
+    """go_to_status needs the order ID; without one the LLM asks for it."""
+    match = re.search(r"\border\s*(?:number|id|#)?\s*(?:is\s*)?#?\s*([A-Za-z]*\d[\w-]*)", text, re.IGNORECASE)
+    return {"order_id": match.group(1)} if match else None
+
+
+GREET_INTENTS = [
+    Intent("go_to_menu", [
+        "menu", "see the menu", "hear the menu", "what do you have", "what do you serve", "what's on the menu",
+        "specials", "dishes", "food options",
+    ]),
+    Intent("go_to_order", [
+        "place an order", "place order", "to order", "order some", "order food",
+        "like to order", "want to order", "takeout", "take out", "pickup", "pick up",
+    ]),
+    Intent("go_to_status", [
+        "order status", "status of my order", "where is my order", "where's my order",
+        "check on my order", "check my order", "track my order", "my order ready", "status",
+    ], arguments=_order_id_arguments),
+    Intent("go_to_reserve", [
+        "reserve", "reservation", "book a table", "table for", "booking", "book",
+    ]),
+    Intent("go_to_human", [
+        "human", "real person", "representative", "agent", "speak to someone",
+        "talk to someone", "manager", "operator",
+    ]),
+]
+
+# INTENT_MIN_CONFIDENCE above 1 leaves all routing to the LLM
+GREET_CLASSIFIER = IntentClassifier(
+    GREET_INTENTS, min_confidence=float(os.getenv("INTENT_MIN_CONFIDENCE", str(DEFAULT_MIN_CONFIDENCE)))
+)
+
+
 # ============================================================================
 # MENU NODE - Static response, ends chat
 # ============================================================================
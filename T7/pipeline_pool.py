@@ -0,0 +1,208 @@
+"""
+Pool of pre-built session pipelines.
+
+bot() used to build the transport, STT/LLM/TTS services, context and
+aggregators, observers, Pipeline, PipelineTask and FlowManager after the
+WebRTC connection arrived, all on the caller's connect path. None of that
+depends on the connection except the transport's WebRTC client, so the
+pool builds whole sessions ahead of time and a new caller only attaches its
+connection:
+
+- AttachableSmallWebRTCTransport is a SmallWebRTCTransport that can be
+  constructed (and wired into a Pipeline) without a connection; attach()
+  creates the WebRTC client and hands it to the input/output processors
+- PipelinePool keeps `size` SessionTemplates ready. take() returns one
+  immediately (or builds one inline when the pool is empty) and schedules
+  a background refill a little later, so the rebuild does not compete with
+  the new caller's greeting on the event loop
+
+Set PIPELINE_POOL_SIZE=0 to build every session on connect as before.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from loguru import logger
+
+from pipecat.pipeline.task import PipelineTask
+from pipecat.transports.base_transport import BaseTransport, TransportParams
+from pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection
+from pipecat.transports.smallwebrtc.transport import (
+    SmallWebRTCCallbacks,
+    SmallWebRTCClient,
+    SmallWebRTCTransport,
+)
+
+
+class AttachableSmallWebRTCTransport(SmallWebRTCTransport):
+    """
+    SmallWebRTCTransport whose connection is attached after construction.
+
+    Args:
+        params: Transport configuration
+        input_name: Optional name for the input processor
+        output_name: Optional name for the output processor
+    """
+
+    def __init__(
+        self,
+        params: TransportParams,
+        input_name: Optional[str] = None,
+        output_name: Optional[str] = None,
+    ):
+        # Skip SmallWebRTCTransport.__init__, it needs the connection for its client
+        BaseTransport.__init__(self, input_name=input_name, output_name=output_name)
+        self._params = params
+        self._callbacks = SmallWebRTCCallbacks(
+            on_app_message=self._on_app_message,
+            on_client_connected=self._on_client_connected,
+            on_client_disconnected=self._on_client_disconnected,
+        )
+        self._client: Optional[SmallWebRTCClient] = None
+        self._input = None
+        self._output = None
+
+        self._register_event_handler("on_app_message")
+        self._register_event_handler("on_client_connected")
+        self._register_event_handler("on_client_disconnected")
+
+    @property
+    def attached(self) -> bool:
+        return self._client is not None
+
+    def attach(self, webrtc_connection: SmallWebRTCConnection):
+        """Bind the caller's connection; call once, before the task runs."""
+        if self._client is not None:
+            raise RuntimeError("Transport already has a connection")
+        self._client = SmallWebRTCClient(webrtc_connection, self._callbacks)
+        for processor in (self._input, self._output):
+            if processor is not None:
+                processor._client = self._client
+
+
+@dataclass
+class SessionTemplate:
+    """
+    A fully built session waiting for its connection.
+
+    Args:
+        transport: The session's transport, not yet attached
+        task: PipelineTask over the session's pipeline
+        analyzers: VAD / turn analyzers to release when the session ends
+        extras: Anything else the builder wants to hand to bot()
+    """
+
+    transport: AttachableSmallWebRTCTransport
+    task: PipelineTask
+    analyzers: Tuple[Any, ...] = ()
+    extras: dict = field(default_factory=dict)
+    built_at: float = field(default_factory=time.monotonic)
+
+    def attach(self, webrtc_connection: SmallWebRTCConnection):
+        self.transport.attach(webrtc_connection)
+
+    def close(self):
+        from model_pool import close_analyzers
+
+        close_analyzers(*self.analyzers)
+
+
+class PipelinePool:
+    """
+    Keeps pre-built SessionTemplates ready for new connections.
+
+    Args:
+        build: Builds one SessionTemplate (called on the event loop)
+        size: Templates to keep ready, 0 disables pooling
+        refill_delay_secs: Wait after a take() before rebuilding
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], SessionTemplate],
+        size: int = 2,
+        refill_delay_secs: float = 1.0,
+    ):
+        self.build = build
+        self.size = size
+        self.refill_delay_secs = refill_delay_secs
+
+        self.hits = 0
+        self.misses = 0
+        self.build_ms: Deque[float] = deque(maxlen=100)
+
+        self._ready: Deque[SessionTemplate] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+
+    def _build(self) -> SessionTemplate:
+        start = time.perf_counter()
+        template = self.build()
+        self.build_ms.append((time.perf_counter() - start) * 1000)
+        return template
+
+    def start(self):
+        """Fill the pool in the background."""
+        self._schedule_refill(delay_secs=0.0)
+
+    async def take(self) -> SessionTemplate:
+        """A ready template, or one built now if the pool is empty."""
+        if self._ready:
+            self.hits += 1
+            template = self._ready.popleft()
+        else:
+            self.misses += 1
+            template = self._build()
+        self._schedule_refill(self.refill_delay_secs)
+        return template
+
+    def _schedule_refill(self, delay_secs: float):
+        if self.size <= 0:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill(delay_secs))
+
+    async def _refill(self, delay_secs: float):
+        await asyncio.sleep(delay_secs)
+        while len(self._ready) < self.size:
+            try:
+                self._ready.append(self._build())
+            except Exception as e:
+                logger.exception(f"Building a pooled session failed: {e}")
+                return
+            # One template per loop iteration, so callers are not held up
+            await asyncio.sleep(0)
+
+    def snapshot(self) -> dict:
+        builds: List[float] = list(self.build_ms)
+        return {
+            "size": self.size,
+            "ready": len(self._ready),
+            "hits": self.hits,
+            "misses": self.misses,
+            "mean_build_ms": round(sum(builds) / len(builds), 1) if builds else None,
+        }
+
+    async def close(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+        while self._ready:
+            self._ready.popleft().close()
+
+
+_pool: Optional[PipelinePool] = None
+
+
+def get_pipeline_pool(build: Callable[[], SessionTemplate]) -> PipelinePool:
+    """Process-wide pool for `build`, sized by PIPELINE_POOL_SIZE (default 2)."""
+    global _pool
+    if _pool is None:
+        _pool = PipelinePool(
+            build,
+            size=int(os.getenv("PIPELINE_POOL_SIZE", "2")),
+            refill_delay_secs=float(os.getenv("PIPELINE_POOL_REFILL_DELAY_SECS", "1.0")),
+        )
+    return _pool
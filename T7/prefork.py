@@ -0,0 +1,264 @@
+"""
+Pre-fork launcher: load and warm the models once, then fork the workers.
+
+server.py starts every worker as a fresh interpreter, so each one imports
+torch / onnxruntime / transformers and loads Silero and Smart Turn on its
+own. Here the parent does all of that once, calls gc.freeze() so the
+collector never writes to (and un-shares) the objects it has already
+loaded, and forks the workers. The model weights and imported modules stay
+in pages shared copy-on-write between the parent and every worker.
+
+The parent stays a small synchronous supervisor: it never runs an event
+loop, so a crashed worker is replaced by forking again from the same warm
+state. The dispatcher from server.py runs in one more forked child, in
+--attach mode, and routes signaling to the workers.
+
+Forking a process with live threads is only safe if nothing needs them in
+the child. Warm-up runs to completion before the fork, and preload() caps
+the thread budget (thread_budget.py) at one intra-/inter-op thread per
+onnxruntime session, so there is no pool state to lose. Each child then
+applies its own CPU affinity slice when INFER_CPU_AFFINITY=auto.
+
+Usage:
+    python prefork.py --workers 4 [--host localhost] [--port 7860]
+    kill -USR1 <parent pid>     # print the per-worker memory report again
+"""
+
+import argparse
+import gc
+import os
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """Resident memory of a process split into shared and private, in MB."""
+    kb = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in SMAPS_FIELDS:
+                    kb[name] = int(rest.split()[0])
+    except OSError:
+        return {}  # Not Linux, or the process is gone
+    return {
+        "rss": round(kb.get("Rss", 0) / 1024, 1),
+        "pss": round(kb.get("Pss", 0) / 1024, 1),
+        "shared": round((kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)) / 1024, 1),
+        "private": round((kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024, 1),
+    }
+
+
+def print_memory_report(workers: List[Optional[int]]):
+    print(f"{'worker':>6} | {'pid':>7} | {'rss MB':>8} | {'shared MB':>9} | {'private MB':>10} | {'pss MB':>8}")
+    print("-" * 64)
+    total_rss = total_pss = 0.0
+    for index, pid in enumerate(workers):
+        mem = process_memory(pid) if pid else {}
+        if not mem:
+            print(f"{index:>6} | {pid or '-':>7} | {'n/a':>8} |")
+            continue
+        total_rss += mem["rss"]
+        total_pss += mem["pss"]
+        print(f"{index:>6} | {pid:>7} | {mem['rss']:8.1f} | {mem['shared']:9.1f} | "
+              f"{mem['private']:10.1f} | {mem['pss']:8.1f}")
+    # PSS splits each shared page between its sharers, so summed PSS is the
+    # real cost of the workers; summed RSS is what it would be without sharing.
+    print(f"\nSum of RSS: {total_rss:.1f} MB   Sum of PSS: {total_pss:.1f} MB")
+
+
+class PreforkSupervisor:
+    """
+    Forks the workers and dispatcher from a warmed-up parent and keeps them alive.
+
+    Args:
+        num_workers: Number of worker processes
+        host: Interface workers and dispatcher bind to
+        port: Dispatcher port
+        base_port: Port of worker 0; worker i listens on base_port + i
+    """
+
+    def __init__(self, num_workers: int, host: str, port: int, base_port: int):
+        self.num_workers = num_workers
+        self.host = host
+        self.port = port
+        self.base_port = base_port
+
+        self.workers: List[Optional[int]] = [None] * num_workers
+        self.dispatcher_pid: Optional[int] = None
+        self._stopping = False
+        self._report_requested = False
+
+    def preload(self):
+        """Import the bot stack and warm the models, then freeze the GC heap."""
+        # Collections during loading would touch objects we want to share
+        gc.disable()
+        start = time.perf_counter()
+
+        import server  # noqa: F401  (FastAPI, uvicorn, aiohttp)
+        import warmup
+        from thread_budget import get_thread_budget
+
+        # onnxruntime thread pools created here would not exist in the children
+        budget = get_thread_budget()
+        if max(budget.silero_intra_threads, budget.smart_turn_intra_threads,
+               budget.whisper_intra_threads, budget.inter_op_threads) > 1:
+            print("⚠️  Pre-fork needs single-threaded ONNX sessions; overriding INFER_* threads to 1")
+            budget.silero_intra_threads = budget.smart_turn_intra_threads = 1
+            budget.whisper_intra_threads = budget.inter_op_threads = 1
+
+        import main  # noqa: F401
+
+        # A sidecar client (threads, queues) would not survive the fork
+        warmup.start_sidecar = False
+        warmup.start_background_warmup().result()
+
+        gc.collect()
+        gc.freeze()
+        print(f"✅ Preloaded in {time.perf_counter() - start:.2f}s, "
+              f"{gc.get_freeze_count()} objects frozen")
+
+    def _fork(self, target, *args) -> int:
+        pid = os.fork()
+        if pid:
+            return pid
+        # Child: restore default signal handling and the collector. Objects
+        # created from here on are collected as usual; frozen ones never are.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        gc.enable()
+        code = 0
+        try:
+            target(*args)
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _fork_worker(self, index: int):
+        from server import run_worker
+        from sidecar import get_sidecar_client, sidecar_enabled
+        from thread_budget import ThreadBudget
+
+        def run():
+            os.environ["WORKER_INDEX"] = str(index)
+            os.environ["WORKER_COUNT"] = str(self.num_workers)
+            affinity = ThreadBudget.from_env().cpu_affinity
+            if affinity:
+                os.sched_setaffinity(0, affinity)
+            if sidecar_enabled():
+                get_sidecar_client()
+            run_worker(self.host, self.base_port + index)
+
+        self.workers[index] = self._fork(run)
+
+    def _fork_dispatcher(self):
+        import uvicorn
+
+        from loop_lag import configure_event_loop
+        from server import Dispatcher, create_dispatcher_app
+
+        def run():
+            dispatcher = Dispatcher(
+                self.num_workers, self.base_port, host=self.host, spawn_workers=False
+            )
+            uvicorn.run(
+                create_dispatcher_app(dispatcher),
+                host=self.host,
+                port=self.port,
+                loop=configure_event_loop(),
+            )
+
+        self.dispatcher_pid = self._fork(run)
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_report(self, signum, frame):
+        self._report_requested = True
+
+    def run(self, report_after_secs: float = 10.0):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGUSR1, self._handle_report)
+
+        for index in range(self.num_workers):
+            self._fork_worker(index)
+        self._fork_dispatcher()
+        print(f"🚀 {self.num_workers} workers forked from pid {os.getpid()}")
+        print(f"   → Open http://{self.host}:{self.port}/client in your browser")
+
+        report_at = time.monotonic() + report_after_secs
+        while not self._stopping:
+            self._reap()
+            if self._report_requested or (report_at and time.monotonic() >= report_at):
+                self._report_requested = False
+                report_at = 0
+                print_memory_report(self.workers)
+            time.sleep(0.5)
+
+        self._shutdown()
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            code = os.waitstatus_to_exitcode(status)
+            if pid == self.dispatcher_pid:
+                print(f"⚠️  Dispatcher exited with code {code}; restarting")
+                self._fork_dispatcher()
+            elif pid in self.workers:
+                index = self.workers.index(pid)
+                print(f"⚠️  Worker {index} (pid {pid}) exited with code {code}; re-forking")
+                self._fork_worker(index)
+
+    def _shutdown(self):
+        children = [pid for pid in self.workers + [self.dispatcher_pid] if pid]
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork bot server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--worker-base-port", type=int, default=7900)
+    parser.add_argument("--report-after", type=float, default=10.0,
+                        help="Seconds after start-up to print the memory report")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("prefork.py needs os.fork(); use server.py on this platform")
+
+    supervisor = PreforkSupervisor(args.workers, args.host, args.port, args.worker_base_port)
+    supervisor.preload()
+    parent = process_memory(os.getpid())
+    if parent:
+        print(f"Parent after preload: {parent['rss']:.1f} MB resident")
+    supervisor.run(report_after_secs=args.report_after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Pipelined Whisper transcription of long user turns.
+
+SegmentedSTTService buffers the whole turn and sends it to Whisper once the
+turn is confirmed, so a 12 second order pays for transcribing 12 seconds of
+audio after the user has already stopped. Within a turn VAD still reports
+every internal pause (VADUserStoppedSpeakingFrame after stop_secs of
+silence) while smart-turn keeps the turn open, and those pauses are safe
+places to cut: no word is split in the middle.
+
+PipelinedGroqSTTService cuts the turn's buffer at each internal pause once
+the audio since the previous cut is at least min_segment_secs long, and
+transcribes that segment in the background while the user keeps talking.
+When the turn is confirmed only the audio after the last cut (the tail) is
+still to be sent, and only if the user spoke again after that cut. The
+segment transcripts are joined in order into the turn's single
+TranscriptionFrame, so the user aggregator and everything after it see the
+same frames as before.
+
+Shorter pieces are not cut, they stay in the buffer and go out with the
+next segment: Whisper is noticeably less accurate on fragments of a second
+or less. Segments run concurrently, so they are not given the previous
+segment's text as a prompt. A turn without any cut (most short replies)
+takes the unchanged SegmentedSTTService path, and so does a turn whose
+segment request failed: the whole buffer is transcribed again.
+
+The local STT router (local_stt.py) decides on the whole turn's speech, not
+the piece's: segments, cut from a turn that is still going on, always go to
+Groq, and the tail goes local only if the whole turn is short.
+
+SegmentationStats reports the share of turns that were segmented and the
+confirmed-stop -> transcript time; /health includes it. STT_SEGMENTED=1
+enables the mode in main.py (STT_SEGMENT_MIN_SECS, default 1.0).
+"""
+
+import asyncio
+import io
+import math
+import time
+import wave
+from collections import deque
+from typing import AsyncGenerator, Deque, List, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    ErrorFrame,
+    Frame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.utils.time import time_now_iso8601
+
+from client_pool import PooledGroqSTTService
+
+DEFAULT_MIN_SEGMENT_SECS = 1.0
+
+
+class SegmentationStats:
+    """Process-wide counters for pipelined transcription."""
+
+    def __init__(self):
+        self.turns = 0
+        self.segmented_turns = 0
+        self.segments = 0
+        self.tails = 0
+        self.fallbacks = 0
+        self.stop_to_text_ms: Deque[float] = deque(maxlen=1000)
+
+    def snapshot(self) -> dict:
+        timings = sorted(self.stop_to_text_ms)
+        return {
+            "turns": self.turns,
+            "segmented_turns": self.segmented_turns,
+            "segments": self.segments,
+            "tails": self.tails,
+            "fallbacks": self.fallbacks,
+            "p50_stop_to_text_ms": round(timings[len(timings) // 2], 1) if timings else None,
+        }
+
+
+_stats: Optional[SegmentationStats] = None
+
+
+def get_segmentation_stats() -> SegmentationStats:
+    global _stats
+    if _stats is None:
+        _stats = SegmentationStats()
+    return _stats
+
+
+class PipelinedGroqSTTService(PooledGroqSTTService):
+    """
+    PooledGroqSTTService that transcribes a turn's earlier segments while
+    the user is still speaking.
+
+    Args:
+        min_segment_secs: Shortest audio worth cutting at a pause; None
+            never cuts (plain SegmentedSTTService behaviour)
+    """
+
+    def __init__(self, *, min_segment_secs: Optional[float] = DEFAULT_MIN_SEGMENT_SECS, **kwargs):
+        super().__init__(**kwargs)
+        self._min_segment_secs = min_segment_secs
+        self._segment_tasks: List[asyncio.Task] = []
+        self._segment_results: List = []
+        self._cut_at = 0
+        self._speech_since_cut = True
+
+    def _wav(self, audio: bytes) -> bytes:
+        content = io.BytesIO()
+        with wave.open(content, "wb") as wav:
+            wav.setsampwidth(2)
+            wav.setnchannels(1)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(audio)
+        return content.getvalue()
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, VADUserStartedSpeakingFrame):
+            self._speech_since_cut = True
+        elif isinstance(frame, VADUserStoppedSpeakingFrame) and self._user_speaking and not self.is_muted:
+            if self._min_segment_secs is not None:
+                segment_bytes = len(self._audio_buffer) - self._cut_at
+                if segment_bytes >= self._min_segment_secs * self.sample_rate * 2:
+                    self._cut()
+
+    def _cut(self):
+        """Send the audio since the previous cut as the turn's next segment."""
+        audio = bytes(self._audio_buffer[self._cut_at:])
+        self._cut_at = len(self._audio_buffer)
+        self._speech_since_cut = False
+        index = len(self._segment_results)
+        self._segment_results.append(None)
+        self._segment_tasks.append(
+            self.create_task(self._transcribe_segment(index, self._wav(audio)), f"stt_segment_{index}")
+        )
+        get_segmentation_stats().segments += 1
+        logger.debug(f"{self}: segment {index} ({len(audio) / (self.sample_rate * 2):.1f}s) sent")
+
+    async def _transcribe_segment(self, index: int, wav: bytes):
+        try:
+            # The turn goes on past this cut, so it is routed as a long one
+            self._segment_results[index] = await self._transcribe(wav, speech_secs=math.inf)
+        except Exception as e:
+            logger.warning(f"{self}: segment {index} failed ({e})")
+
+    def _remaining_audio(self) -> Optional[bytes]:
+        """The audio after the last cut, if the user spoke since."""
+        if self._speech_since_cut and len(self._audio_buffer) > self._cut_at:
+            return bytes(self._audio_buffer[self._cut_at:])
+        return None
+
+    async def _transcribe_remaining(self, tail_audio: Optional[bytes]) -> Optional[str]:
+        """
+        The turn's text: every segment sent plus tail_audio (see
+        _remaining_audio()). None when a request failed.
+        """
+        tail = None
+        if tail_audio is not None:
+            get_segmentation_stats().tails += 1
+            # Routed on the whole turn's speech (PooledGroqSTTService.speech_secs)
+            tail = asyncio.ensure_future(self._transcribe(self._wav(tail_audio)))
+        try:
+            # wait() rather than gather(): a cancelled caller must not cancel the segments
+            if self._segment_tasks:
+                await asyncio.wait(self._segment_tasks)
+            results = list(self._segment_results)
+            if tail is not None:
+                try:
+                    results.append(await tail)
+                except Exception as e:
+                    logger.warning(f"{self}: tail transcription failed ({e})")
+                    return None
+        finally:
+            if tail is not None and not tail.done():
+                tail.cancel()
+        if any(result is None for result in results):
+            return None
+        return " ".join(text for text in (result.text.strip() for result in results) if text)
+
+    async def _reset_segments(self):
+        for task in self._segment_tasks:
+            await self.cancel_task(task)
+        self._segment_tasks = []
+        self._segment_results = []
+        self._cut_at = 0
+        self._speech_since_cut = True
+
+    async def _handle_user_started_speaking(self, frame: UserStartedSpeakingFrame):
+        await super()._handle_user_started_speaking(frame)
+        if not frame.emulated:
+            await self._reset_segments()
+
+    async def _handle_user_stopped_speaking(self, frame: UserStoppedSpeakingFrame):
+        if frame.emulated:
+            return
+        stats = get_segmentation_stats()
+        stats.turns += 1
+        if not self._segment_tasks:
+            await self._reset_segments()
+            await super()._handle_user_stopped_speaking(frame)
+            return
+
+        stats.segmented_turns += 1
+        stopped_at = time.monotonic()
+        await self.start_ttfb_metrics()
+        text = await self._transcribe_remaining(self._remaining_audio())
+        await self.stop_ttfb_metrics()
+        if text is None:
+            stats.fallbacks += 1
+            await self._reset_segments()
+            await super()._handle_user_stopped_speaking(frame)
+            return
+
+        stats.stop_to_text_ms.append((time.monotonic() - stopped_at) * 1000)
+        await self._emit_transcript(text)
+
+    async def _emit_transcript(self, text: str):
+        """Push a turn's transcript that is already in and start the next turn clean."""
+        self._user_speaking = False
+        await self.process_generator(self._transcript_frames(text))
+        self._audio_buffer.clear()
+        await self._reset_segments()
+
+    async def _transcript_frames(self, text: str) -> AsyncGenerator[Frame, None]:
+        """Same frames run_stt() yields, for a transcript that is already in."""
+        try:
+            if text:
+                await self._handle_transcription(text, True, self._language)
+                logger.debug(f"Transcription: [{text}]")
+                yield TranscriptionFrame(text, self._user_id, time_now_iso8601())
+            else:
+                logger.warning("Received empty transcription from API")
+        except Exception as e:
+            yield ErrorFrame(error=f"Unknown error occurred: {e}")
+
+    async def cleanup(self):
+        await self._reset_segments()
+        await super().cleanup()
@@ -0,0 +1,514 @@
+"""
+Multi-process session server for the restaurant flow bot.
+
+`python main.py` runs every WebRTC session inside one Python process, so VAD,
+Smart Turn inference and JSON serialization for all callers share one GIL
+and one event loop. This server splits that across processes:
+
+    browser ──signaling──> dispatcher (this process, :7860)
+                               │  POST/PATCH /api/offer forwarded
+                               ▼
+                    worker 0..N-1 (python server.py worker --port 78xx)
+                               │  SDP answer, then media flows
+                               ▼     directly between browser and worker
+                         bot(runner_args)  [main.py]
+
+The dispatcher only proxies signaling. New sessions go to the healthy worker
+with the lowest load score (active sessions + event-loop lag); follow-up
+PATCH/renegotiation requests stick to the worker that owns the pc_id,
+until the worker's /health stops listing it.
+Each worker runs admission control (admission.py) on new offers; a worker
+that answers 503 is skipped and the next one is tried.
+A supervisor loop polls every worker's /health, and restarts workers that
+crash or stop answering.
+
+With --attach the dispatcher does not spawn workers itself and only routes
+to workers already listening on the worker ports (see prefork.py, which
+forks them from a parent that has the models loaded).
+
+Usage:
+    python server.py --workers 4 [--host localhost] [--port 7860]
+    python server.py --workers 4 --attach
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+import aiohttp
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+from loguru import logger
+
+from admission import AdmissionRejected, create_admission_controller
+from loop_lag import configure_event_loop, get_loop_monitor
+from prefork import process_memory
+
+load_dotenv()
+
+# One session's worth of load per this much event-loop lag
+LAG_MS_PER_SESSION = 20.0
+HEALTH_INTERVAL_SECS = 1.0
+HEALTH_TIMEOUT_SECS = 2.0
+UNHEALTHY_AFTER_FAILURES = 3
+RESTART_AFTER_FAILURES = 10
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+def create_worker_app() -> FastAPI:
+    """FastAPI app run inside each worker process."""
+    from pipecat.runner.types import SmallWebRTCRunnerArguments
+    from pipecat.transports.smallwebrtc.request_handler import (
+        SmallWebRTCPatchRequest,
+        SmallWebRTCRequest,
+        SmallWebRTCRequestHandler,
+    )
+
+    from main import bot, create_session
+    from warmup import start_background_warmup, wait_until_ready
+
+    handler = SmallWebRTCRequestHandler()
+    lag_monitor = get_loop_monitor()
+    admission = create_admission_controller(lag_monitor)
+    active_sessions: Set[asyncio.Task] = set()
+    session_pc_ids: Set[str] = set()  # Reported on /health so the dispatcher can drop ended sessions
+    warmup_future = start_background_warmup()
+    pipeline_pool = None  # Imported after warm-up, it pulls in the transport stack
+    stats_sources = None  # Likewise; read by /health once loaded
+
+    async def run_session(runner_args):
+        try:
+            await bot(runner_args)
+        except Exception as e:
+            logger.exception(f"Session crashed: {e}")
+
+    async def prefill_sessions():
+        nonlocal pipeline_pool, stats_sources
+        await wait_until_ready()
+        # Imported off the event loop: /health must keep answering meanwhile
+        stats_sources = await asyncio.to_thread(_load_stats_sources)
+        from pipeline_pool import get_pipeline_pool
+
+        pipeline_pool = get_pipeline_pool(create_session)
+        pipeline_pool.start()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        lag_monitor.start()
+        admission.start()
+        prefill = asyncio.create_task(prefill_sessions())
+        yield
+        prefill.cancel()
+        if pipeline_pool is not None:
+            await pipeline_pool.close()
+        admission.stop()
+        lag_monitor.stop()
+        await handler.close()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post("/api/offer")
+    async def offer(request: SmallWebRTCRequest):
+        # Renegotiations of an existing session are never gated
+        new_session = request.pc_id is None
+        if new_session:
+            try:
+                await admission.acquire()
+            except AdmissionRejected as e:
+                return JSONResponse(
+                    e.to_dict(),
+                    status_code=503,
+                    headers={"Retry-After": str(int(e.retry_after_secs))},
+                )
+        started = False
+
+        async def webrtc_connection_callback(connection):
+            nonlocal started
+            runner_args = SmallWebRTCRunnerArguments(
+                webrtc_connection=connection, body=request.request_data
+            )
+            task = asyncio.create_task(run_session(runner_args))
+            active_sessions.add(task)
+            session_pc_ids.add(connection.pc_id)
+            task.add_done_callback(active_sessions.discard)
+            task.add_done_callback(lambda _: session_pc_ids.discard(connection.pc_id))
+            task.add_done_callback(lambda _: admission.release())
+            started = True
+
+        try:
+            return await handler.handle_web_request(
+                request=request,
+                webrtc_connection_callback=webrtc_connection_callback,
+            )
+        finally:
+            if new_session and not started:
+                admission.release()
+
+    @app.patch("/api/offer")
+    async def ice_candidate(request: SmallWebRTCPatchRequest):
+        await handler.handle_patch_request(request)
+        return {"status": "success"}
+
+    @app.get("/stalls")
+    async def stalls():
+        return {"stalls": lag_monitor.recent_stalls()}
+
+    @app.get("/health")
+    async def health():
+        status = {
+            "pid": os.getpid(),
+            "ready": warmup_future.done() and warmup_future.exception() is None,
+            "active_sessions": len(active_sessions),
+            "pc_ids": sorted(session_pc_ids),
+            "loop_lag": lag_monitor.snapshot(),
+            "admission": admission.snapshot(),
+            "pipeline_pool": pipeline_pool.snapshot() if pipeline_pool else None,
+            "memory_mb": process_memory(os.getpid()),
+        }
+        # Service stats are null until warm-up has finished and their modules are loaded
+        for name in STATS_NAMES:
+            status[name] = stats_sources[name]() if stats_sources else None
+        return status
+
+    return app
+
+
+STATS_NAMES = ("tts_cache", "speculation", "stt_segments", "stt_upload", "local_stt")
+
+
+def _load_stats_sources() -> dict:
+    """Readers for the service stats in /health. Importing them pulls in the service stack."""
+    from local_stt import get_local_stt_router
+    from segmented_stt import get_segmentation_stats
+    from speculation import get_speculation_stats
+    from stt_upload import get_upload_policy
+    from tts_cache import get_tts_cache
+
+    return {
+        "tts_cache": lambda: get_tts_cache().stats(),
+        "speculation": lambda: get_speculation_stats().snapshot(),
+        "stt_segments": lambda: get_segmentation_stats().snapshot(),
+        "stt_upload": lambda: get_upload_policy().snapshot() if get_upload_policy() else None,
+        "local_stt": lambda: get_local_stt_router().snapshot() if get_local_stt_router() else None,
+    }
+
+
+def run_worker(host: str, port: int):
+    uvicorn.run(
+        create_worker_app(), host=host, port=port, log_level="warning", loop=configure_event_loop()
+    )
+
+
+# ============================================================================
+# DISPATCHER
+# ============================================================================
+
+@dataclass
+class WorkerHandle:
+    """Dispatcher-side view of one worker process."""
+
+    index: int
+    port: int
+    host: str = "127.0.0.1"
+    process: Optional[subprocess.Popen] = None
+    pid: Optional[int] = None
+    ready: bool = False
+    healthy: bool = False
+    failures: int = 0
+    restarts: int = 0
+    active_sessions: int = 0
+    loop_lag_ms: float = 0.0
+    memory_mb: Dict[str, float] = field(default_factory=dict)
+    admission: dict = field(default_factory=dict)
+    pc_ids: Dict[str, float] = field(default_factory=dict)  # pc_id -> time routed (monotonic)
+
+    @property
+    def url(self) -> str:
+        # A wildcard bind accepts loopback connections; anything else is dialed as given
+        host = "127.0.0.1" if self.host in ("0.0.0.0", "::", "") else self.host
+        if ":" in host:
+            host = f"[{host}]"
+        return f"http://{host}:{self.port}"
+
+    @property
+    def load_score(self) -> float:
+        return self.active_sessions + self.loop_lag_ms / LAG_MS_PER_SESSION
+
+
+class Dispatcher:
+    """
+    Spawns and supervises worker processes and routes signaling to them.
+
+    Args:
+        num_workers: Number of worker processes
+        base_port: Port of worker 0; worker i listens on base_port + i
+        host: Interface workers bind to (media is served from there)
+        spawn_workers: Start and restart worker processes; False when another
+            launcher (prefork.py) owns them and we only route and health-check
+    """
+
+    def __init__(
+        self, num_workers: int, base_port: int, host: str = "127.0.0.1", spawn_workers: bool = True
+    ):
+        self.host = host
+        self.spawn_workers = spawn_workers
+        self.workers: List[WorkerHandle] = [
+            WorkerHandle(index=i, port=base_port + i, host=host) for i in range(num_workers)
+        ]
+        self.sessions: Dict[str, WorkerHandle] = {}  # pc_id -> worker
+        self.rejections = 0  # Offers a worker shed with 503
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._supervisor: Optional[asyncio.Task] = None
+
+    # -- process management ---------------------------------------------------
+
+    def _spawn(self, worker: WorkerHandle):
+        worker.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "worker",
+             "--host", self.host, "--port", str(worker.port)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            # Lets INFER_CPU_AFFINITY=auto give each worker its own cores
+            env={**os.environ, "WORKER_INDEX": str(worker.index), "WORKER_COUNT": str(len(self.workers))},
+        )
+        worker.pid = worker.process.pid
+        worker.ready = worker.healthy = False
+        worker.failures = 0
+        logger.info(f"Worker {worker.index} started (pid {worker.process.pid}, port {worker.port})")
+
+    def _restart(self, worker: WorkerHandle, reason: str):
+        logger.warning(f"Restarting worker {worker.index}: {reason}")
+        if worker.process and worker.process.poll() is None:
+            worker.process.kill()
+            worker.process.wait()
+        # Sessions on a dead worker are gone; forget their routing
+        for pc_id in worker.pc_ids:
+            self.sessions.pop(pc_id, None)
+        worker.pc_ids.clear()
+        worker.active_sessions = 0
+        worker.restarts += 1
+        self._spawn(worker)
+
+    async def start(self):
+        self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
+        if self.spawn_workers:
+            for worker in self.workers:
+                self._spawn(worker)
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        if self._supervisor:
+            self._supervisor.cancel()
+        for worker in self.workers:
+            if worker.process and worker.process.poll() is None:
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process:
+                worker.process.wait(timeout=10)
+        if self._http:
+            await self._http.close()
+
+    async def _check(self, worker: WorkerHandle):
+        if self.spawn_workers and (worker.process is None or worker.process.poll() is not None):
+            code = worker.process.returncode if worker.process else None
+            self._restart(worker, f"process exited with code {code}")
+            return
+        polled_at = time.monotonic()
+        try:
+            async with self._http.get(
+                f"{worker.url}/health", timeout=aiohttp.ClientTimeout(total=HEALTH_TIMEOUT_SECS)
+            ) as response:
+                status = await response.json()
+            worker.failures = 0
+            worker.healthy = True
+            worker.pid = status["pid"]
+            worker.ready = status["ready"]
+            worker.active_sessions = status["active_sessions"]
+            worker.loop_lag_ms = status["loop_lag"]["lag_ms"]
+            worker.memory_mb = status.get("memory_mb", {})
+            worker.admission = status.get("admission", {})
+            self._prune_sessions(worker, set(status.get("pc_ids", [])), polled_at)
+        except Exception:
+            worker.failures += 1
+            # A worker that is still importing/binding is not a failure yet
+            if worker.failures >= UNHEALTHY_AFTER_FAILURES:
+                worker.healthy = False
+            if self.spawn_workers and worker.failures >= RESTART_AFTER_FAILURES:
+                self._restart(worker, f"{worker.failures} failed health checks")
+
+    def _prune_sessions(self, worker: WorkerHandle, live: Set[str], polled_at: float):
+        """Forget routing for sessions that have ended on the worker."""
+        # Sessions routed after the poll was sent may not be in its answer yet
+        ended = [
+            pc_id for pc_id, routed_at in worker.pc_ids.items()
+            if pc_id not in live and routed_at < polled_at
+        ]
+        for pc_id in ended:
+            del worker.pc_ids[pc_id]
+            self.sessions.pop(pc_id, None)
+
+    async def _supervise(self):
+        while True:
+            await asyncio.gather(*(self._check(w) for w in self.workers))
+            await asyncio.sleep(HEALTH_INTERVAL_SECS)
+
+    # -- routing ----------------------------------------------------------------
+
+    def rank_workers(self) -> List[WorkerHandle]:
+        """Healthy, ready workers, least loaded first."""
+        candidates = [w for w in self.workers if w.healthy and w.ready]
+        return sorted(candidates, key=lambda w: w.load_score)
+
+    async def forward_offer(self, body: dict):
+        pc_id = body.get("pc_id")
+        owner = self.sessions.get(pc_id) if pc_id else None
+        workers = [owner] if owner else self.rank_workers()
+        if not workers:
+            return JSONResponse(
+                {"error": "server_busy", "reason": "no_worker", "retry_after_secs": 2.0},
+                status_code=503,
+                headers={"Retry-After": "2"},
+            )
+
+        busy = {"error": "server_busy", "reason": "no_worker", "retry_after_secs": 2.0}
+        for worker in workers:
+            try:
+                async with self._http.post(f"{worker.url}/api/offer", json=body) as response:
+                    if response.status == 503:
+                        # Shed by the worker's admission control; try the next one
+                        busy = await response.json()
+                        self.rejections += 1
+                        continue
+                    if response.status != 200:
+                        raise HTTPException(status_code=response.status, detail=await response.text())
+                    answer = await response.json()
+                    break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Died since the last health poll; the supervisor will notice, try the next one
+                logger.warning(f"Worker {worker.index} unreachable for an offer: {e}")
+                worker.healthy = False
+                continue
+        else:
+            return JSONResponse(
+                busy, status_code=503, headers={"Retry-After": str(int(busy["retry_after_secs"]))}
+            )
+
+        new_pc_id = answer.get("pc_id")
+        if new_pc_id and new_pc_id not in self.sessions:
+            self.sessions[new_pc_id] = worker
+            worker.pc_ids[new_pc_id] = time.monotonic()
+            # Count it now so a burst of offers spreads before the next health poll
+            worker.active_sessions += 1
+        return answer
+
+    async def forward_patch(self, body: dict):
+        worker = self.sessions.get(body.get("pc_id"))
+        if worker is None:
+            raise HTTPException(status_code=404, detail="Unknown pc_id")
+        try:
+            async with self._http.patch(f"{worker.url}/api/offer", json=body) as response:
+                if response.status != 200:
+                    raise HTTPException(status_code=response.status, detail=await response.text())
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # The session lives on that worker only, there is nothing to fail over to
+            logger.warning(f"Worker {worker.index} unreachable for an ICE patch: {e}")
+            worker.healthy = False
+            return JSONResponse({"error": "worker_unreachable", "pc_id": body.get("pc_id")}, status_code=502)
+
+    def status(self) -> dict:
+        return {
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.pid,
+                    "port": w.port,
+                    "ready": w.ready,
+                    "healthy": w.healthy,
+                    "active_sessions": w.active_sessions,
+                    "loop_lag_ms": w.loop_lag_ms,
+                    "memory_mb": w.memory_mb,
+                    "admission": w.admission,
+                    "restarts": w.restarts,
+                }
+                for w in self.workers
+            ],
+            "routed_sessions": len(self.sessions),
+            "worker_rejections": self.rejections,
+        }
+
+
+def create_dispatcher_app(dispatcher: Dispatcher) -> FastAPI:
+    from pipecat_ai_small_webrtc_prebuilt.frontend import SmallWebRTCPrebuiltUI
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await dispatcher.start()
+        yield
+        await dispatcher.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.mount("/client", SmallWebRTCPrebuiltUI)
+
+    @app.get("/", include_in_schema=False)
+    async def root_redirect():
+        return RedirectResponse(url="/client/")
+
+    @app.post("/api/offer")
+    async def offer(request: Request):
+        return await dispatcher.forward_offer(await request.json())
+
+    @app.patch("/api/offer")
+    async def ice_candidate(request: Request):
+        return await dispatcher.forward_patch(await request.json())
+
+    @app.get("/health")
+    async def health():
+        status = dispatcher.status()
+        code = 200 if any(w["healthy"] and w["ready"] for w in status["workers"]) else 503
+        return JSONResponse(status, status_code=code)
+
+    return app
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process bot server")
+    parser.add_argument("mode", nargs="?", default="dispatcher", choices=["dispatcher", "worker"])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--worker-base-port", type=int, default=7900)
+    parser.add_argument("--attach", action="store_true",
+                        help="Route to already-running workers instead of spawning them")
+    args = parser.parse_args()
+
+    if args.mode == "worker":
+        run_worker(args.host, args.port)
+        return
+
+    dispatcher = Dispatcher(
+        args.workers, args.worker_base_port, host=args.host, spawn_workers=not args.attach
+    )
+    print(f"🚀 Dispatcher with {args.workers} workers")
+    print(f"   → Open http://{args.host}:{args.port}/client in your browser")
+    uvicorn.run(
+        create_dispatcher_app(dispatcher), host=args.host, port=args.port, loop=configure_event_loop()
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""
+Optional sidecar process for VAD and turn inference.
+
+By default Silero and Smart Turn run inside the worker process, on executor
+threads next to the event loop that drives every session's transport. Their
+CPU time, and the GIL hand-offs around it, shows up as event-loop lag for
+every session in the process. With INFERENCE_SIDECAR=1 the models run in a
+dedicated process instead:
+
+- each session's input audio is written once into a shared-memory ring
+  (ShmAudioRing); the sidecar reads it in place, nothing is pickled
+- the worker only sends small (session, ring position) requests
+- the sidecar runs the Silero state machine, the Smart Turn prediction and
+  the per-turn audio stats, and sends back only decisions: VAD states,
+  end-of-turn probabilities and the turn's level
+
+On the worker side SidecarVADAnalyzer and SidecarSmartTurnAnalyzer stand in
+for the in-process analyzers, so the transport needs no changes. Smart
+Turn's buffering and silence tracking stay in BaseSmartTurn in the worker;
+only the prediction crosses over, as the ring range of the segment.
+"""
+
+import asyncio
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from pipecat.audio.turn.smart_turn.base_smart_turn import BaseSmartTurn
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
+
+# Ring length per session. Has to cover the longest Smart Turn segment
+# (pre_speech_ms + max_duration_secs, 8.5s by default) with room to spare.
+RING_SECONDS = 20
+MAX_SAMPLE_RATE = 16000
+
+_HEADER_BYTES = 64
+_STOP = ("stop",)
+
+
+# ============================================================================
+# SHARED-MEMORY RING
+# ============================================================================
+
+class ShmAudioRing:
+    """
+    Single-producer ring of int16 samples in shared memory.
+
+    Positions are absolute sample counts since the ring was created; the
+    sample at position p lives at index p % capacity. The worker writes and
+    the sidecar reads, and they agree on positions through the request
+    messages, so the ring itself needs no locking.
+
+    Args:
+        capacity: Ring size in samples
+        name: Attach to an existing ring instead of creating one
+    """
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        self.capacity = capacity
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=self._owner, size=_HEADER_BYTES + capacity * 2
+        )
+        self._header = np.ndarray((1,), dtype=np.uint64, buffer=self._shm.buf)
+        self._samples = np.ndarray(
+            (capacity,), dtype=np.int16, buffer=self._shm.buf, offset=_HEADER_BYTES
+        )
+        if self._owner:
+            self._header[0] = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def write_pos(self) -> int:
+        return int(self._header[0])
+
+    def write(self, buffer: bytes) -> int:
+        """Append int16 PCM and return the new write position."""
+        samples = np.frombuffer(buffer, dtype=np.int16)
+        pos = self.write_pos
+        end = pos + len(samples)
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity:]
+            pos = end - self.capacity
+        start = pos % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._samples[start:start + first] = samples[:first]
+        self._samples[:len(samples) - first] = samples[first:]
+        self._header[0] = end
+        return end
+
+    def read(self, end_pos: int, count: int) -> np.ndarray:
+        """
+        The count samples ending at end_pos.
+
+        A view into shared memory unless the range wraps around the end of
+        the ring, in which case the two halves are joined into a copy.
+        """
+        if count > self.capacity or end_pos - count < self.write_pos - self.capacity:
+            raise ValueError(f"Samples {end_pos - count}..{end_pos} were already overwritten")
+        start = (end_pos - count) % self.capacity
+        if start + count <= self.capacity:
+            return self._samples[start:start + count]
+        return np.concatenate((self._samples[start:], self._samples[:start + count - self.capacity]))
+
+    def close(self):
+        # The numpy views must go before the mapping can be closed
+        self._header = self._samples = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+# ============================================================================
+# SIDECAR PROCESS
+# ============================================================================
+
+class _SidecarSession:
+    """Inference state the sidecar keeps for one worker session."""
+
+    def __init__(self, ring_name: str, capacity: int, sample_rate: int, vad_params: VADParams, registry):
+        from model_pool import SharedSileroVADAnalyzer, create_energy_gate
+
+        self.ring = ShmAudioRing(capacity, name=ring_name)
+        self.sample_rate = sample_rate
+        self.vad = SharedSileroVADAnalyzer(
+            params=vad_params, registry=registry, energy_gate=create_energy_gate()
+        )
+        self.vad.set_sample_rate(sample_rate)
+        # Non-zero when a restarted sidecar re-opens a running session
+        self.read_pos = self.ring.write_pos
+
+    def analyze_vad(self, end_pos: int) -> VADState:
+        """Run the VAD over everything written since the last call."""
+        audio = self.ring.read(end_pos, end_pos - self.read_pos)
+        self.read_pos = end_pos
+        return self.vad._run_analyzer(audio.tobytes())
+
+    def predict_turn(self, registry, end_pos: int, count: int) -> Dict[str, float]:
+        """Smart Turn probability and level of the segment ending at end_pos."""
+        audio = self.ring.read(end_pos, count).astype(np.float32) / 32768.0
+        probability = registry.smart_turn_probability(registry.smart_turn_features(audio))
+        rms = float(np.sqrt(np.mean(np.square(audio), dtype=np.float64)))
+        return {
+            "probability": probability,
+            "duration_secs": count / self.sample_rate,
+            "level_db": 20 * float(np.log10(max(rms, 1e-10))),
+        }
+
+
+def _vad_loop(requests, results, sessions: Dict[int, _SidecarSession], registry):
+    """Session lifecycle and VAD requests, in arrival order."""
+    while True:
+        message = requests.get()
+        kind = message[0]
+        if kind == "stop":
+            return
+        try:
+            if kind == "open":
+                _, session_id, ring_name, capacity, sample_rate, vad_params = message
+                sessions[session_id] = _SidecarSession(
+                    ring_name, capacity, sample_rate, vad_params, registry
+                )
+            elif kind == "params":
+                _, session_id, vad_params = message
+                sessions[session_id].vad.set_params(vad_params)
+            elif kind == "close":
+                session = sessions.pop(message[1], None)
+                if session is not None:
+                    session.ring.close()
+            elif kind == "vad":
+                _, request_id, session_id, end_pos = message
+                state = sessions[session_id].analyze_vad(end_pos)
+                results.put(("ok", request_id, state.value))
+            elif kind == "confidence":
+                _, request_id, session_id, audio = message
+                results.put(("ok", request_id, float(sessions[session_id].vad.voice_confidence(audio))))
+        except Exception as e:
+            logger.exception(f"Sidecar {kind} request failed: {e}")
+            if kind in ("vad", "confidence"):
+                results.put(("error", message[1], repr(e)))
+
+
+def _turn_loop(requests, results, sessions: Dict[int, _SidecarSession], registry):
+    """Smart Turn requests; separate from VAD so a 60ms prediction never delays a frame."""
+    while True:
+        message = requests.get()
+        if message[0] == "stop":
+            return
+        _, request_id, session_id, end_pos, count = message
+        try:
+            results.put(("ok", request_id, sessions[session_id].predict_turn(registry, end_pos, count)))
+        except Exception as e:
+            logger.exception(f"Sidecar turn request failed: {e}")
+            results.put(("error", request_id, repr(e)))
+
+
+def run_sidecar(vad_requests, turn_requests, results, ready):
+    """Entry point of the sidecar process."""
+    from model_pool import get_model_registry
+    from thread_budget import get_thread_budget
+
+    get_thread_budget().apply_to_process()
+    registry = get_model_registry()
+    registry.warm_up()
+
+    # Only touched from the VAD thread, except for lookups by the turn thread
+    sessions: Dict[int, _SidecarSession] = {}
+    threads = [
+        threading.Thread(target=_vad_loop, args=(vad_requests, results, sessions, registry), name="sidecar-vad"),
+        threading.Thread(target=_turn_loop, args=(turn_requests, results, sessions, registry), name="sidecar-turn"),
+    ]
+    for t in threads:
+        t.start()
+    logger.info(f"Inference sidecar ready (pid {os.getpid()})")
+    ready.set()
+    for t in threads:
+        t.join()
+
+
+# ============================================================================
+# WORKER SIDE
+# ============================================================================
+
+class SidecarClient:
+    """
+    Worker-side handle on the sidecar process.
+
+    Requests go out on two queues (VAD and lifecycle in one, turn
+    predictions in the other) and a reader thread resolves the matching
+    futures as results come back. If the sidecar dies, pending requests fail
+    and a new one is started with the open sessions re-registered; requests
+    made while it starts fail immediately instead of waiting for it.
+
+    Args:
+        start_timeout_secs: How long start() waits for the models to load
+    """
+
+    def __init__(self, start_timeout_secs: float = 60.0):
+        self.start_timeout_secs = start_timeout_secs
+        self.process: Optional[mp.Process] = None
+        self.restarts = 0
+        self._stopping = False
+        self._restarting = False
+        # Spawn, not fork: a forked child would inherit the worker's event
+        # loop, threads and onnxruntime pools in whatever state they are in
+        self._ctx = mp.get_context("spawn")
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._sessions: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Start the sidecar (idempotent) and wait until its models are warm."""
+        with self._lock:
+            if self.running:
+                return
+            self._spawn()
+        if self._reader is None:
+            self._reader = threading.Thread(target=self._read_results, name="sidecar-results", daemon=True)
+            self._reader.start()
+
+    def _spawn(self):
+        self._vad_requests = self._ctx.Queue()
+        self._turn_requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        ready = self._ctx.Event()
+        self.process = self._ctx.Process(
+            target=run_sidecar,
+            args=(self._vad_requests, self._turn_requests, self._results, ready),
+            name="inference-sidecar",
+            daemon=True,
+        )
+        start = time.perf_counter()
+        self.process.start()
+        if not ready.wait(self.start_timeout_secs):
+            self.process.kill()
+            raise RuntimeError(f"Inference sidecar not ready after {self.start_timeout_secs:.0f}s")
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for message in sessions:
+            self._vad_requests.put(message)
+        logger.info(
+            f"Inference sidecar pid {self.process.pid} started in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _read_results(self):
+        while True:
+            try:
+                status, request_id, payload = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if self._stopping:
+                    return
+                if not self.running:
+                    self._recover()
+                continue
+            except (EOFError, OSError):
+                if self._stopping:
+                    return
+                self._recover()
+                continue
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if status == "ok":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(f"Sidecar request failed: {payload}"))
+
+    def _recover(self):
+        logger.error(f"Inference sidecar exited ({self.process.exitcode}), restarting")
+        with self._lock:
+            self._restarting = True
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(RuntimeError("Inference sidecar exited"))
+            self.restarts += 1
+        # Outside the lock: loading the models takes seconds, and _request
+        # is called from the event loop
+        try:
+            self._spawn()
+        except Exception as e:
+            # Still restarting; the reader tries again on its next poll
+            logger.error(f"Inference sidecar restart failed: {e}")
+            return
+        with self._lock:
+            self._restarting = False
+
+    def _request(self, requests, message_without_id) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._restarting:
+                future.set_exception(RuntimeError("Inference sidecar is restarting"))
+                return future
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        requests.put((message_without_id[0], request_id, *message_without_id[1:]))
+        return future
+
+    def open_session(self, ring: ShmAudioRing, sample_rate: int, vad_params: VADParams) -> int:
+        session_id = next(self._ids)
+        message = ("open", session_id, ring.name, ring.capacity, sample_rate, vad_params)
+        with self._lock:
+            self._sessions[session_id] = message
+        self._vad_requests.put(message)
+        return session_id
+
+    def update_params(self, session_id: int, vad_params: VADParams):
+        with self._lock:
+            message = self._sessions[session_id]
+            self._sessions[session_id] = (*message[:5], vad_params)
+        self._vad_requests.put(("params", session_id, vad_params))
+
+    def close_session(self, session_id: int):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self._vad_requests.put(("close", session_id))
+
+    def analyze_vad(self, session_id: int, end_pos: int) -> Future:
+        return self._request(self._vad_requests, ("vad", session_id, end_pos))
+
+    def voice_confidence(self, session_id: int, audio: bytes) -> Future:
+        return self._request(self._vad_requests, ("confidence", session_id, bytes(audio)))
+
+    def predict_turn(self, session_id: int, end_pos: int, count: int) -> Future:
+        return self._request(self._turn_requests, ("turn", session_id, end_pos, count))
+
+    def stop(self):
+        self._stopping = True
+        if self.running:
+            self._vad_requests.put(_STOP)
+            self._turn_requests.put(_STOP)
+            self.process.join(timeout=5)
+
+
+class SidecarVADAnalyzer(VADAnalyzer):
+    """
+    VADAnalyzer whose inference and state machine run in the sidecar.
+
+    analyze_audio() copies the frame into this session's ring and awaits the
+    VAD state the sidecar computed for it; while the sidecar is down it keeps
+    the last state. Call close() when the session ends to free the ring and
+    the sidecar's state.
+
+    Args:
+        client: Sidecar to run on
+        params: VAD parameters for detection thresholds and timing
+    """
+
+    def __init__(self, client: SidecarClient, *, params: Optional[VADParams] = None):
+        super().__init__(params=params)
+        self._client = client
+        self.ring = ShmAudioRing(RING_SECONDS * MAX_SAMPLE_RATE)
+        self.session_id: Optional[int] = None
+
+    def num_frames_required(self) -> int:
+        return 512 if self.sample_rate == 16000 else 256
+
+    def voice_confidence(self, buffer) -> float:
+        """Silero confidence for one window, from the sidecar. Blocks until it answers."""
+        return self._client.voice_confidence(self.session_id, buffer).result()
+
+    def set_sample_rate(self, sample_rate: int):
+        super().set_sample_rate(sample_rate)
+        if self.session_id is None:
+            self.session_id = self._client.open_session(self.ring, self.sample_rate, self.params)
+
+    def set_params(self, params: VADParams):
+        super().set_params(params)
+        if getattr(self, "session_id", None) is not None:
+            self._client.update_params(self.session_id, params)
+
+    async def analyze_audio(self, buffer: bytes) -> VADState:
+        end_pos = self.ring.write(buffer)
+        try:
+            state = VADState(await asyncio.wrap_future(self._client.analyze_vad(self.session_id, end_pos)))
+        except RuntimeError:
+            return self._vad_state
+        self._vad_state = state
+        return state
+
+    def close(self):
+        if self.session_id is not None:
+            self._client.close_session(self.session_id)
+            self.session_id = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+class SidecarSmartTurnAnalyzer(BaseSmartTurn):
+    """
+    Smart Turn analyzer that sends only the prediction to the sidecar.
+
+    BaseSmartTurn keeps the turn buffer as the tail of the session's audio,
+    and the VAD analyzer has already written that audio to the ring, so the
+    segment is identified by (ring position of its last sample, length).
+    That position is recorded as each chunk is appended and read together
+    with the buffer, since the ring keeps moving while a prediction waits
+    for the executor.
+
+    Args:
+        client: Sidecar to run on
+        vad_analyzer: The same session's SidecarVADAnalyzer (owner of the ring)
+        **kwargs: Passed to BaseSmartTurn (sample_rate, params)
+    """
+
+    def __init__(self, client: SidecarClient, vad_analyzer: SidecarVADAnalyzer, **kwargs):
+        super().__init__(**kwargs)
+        self._client = client
+        self._vad = vad_analyzer
+        # Ring position the turn buffer's last chunk ends at, and the one of the segment being predicted
+        self._end_pos = 0
+        self._segment_end_pos = 0
+        self._end_pos_lock = threading.Lock()
+
+    def append_audio(self, buffer: bytes, is_speech: bool):
+        with self._end_pos_lock:
+            state = super().append_audio(buffer, is_speech)
+            self._end_pos = self._vad.ring.write_pos
+        return state
+
+    def _process_speech_segment(self, audio_buffer):
+        """Runs on this session's executor thread, against a consistent snapshot of the buffer."""
+        with self._end_pos_lock:
+            snapshot = list(audio_buffer)
+            self._segment_end_pos = self._end_pos
+        return super()._process_speech_segment(snapshot)
+
+    def _predict_endpoint(self, audio_array: np.ndarray) -> Dict[str, Any]:
+        """Runs on this session's executor thread and blocks it until the sidecar answers."""
+        result = self._client.predict_turn(
+            self._vad.session_id, self._segment_end_pos, len(audio_array)
+        ).result()
+        logger.debug(
+            f"Turn audio: {result['duration_secs']:.2f}s at {result['level_db']:.1f} dBFS, "
+            f"p(complete)={result['probability']:.3f}"
+        )
+        return {
+            "prediction": 1 if result["probability"] > 0.5 else 0,
+            "probability": result["probability"],
+        }
+
+
+_client: Optional[SidecarClient] = None
+_client_lock = threading.Lock()
+
+
+def sidecar_enabled() -> bool:
+    return os.getenv("INFERENCE_SIDECAR", "0") == "1"
+
+
+def get_sidecar_client() -> SidecarClient:
+    """Process-wide sidecar client, started on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SidecarClient(float(os.getenv("SIDECAR_START_TIMEOUT_SECS", "60")))
+    _client.start()
+    return _client
@@ -0,0 +1,354 @@
+"""
+Speculative STT + LLM between VAD stop and the confirmed end of turn.
+
+With a turn analyzer the transport reports VADUserStoppedSpeakingFrame as
+soon as VAD goes quiet (stop_secs=0.2), but UserStoppedSpeakingFrame only
+once smart-turn confirms the turn is over: after its inference, or after the
+silence timeout when it predicted "incomplete". Whisper and the LLM both
+wait for the confirmation, so their latency adds up on top of endpointing.
+
+Speculative mode starts both at VAD stop instead:
+
+- SpeculativeGroqSTTService transcribes what is left of the turn on
+  VADUserStoppedSpeakingFrame, in a background task: the segments already
+  sent by the pipelined base (segmented_stt.py) plus the audio after the
+  last cut. The transcript is held, not pushed. On the confirmed stop the
+  held transcript is emitted (awaiting the request if it is still running)
+  instead of starting a new one. If the user resumes
+  (VADUserStartedSpeakingFrame) the speculation is cancelled; the next VAD
+  stop speculates again on the longer buffer.
+- Once the transcript is in, SpeculativeGroqLLMService opens a completion
+  for the current context plus that transcript as the next user message,
+  and buffers the chunks. Nothing reaches TTS: the LLM pushes frames only
+  when the real context arrives, after the user aggregator has seen the
+  confirmed transcript. If that context is the speculated one (same
+  messages, tools and tool choice) the buffered chunks are replayed and
+  the rest of the stream follows live. Otherwise the speculation is closed
+  and a normal completion is made.
+
+A speculation that does not get used costs its prompt tokens and whatever
+was generated before it was closed. SpeculationStats counts both (from the
+stream's usage chunk when it got that far, estimated at 4 characters per
+token otherwise), together with the hit rate and the latency each hit
+saved: the time the request had been running when the turn was confirmed,
+capped at the time it took to produce its first result. /health reports
+them. SPECULATIVE_TURNS=1 enables the mode in main.py.
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from typing import AsyncGenerator, Deque, List, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    Frame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameDirection
+
+from client_pool import PooledGroqLLMService
+from segmented_stt import PipelinedGroqSTTService
+
+CHARS_PER_TOKEN = 4
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+class SpeculationStats:
+    """Process-wide counters for speculative turns."""
+
+    def __init__(self):
+        self.stt_started = 0
+        self.stt_reused = 0
+        self.llm_started = 0
+        self.hits = 0
+        # Why unused LLM speculations were dropped: resumed / mismatch / superseded
+        self.discarded: Counter = Counter()
+        self.wasted_prompt_tokens = 0
+        self.wasted_completion_tokens = 0
+        self.stt_saved_ms: Deque[float] = deque(maxlen=1000)
+        self.llm_saved_ms: Deque[float] = deque(maxlen=1000)
+
+    @staticmethod
+    def _p50(values: Deque[float]) -> Optional[float]:
+        ordered = sorted(values)
+        return round(ordered[len(ordered) // 2], 1) if ordered else None
+
+    def snapshot(self) -> dict:
+        return {
+            "stt_started": self.stt_started,
+            "stt_reused": self.stt_reused,
+            "llm_started": self.llm_started,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.llm_started, 3) if self.llm_started else None,
+            "discarded": dict(self.discarded),
+            "wasted_prompt_tokens": self.wasted_prompt_tokens,
+            "wasted_completion_tokens": self.wasted_completion_tokens,
+            "p50_stt_saved_ms": self._p50(self.stt_saved_ms),
+            "p50_llm_saved_ms": self._p50(self.llm_saved_ms),
+        }
+
+
+_stats: Optional[SpeculationStats] = None
+
+
+def get_speculation_stats() -> SpeculationStats:
+    global _stats
+    if _stats is None:
+        _stats = SpeculationStats()
+    return _stats
+
+
+# ============================================================================
+# LLM
+# ============================================================================
+
+def _fingerprint(value) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class SpeculativeCompletion:
+    """
+    One completion started ahead of its context, buffering the stream.
+
+    Args:
+        params: Invocation params (messages, tools, tool_choice) it was opened with
+    """
+
+    def __init__(self, params: dict):
+        self.params = params
+        self.started_at = time.monotonic()
+        self.first_chunk_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+        self._chunks: List = []
+        self._stream = None
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._updated = asyncio.Event()
+        self._usage = None
+        self._content_chars = 0
+
+    async def run(self, open_stream):
+        try:
+            self._stream = await open_stream(self.params)
+            async for chunk in self._stream:
+                if self.first_chunk_at is None and chunk.choices:
+                    self.first_chunk_at = time.monotonic()
+                if chunk.usage:
+                    self._usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    self._content_chars += len(chunk.choices[0].delta.content)
+                self._chunks.append(chunk)
+                self._updated.set()
+        except asyncio.CancelledError:
+            if self._stream is not None:
+                await self._stream.close()
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._updated.set()
+
+    def matches(self, params: dict) -> bool:
+        """Whether params asks for the speculated completion."""
+        mine, theirs = self.params["messages"], params["messages"]
+        if len(mine) != len(theirs) or not theirs:
+            return False
+        last = theirs[-1]
+        if not isinstance(last, dict) or last.get("role") != "user":
+            return False
+        if str(last.get("content", "")).strip() != str(mine[-1]["content"]).strip():
+            return False
+        return _fingerprint(
+            (mine[:-1], self.params.get("tools"), self.params.get("tool_choice"))
+        ) == _fingerprint((theirs[:-1], params.get("tools"), params.get("tool_choice")))
+
+    async def replay(self, committed_at: float) -> AsyncGenerator:
+        """Buffered chunks first, then the rest of the stream as it arrives."""
+        index = 0
+        try:
+            while True:
+                if index < len(self._chunks):
+                    if index == 0:
+                        first = self.first_chunk_at or time.monotonic()
+                        get_speculation_stats().llm_saved_ms.append(
+                            (min(first, committed_at) - self.started_at) * 1000
+                        )
+                    yield self._chunks[index]
+                    index += 1
+                    continue
+                if self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                self._updated.clear()
+                if index >= len(self._chunks) and not self._done:
+                    await self._updated.wait()
+        finally:
+            # Interrupted mid-response: stop reading the stream
+            if not self._done and self.task is not None:
+                self.task.cancel()
+
+    async def cancel(self, reason: str):
+        stats = get_speculation_stats()
+        stats.discarded[reason] += 1
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if self._stream is not None:
+            try:
+                await self._stream.close()
+            except Exception:
+                pass
+            if self._usage is not None:
+                stats.wasted_prompt_tokens += self._usage.prompt_tokens
+                stats.wasted_completion_tokens += self._usage.completion_tokens
+            else:
+                stats.wasted_prompt_tokens += len(_fingerprint(self.params["messages"])) // CHARS_PER_TOKEN
+                stats.wasted_completion_tokens += self._content_chars // CHARS_PER_TOKEN
+
+
+class SpeculativeGroqLLMService(PooledGroqLLMService):
+    """
+    PooledGroqLLMService that can start a completion before its context is
+    final and hand it over when the real request matches.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._speculation: Optional[SpeculativeCompletion] = None
+
+    async def speculate(self, context: LLMContext, user_text: str):
+        """Start the completion context would get with user_text as the next user message."""
+        if self._speculation is not None:
+            await self._speculation.cancel("superseded")
+
+        speculative_context = LLMContext(
+            messages=list(context.get_messages()) + [{"role": "user", "content": user_text}],
+            tools=context.tools,
+            tool_choice=context.tool_choice,
+        )
+        params = self.get_llm_adapter().get_llm_invocation_params(speculative_context)
+        speculation = SpeculativeCompletion(params)
+        speculation.task = self.create_task(speculation.run(self._open_stream), "speculative_completion")
+        self._speculation = speculation
+        get_speculation_stats().llm_started += 1
+        logger.debug(f"{self}: speculating on [{user_text}]")
+
+    async def cancel_speculation(self, reason: str):
+        if self._speculation is not None:
+            speculation, self._speculation = self._speculation, None
+            await speculation.cancel(reason)
+
+    async def _open_stream(self, params: dict):
+        return await super().get_chat_completions(params)
+
+    async def get_chat_completions(self, params_from_context):
+        speculation, self._speculation = self._speculation, None
+        if speculation is not None:
+            if speculation.matches(params_from_context):
+                get_speculation_stats().hits += 1
+                logger.debug(f"{self}: using speculative completion")
+                return speculation.replay(time.monotonic())
+            await speculation.cancel("mismatch")
+        return await super().get_chat_completions(params_from_context)
+
+    async def cleanup(self):
+        await self.cancel_speculation("superseded")
+        await super().cleanup()
+
+
+# ============================================================================
+# STT
+# ============================================================================
+
+class SpeculativeGroqSTTService(PipelinedGroqSTTService):
+    """
+    PipelinedGroqSTTService that transcribes what is left of the turn at VAD
+    stop and holds the transcript until the turn is confirmed. Segments
+    already sent stay valid when the user resumes; only the tail is redone.
+
+    Call attach_llm() to also speculate the LLM response from the transcript.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._llm: Optional[SpeculativeGroqLLMService] = None
+        self._context: Optional[LLMContext] = None
+        self._speculation: Optional[asyncio.Task] = None
+        self._speculation_started_at = 0.0
+        self._speculation_done_at: Optional[float] = None
+        self._held_text: Optional[str] = None
+
+    def attach_llm(self, llm: SpeculativeGroqLLMService, context: LLMContext):
+        self._llm = llm
+        self._context = context
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        # The pipelined base cuts its segment at VAD stop first
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, VADUserStoppedSpeakingFrame) and self._user_speaking and not self.is_muted:
+            await self._cancel_speculation("superseded")
+            self._speculation_started_at = time.monotonic()
+            self._speculation_done_at = None
+            self._held_text = None
+            self._speculation = self.create_task(self._speculate(self._remaining_audio()), "speculative_stt")
+            get_speculation_stats().stt_started += 1
+        elif isinstance(frame, VADUserStartedSpeakingFrame):
+            await self._cancel_speculation("resumed")
+
+    async def _speculate(self, tail_audio: Optional[bytes]):
+        text = await self._transcribe_remaining(tail_audio)
+        if text is None:
+            return
+        self._speculation_done_at = time.monotonic()
+        self._held_text = text
+        if text and self._llm is not None:
+            await self._llm.speculate(self._context, text)
+
+    async def _cancel_speculation(self, reason: str):
+        if self._speculation is not None:
+            await self.cancel_task(self._speculation)
+            self._speculation = None
+        if self._llm is not None:
+            await self._llm.cancel_speculation(reason)
+
+    async def _handle_user_stopped_speaking(self, frame: UserStoppedSpeakingFrame):
+        speculation, self._speculation = self._speculation, None
+        if frame.emulated or speculation is None:
+            await super()._handle_user_stopped_speaking(frame)
+            return
+
+        committed_at = time.monotonic()
+        await speculation
+        text, self._held_text = self._held_text, None
+        if text is None:
+            await super()._handle_user_stopped_speaking(frame)
+            return
+
+        stats = get_speculation_stats()
+        stats.stt_reused += 1
+        stats.stt_saved_ms.append(
+            (min(self._speculation_done_at or committed_at, committed_at) - self._speculation_started_at) * 1000
+        )
+        await self._emit_transcript(text)
+
+    async def cleanup(self):
+        if self._speculation is not None:
+            await self.cancel_task(self._speculation)
+            self._speculation = None
+        await super().cleanup()
@@ -0,0 +1,193 @@
+"""
+Compressed audio upload for Whisper requests.
+
+Every STT request uploads the utterance as 16-bit PCM WAV, 32 kB per second
+of speech at 16 kHz. On a constrained egress link that upload sits directly
+in the user-stop -> bot-start latency. Groq's Whisper endpoint accepts FLAC
+and Ogg/Opus as well:
+
+- FLAC is lossless and takes a few ms per second of audio, usually 30-40%
+  smaller than WAV for speech.
+- Opus at 24 kbps is ~10x smaller than WAV but costs ~10-15 ms of CPU per
+  second of audio, and is lossy (Whisper copes well with speech codecs at
+  that bitrate).
+
+UploadPolicy picks, per request, the candidate codec with the lowest
+expected encode + upload time at the configured uplink bandwidth. It learns
+each codec's bytes and encode time per second of audio from the requests
+it has encoded, starting from typical values. Fast links end up on WAV or
+FLAC, slow ones on Opus. Encoding runs in a worker thread (asyncio.to_thread)
+so the event loop only waits for it, it is never blocked by it.
+
+Codecs come from PyAV (already installed for the WebRTC transport).
+STT_UPLOAD_CODEC selects the mode: wav (default, unchanged behaviour),
+flac, opus or auto; STT_UPLINK_KBPS is the uplink used by auto, and
+STT_UPLOAD_CODECS the codecs it may choose from. bench_stt_upload.py
+compares the codecs against a local stand-in endpoint.
+"""
+
+import io
+import os
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import av
+import numpy as np
+
+OPUS_BITRATE = 24000
+
+# Starting estimates: (bytes per audio second, encode ms per audio second) at 16 kHz
+_PRIORS: Dict[str, Tuple[float, float]] = {
+    "wav": (32000.0, 0.0),
+    "flac": (21000.0, 1.5),
+    "opus": (3000.0, 12.0),
+}
+_FORMATS = {
+    "flac": ("audio.flac", "audio/flac"),
+    "opus": ("audio.ogg", "audio/ogg"),
+    "wav": ("audio.wav", "audio/wav"),
+}
+
+
+@dataclass
+class EncodedAudio:
+    data: bytes
+    filename: str
+    content_type: str
+    codec: str
+    audio_secs: float
+    encode_ms: float
+
+
+def read_wav(data: bytes) -> Tuple[bytes, int]:
+    """PCM frames and sample rate of a 16-bit mono WAV."""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def encode_pcm(pcm: bytes, sample_rate: int, codec: str, opus_bitrate: int = OPUS_BITRATE) -> bytes:
+    """Encode 16-bit mono PCM as a FLAC or Ogg/Opus file."""
+    container, codec_name, options = {
+        "flac": ("flac", "flac", {}),
+        "opus": ("ogg", "libopus", {"application": "voip"}),
+    }[codec]
+    out = io.BytesIO()
+    with av.open(out, "w", format=container) as output:
+        stream = output.add_stream(codec_name, rate=sample_rate, layout="mono", options=options)
+        if codec == "opus":
+            stream.bit_rate = opus_bitrate
+        frame = av.AudioFrame.from_ndarray(
+            np.frombuffer(pcm, dtype=np.int16).reshape(1, -1), format="s16", layout="mono"
+        )
+        frame.sample_rate = sample_rate
+        for packet in stream.encode(frame):
+            output.mux(packet)
+        for packet in stream.encode(None):
+            output.mux(packet)
+    return out.getvalue()
+
+
+class UploadPolicy:
+    """
+    Chooses and applies the upload codec for each STT request.
+
+    Args:
+        codec: "wav", "flac", "opus", or "auto" to choose per request
+        uplink_kbps: Upload bandwidth to the STT endpoint, used by auto
+        candidates: Codecs auto may choose from
+        opus_bitrate: Opus target bitrate in bits per second
+    """
+
+    def __init__(
+        self,
+        codec: str = "auto",
+        uplink_kbps: float = 2000.0,
+        candidates: Optional[List[str]] = None,
+        opus_bitrate: int = OPUS_BITRATE,
+    ):
+        self.codec = codec
+        self.uplink_kbps = uplink_kbps
+        self.candidates = candidates or ["wav", "flac", "opus"]
+        self.opus_bitrate = opus_bitrate
+
+        self._bytes_per_sec = {codec: prior[0] for codec, prior in _PRIORS.items()}
+        self._encode_ms_per_sec = {codec: prior[1] for codec, prior in _PRIORS.items()}
+        self.requests: Dict[str, int] = {codec: 0 for codec in _PRIORS}
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.encode_ms = 0.0
+        self._lock = threading.Lock()
+
+    def expected_ms(self, codec: str, audio_secs: float) -> float:
+        """Expected encode + upload time for audio_secs of speech."""
+        upload_ms = self._bytes_per_sec[codec] * audio_secs * 8 / self.uplink_kbps
+        return self._encode_ms_per_sec[codec] * audio_secs + upload_ms
+
+    def choose(self, audio_secs: float) -> str:
+        if self.codec != "auto":
+            return self.codec
+        with self._lock:
+            return min(self.candidates, key=lambda codec: self.expected_ms(codec, audio_secs))
+
+    def encode(self, wav_bytes: bytes) -> EncodedAudio:
+        """Re-encode a WAV request body with the chosen codec. Blocking, run it in a thread."""
+        pcm, sample_rate = read_wav(wav_bytes)
+        audio_secs = len(pcm) / (2 * sample_rate)
+        codec = self.choose(audio_secs)
+
+        start = time.perf_counter()
+        data = wav_bytes if codec == "wav" else encode_pcm(pcm, sample_rate, codec, self.opus_bitrate)
+        encode_ms = (time.perf_counter() - start) * 1000
+        self._observe(codec, audio_secs, len(data), encode_ms, len(wav_bytes))
+
+        filename, content_type = _FORMATS[codec]
+        return EncodedAudio(data, filename, content_type, codec, audio_secs, encode_ms)
+
+    def _observe(self, codec: str, audio_secs: float, size: int, encode_ms: float, raw_size: int):
+        with self._lock:
+            self.requests[codec] += 1
+            self.raw_bytes += raw_size
+            self.sent_bytes += size
+            self.encode_ms += encode_ms
+            if audio_secs >= 0.5:
+                # Short clips are dominated by container overhead, they would skew the rates
+                self._bytes_per_sec[codec] = 0.8 * self._bytes_per_sec[codec] + 0.2 * size / audio_secs
+                self._encode_ms_per_sec[codec] = (
+                    0.8 * self._encode_ms_per_sec[codec] + 0.2 * encode_ms / audio_secs
+                )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = sum(self.requests.values())
+            return {
+                "codec": self.codec,
+                "uplink_kbps": self.uplink_kbps,
+                "requests": dict(self.requests),
+                "sent_ratio": round(self.sent_bytes / self.raw_bytes, 3) if self.raw_bytes else None,
+                "mean_encode_ms": round(self.encode_ms / total, 2) if total else None,
+            }
+
+
+_policy: Optional[UploadPolicy] = None
+
+
+def get_upload_policy() -> Optional[UploadPolicy]:
+    """
+    Process-wide upload policy, or None when STT_UPLOAD_CODEC is unset or
+    "wav" (requests are sent exactly as before).
+    """
+    global _policy
+    codec = os.getenv("STT_UPLOAD_CODEC", "wav")
+    if codec == "wav":
+        return None
+    if _policy is None:
+        candidates = os.getenv("STT_UPLOAD_CODECS")
+        _policy = UploadPolicy(
+            codec=codec,
+            uplink_kbps=float(os.getenv("STT_UPLINK_KBPS", "2000")),
+            candidates=candidates.split(",") if candidates else None,
+        )
+    return _policy
@@ -0,0 +1,177 @@
+"""
+Central thread budget for inference in a worker process.
+
+onnxruntime sessions and torch size their thread pools to the machine's
+core count by default. With dozens of sessions per process and several
+worker processes per host, that multiplies into far more runnable threads
+than cores, and inference tail latency is dominated by the scheduler.
+
+ThreadBudget holds every knob in one place:
+
+- intra-op / inter-op threads for the Silero and Smart Turn ONNX sessions
+- torch.set_num_threads / set_num_interop_threads (torch is pulled in by
+  transformers and some pipecat paths even though our models run on ONNX)
+- OMP_NUM_THREADS / MKL_NUM_THREADS for libraries imported later
+- an optional CPU affinity mask, so N workers on a host each get their own
+  slice of cores instead of all competing for all of them
+
+Values come from INFER_* environment variables (see ThreadBudget.from_env).
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from loguru import logger
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(spec: str) -> List[int]:
+    """Parse "0-3,6,8-9" into [0, 1, 2, 3, 6, 8, 9]."""
+    cpus = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def worker_cpu_slice(worker_index: int, num_workers: int, cpus: Optional[List[int]] = None) -> List[int]:
+    """Contiguous share of cpus for one of num_workers workers (shared if there are too few)."""
+    cpus = cpus or available_cpus()
+    if num_workers <= 1:
+        return cpus
+    if num_workers > len(cpus):
+        return [cpus[worker_index % len(cpus)]]
+    per_worker = len(cpus) // num_workers
+    start = worker_index * per_worker
+    end = len(cpus) if worker_index == num_workers - 1 else start + per_worker
+    return cpus[start:end]
+
+
+def pin_all_threads(cpus: List[int]):
+    """
+    Pin every thread of this process to cpus.
+
+    sched_setaffinity(0, ...) only moves the calling thread, and threads
+    inherit the mask of the thread that creates them, so pinning just the
+    warm-up thread would leave the main thread (and the event loop, and
+    every thread it starts later) on all cores.
+    """
+    try:
+        thread_ids = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        thread_ids = [0]
+    for tid in thread_ids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except ProcessLookupError:
+            # The thread exited since the listing
+            pass
+
+
+@dataclass
+class ThreadBudget:
+    """
+    Thread settings for inference in one process.
+
+    Args:
+        silero_intra_threads: intra-op threads for the Silero session
+        smart_turn_intra_threads: intra-op threads for the Smart Turn session
+        whisper_intra_threads: intra-op threads for the local Whisper sessions
+        inter_op_threads: inter-op threads for both sessions
+        torch_threads: torch intra-op threads (also OMP/MKL for later imports)
+        cpu_affinity: CPUs to pin this process to, or None to leave it alone
+    """
+
+    silero_intra_threads: int = 1
+    smart_turn_intra_threads: int = 1
+    whisper_intra_threads: int = 1
+    inter_op_threads: int = 1
+    torch_threads: int = 1
+    cpu_affinity: Optional[List[int]] = field(default=None)
+
+    @classmethod
+    def from_env(cls) -> "ThreadBudget":
+        """
+        Build the budget from the environment:
+
+        INFER_SILERO_THREADS, INFER_SMART_TURN_THREADS and
+        INFER_WHISPER_THREADS ("auto" = all cores in this worker's slice, up
+        to 4), INFER_INTER_OP_THREADS,
+        INFER_TORCH_THREADS, and INFER_CPU_AFFINITY ("auto" to split the
+        host's cores by WORKER_INDEX / WORKER_COUNT, or a list like "0-3").
+        """
+        affinity_spec = os.getenv("INFER_CPU_AFFINITY", "")
+        cpu_affinity = None
+        if affinity_spec == "auto":
+            cpu_affinity = worker_cpu_slice(
+                int(os.getenv("WORKER_INDEX", "0")), int(os.getenv("WORKER_COUNT", "1"))
+            )
+        elif affinity_spec:
+            cpu_affinity = parse_cpu_list(affinity_spec)
+
+        def threads(var: str) -> int:
+            value = os.getenv(var, "1")
+            if value == "auto":
+                return min(4, len(cpu_affinity or available_cpus()))
+            return int(value)
+
+        return cls(
+            silero_intra_threads=threads("INFER_SILERO_THREADS"),
+            smart_turn_intra_threads=threads("INFER_SMART_TURN_THREADS"),
+            whisper_intra_threads=threads("INFER_WHISPER_THREADS"),
+            inter_op_threads=int(os.getenv("INFER_INTER_OP_THREADS", "1")),
+            torch_threads=int(os.getenv("INFER_TORCH_THREADS", "1")),
+            cpu_affinity=cpu_affinity,
+        )
+
+    def apply_to_process(self):
+        """
+        Apply the process-wide parts: affinity, torch and OpenMP/MKL threads.
+
+        Call before the heavy imports so OMP/MKL pick the settings up; torch
+        is configured only if it is installed. Safe to call from any thread:
+        the affinity is set on every thread of the process.
+        """
+        if self.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            pin_all_threads(self.cpu_affinity)
+
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ.setdefault(var, str(self.torch_threads))
+
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            torch.set_num_threads(self.torch_threads)
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError:
+                # Only allowed before torch starts any inter-op work
+                pass
+
+        logger.info(f"Thread budget: {self}")
+
+
+_budget: Optional[ThreadBudget] = None
+
+
+def get_thread_budget() -> ThreadBudget:
+    """Process-wide budget, read from the environment on first use."""
+    global _budget
+    if _budget is None:
+        _budget = ThreadBudget.from_env()
+    return _budget
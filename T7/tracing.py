@@ -0,0 +1,532 @@
+"""
+OpenTelemetry-style tracing of conversational turns.
+
+Every user turn is recorded as one root span ("turn"), from the user's
+speech start to the bot's last stop before the next turn, with child spans
+for the stages that make up the user-stop -> bot-start latency:
+
+    turn
+    ├── vad.endpointing   VAD stop -> smart-turn confirmed stop
+    ├── stt               confirmed stop -> TranscriptionFrame
+    ├── llm               LLMFullResponseStart -> LLMFullResponseEnd
+    ├── function_call     FunctionCallInProgress -> FunctionCallResult (one per call)
+    └── tts               TTSStarted -> TTSStopped
+
+Spans carry the session id and the current flow node name. Finished spans are
+handed to a BatchSpanProcessor which exports them from a background thread,
+so the event loop only pays for a list append per span. Head-based sampling
+decides once per turn whether any of its spans are recorded at all.
+
+The span layout mirrors OTLP (trace_id / span_id / parent_span_id, nanosecond
+timestamps, flat attributes) so files can be converted for Jaeger/Tempo later
+without touching the bot.
+"""
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    CancelFrame,
+    EndFrame,
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    LLMTextFrame,
+    TranscriptionFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+@dataclass
+class Span:
+    """A single timed operation inside a turn trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "OK"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+# ============================================================================
+# EXPORTERS
+# ============================================================================
+
+class InMemorySpanCollector:
+    """
+    In-process stand-in for an OTLP collector.
+
+    Useful for tests and benchmarks: spans are kept in a list and can be
+    inspected once the processor has flushed.
+    """
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, batch: List[Span]):
+        with self._lock:
+            self.spans.extend(span.to_dict() for span in batch)
+
+    def shutdown(self):
+        pass
+
+
+class JSONLinesSpanExporter:
+    """
+    Append finished spans to a local JSON-lines file, one span per line.
+
+    Args:
+        filepath: Destination file; parent directories are created if needed
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+
+    def export(self, batch: List[Span]):
+        lines = "".join(json.dumps(span.to_dict(), ensure_ascii=False) + "\n" for span in batch)
+        with open(self.filepath, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def shutdown(self):
+        pass
+
+
+class BatchSpanProcessor:
+    """
+    Buffer finished spans and export them in batches from a daemon thread.
+
+    The observer runs on the pipeline's event loop, so exporting (JSON
+    encoding + file I/O) must never happen inline. on_end() is a bounded
+    list append; when the queue is full new spans are dropped and counted
+    instead of applying back-pressure to the audio pipeline.
+
+    Args:
+        exporter: Object with export(batch) and shutdown()
+        max_queue_size: Spans held before new ones are dropped
+        max_batch_size: Queue length that triggers an early flush
+        schedule_delay_secs: Maximum time a span waits before export
+    """
+
+    def __init__(
+        self,
+        exporter,
+        max_queue_size: int = 4096,
+        max_batch_size: int = 256,
+        schedule_delay_secs: float = 2.0,
+    ):
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.schedule_delay_secs = schedule_delay_secs
+        self.dropped_spans = 0
+
+        self._queue: List[Span] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._shutdown = False
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+
+    def on_end(self, span: Span):
+        with self._lock:
+            if len(self._queue) >= self.max_queue_size:
+                self.dropped_spans += 1
+                return
+            self._queue.append(span)
+            if len(self._queue) >= self.max_batch_size:
+                self._wakeup.set()
+
+    def request_flush(self):
+        """Ask the export thread to flush now without blocking the caller."""
+        self._wakeup.set()
+
+    def force_flush(self):
+        """Synchronously export everything currently queued."""
+        with self._lock:
+            batch, self._queue = self._queue, []
+        if batch:
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.error(f"Span export failed ({len(batch)} spans lost): {e}")
+
+    def shutdown(self):
+        self._shutdown = True
+        self._wakeup.set()
+        self._worker.join(timeout=5)
+        self.force_flush()
+        self.exporter.shutdown()
+
+    def _run(self):
+        while not self._shutdown:
+            self._wakeup.wait(self.schedule_delay_secs)
+            self._wakeup.clear()
+            self.force_flush()
+
+
+class TurnSampler:
+    """
+    Head-based sampler: the keep/drop decision is made once when a turn opens
+    and applies to all of its child spans.
+
+    Args:
+        ratio: Fraction of turns to record (0.0 - 1.0)
+    """
+
+    def __init__(self, ratio: float = 1.0):
+        self.ratio = max(0.0, min(1.0, ratio))
+
+    def should_sample(self) -> bool:
+        return self.ratio >= 1.0 or random.random() < self.ratio
+
+
+# ============================================================================
+# OBSERVER
+# ============================================================================
+
+# Frames that open / close turns: handled whether or not the turn is sampled
+_BOUNDARY_FRAMES = (
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    EndFrame,
+    CancelFrame,
+)
+# Frames that only feed child spans: skipped for unsampled turns
+_SPAN_FRAMES = (
+    TranscriptionFrame,
+    LLMFullResponseStartFrame,
+    LLMFullResponseEndFrame,
+    LLMTextFrame,
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+)
+_IGNORED, _SPAN, _BOUNDARY = 0, 1, 2
+
+# Traced frames remembered for de-duplicating their later hops. A frame's hops
+# are pushed within a few frames of each other, so a short window is enough.
+SEEN_FRAMES_WINDOW = 256
+
+# Frame class -> kind, so each push costs one dict lookup instead of isinstance checks
+_frame_kinds: Dict[type, int] = {}
+
+
+def _frame_kind(frame_type: type) -> int:
+    kind = _frame_kinds.get(frame_type)
+    if kind is None:
+        if issubclass(frame_type, _BOUNDARY_FRAMES):
+            kind = _BOUNDARY
+        elif issubclass(frame_type, _SPAN_FRAMES):
+            kind = _SPAN
+        else:
+            kind = _IGNORED
+        _frame_kinds[frame_type] = kind
+    return kind
+
+
+class TurnTracingObserver(BaseObserver):
+    """
+    Observer that turns pipeline frames into one trace per user turn.
+
+    Args:
+        processor: BatchSpanProcessor that receives finished spans
+        session_id: Identifier stamped on every span (defaults to a random id)
+        sampler: TurnSampler deciding which turns are recorded
+        flow_manager: Optional FlowManager used to tag spans with the current node.
+            It can also be attached after construction with attach_flow_manager(),
+            since the FlowManager needs the task that owns this observer.
+    """
+
+    def __init__(
+        self,
+        processor: BatchSpanProcessor,
+        session_id: Optional[str] = None,
+        sampler: Optional[TurnSampler] = None,
+        flow_manager=None,
+    ):
+        super().__init__()
+        self.processor = processor
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.sampler = sampler or TurnSampler()
+        self.flow_manager = flow_manager
+
+        self.turn_count = 0
+        self._turn: Optional[Span] = None
+        self._open: Dict[str, Span] = {}
+        self._seen_frame_ids = set()
+        self._seen_frame_order: Deque[int] = deque()
+        self._bot_speaking = False
+        self._bot_replied = False
+        self._bot_stopped_ns: Optional[int] = None
+        self._user_speaking = False
+        self._sampled = False
+        self._user_stopped_ns: Optional[int] = None
+
+    def attach_flow_manager(self, flow_manager):
+        self.flow_manager = flow_manager
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+
+        # Audio frames dominate traffic, and for unsampled turns so do LLM text
+        # frames: the sampling decision is checked before any other work
+        kind = _frame_kinds.get(type(frame))
+        if kind is None:
+            kind = _frame_kind(type(frame))
+        if kind == _IGNORED or (kind == _SPAN and not self._sampled):
+            return
+
+        # Observers see every hop of a frame, only the first push counts
+        if frame.id in self._seen_frame_ids:
+            return
+        self._remember(frame.id)
+
+        now = time.time_ns()
+
+        if isinstance(frame, (UserStartedSpeakingFrame, VADUserStartedSpeakingFrame)):
+            # VAD and the turn analyzer both report the same speech start
+            if not self._user_speaking:
+                self._user_speaking = True
+                self._on_user_started(now, interrupted=self._bot_speaking)
+            return
+
+        if isinstance(frame, (EndFrame, CancelFrame)):
+            if isinstance(frame, CancelFrame):
+                self._end_turn(now, status="CANCELLED")
+            else:
+                self._end_turn(now if self._bot_speaking else self._bot_stopped_ns or now)
+            self.processor.request_flush()
+            return
+
+        if isinstance(frame, (VADUserStoppedSpeakingFrame, UserStoppedSpeakingFrame)):
+            self._user_speaking = False
+        elif isinstance(frame, BotStartedSpeakingFrame):
+            self._bot_speaking = True
+            self._bot_replied = True
+        elif isinstance(frame, BotStoppedSpeakingFrame):
+            self._bot_speaking = False
+            # The bot may speak more than once in a turn (a filler line
+            # before a function call, then the answer), so the turn ends
+            # when the next one starts, at the last stop. After a barge-in
+            # the interrupted reply stops late, inside the next turn: only
+            # stops after this turn's reply count.
+            if self._bot_replied:
+                self._bot_stopped_ns = now
+            return
+
+        # Nothing below matters for unsampled turns
+        if not self._sampled:
+            return
+
+        if isinstance(frame, VADUserStoppedSpeakingFrame):
+            self._start("vad.endpointing", now)
+        elif isinstance(frame, UserStoppedSpeakingFrame):
+            self._user_stopped_ns = now
+            self._end("vad.endpointing", now)
+            self._start("stt", now)
+        elif isinstance(frame, TranscriptionFrame):
+            span = self._end("stt", now)
+            if span is not None:
+                span.attributes["transcript.chars"] = len(frame.text or "")
+        elif isinstance(frame, LLMFullResponseStartFrame):
+            self._start("llm", now)
+        elif isinstance(frame, LLMTextFrame):
+            span = self._open.get("llm")
+            if span is not None and "llm.ttfb_ms" not in span.attributes:
+                span.attributes["llm.ttfb_ms"] = round((now - span.start_ns) / 1_000_000, 3)
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            self._end("llm", now)
+        elif isinstance(frame, FunctionCallInProgressFrame):
+            span = self._start(f"function_call:{frame.tool_call_id}", now, name="function_call")
+            span.attributes["function.name"] = frame.function_name
+        elif isinstance(frame, FunctionCallResultFrame):
+            self._end(f"function_call:{frame.tool_call_id}", now)
+        elif isinstance(frame, TTSStartedFrame):
+            self._start("tts", now)
+        elif isinstance(frame, TTSStoppedFrame):
+            self._end("tts", now)
+        elif isinstance(frame, BotStartedSpeakingFrame):
+            if self._user_stopped_ns is not None:
+                self._turn.attributes.setdefault(
+                    "turn.user_stop_to_bot_start_ms",
+                    round((now - self._user_stopped_ns) / 1_000_000, 3),
+                )
+
+    # ------------------------------------------------------------------------
+    # Span bookkeeping
+    # ------------------------------------------------------------------------
+
+    def _remember(self, frame_id: int):
+        self._seen_frame_ids.add(frame_id)
+        self._seen_frame_order.append(frame_id)
+        if len(self._seen_frame_order) > SEEN_FRAMES_WINDOW:
+            self._seen_frame_ids.discard(self._seen_frame_order.popleft())
+
+    def _node_name(self) -> Optional[str]:
+        if self.flow_manager is None:
+            return None
+        return getattr(self.flow_manager, "current_node", None)
+
+    def _on_user_started(self, now: int, interrupted: bool):
+        # VAD and the turn analyzer both signal speech start; a turn that has
+        # not produced any bot output yet simply keeps going.
+        if self._turn is not None:
+            if not interrupted and not self._bot_replied:
+                self._end("vad.endpointing", now, status="RESUMED")
+                return
+            if interrupted:
+                self._end_turn(now, status="INTERRUPTED")
+            else:
+                self._end_turn(self._bot_stopped_ns or now)
+
+        self.turn_count += 1
+        self._bot_replied = False
+        self._bot_stopped_ns = None
+        self._user_stopped_ns = None
+        self._sampled = self.sampler.should_sample()
+        self._turn = Span(
+            name="turn",
+            trace_id=_new_id(16),
+            span_id=_new_id(8),
+            parent_span_id=None,
+            start_ns=now,
+            attributes={
+                "session.id": self.session_id,
+                "turn.number": self.turn_count,
+                "flow.node": self._node_name(),
+                "sampled": self._sampled,
+            },
+        )
+
+    def _start(self, key: str, now: int, name: Optional[str] = None) -> Span:
+        span = Span(
+            name=name or key,
+            trace_id=self._turn.trace_id,
+            span_id=_new_id(8),
+            parent_span_id=self._turn.span_id,
+            start_ns=now,
+            attributes={"session.id": self.session_id, "flow.node": self._node_name()},
+        )
+        self._open[key] = span
+        return span
+
+    def _end(self, key: str, now: int, status: str = "OK") -> Optional[Span]:
+        span = self._open.pop(key, None)
+        if span is None:
+            return None
+        span.end_ns = now
+        span.status = status
+        self.processor.on_end(span)
+        return span
+
+    def _end_turn(self, now: int, status: str = "OK"):
+        if self._turn is None:
+            return
+        turn, self._turn = self._turn, None
+        self._sampled = False
+        for key in list(self._open):
+            self._end(key, now, status="UNFINISHED")
+        if not turn.attributes.pop("sampled", False):
+            return
+        turn.end_ns = now
+        turn.status = status
+        # The node may have changed during the turn (function call transitions)
+        turn.attributes["flow.node.end"] = self._node_name()
+        self.processor.on_end(turn)
+
+
+# ============================================================================
+# PROCESS-WIDE SETUP
+# ============================================================================
+
+_span_processor: Optional[BatchSpanProcessor] = None
+
+
+def get_span_processor() -> BatchSpanProcessor:
+    """
+    Return the process-wide span processor, creating it on first use.
+
+    All sessions in a process share one export thread and one file. The
+    destination and batching are configured through environment variables:
+
+        TRACE_EXPORT_PATH   JSON-lines file (default: traces/spans.jsonl next to this module)
+        TRACE_BATCH_SIZE    spans per export batch (default: 256)
+        TRACE_FLUSH_SECS    maximum delay before export (default: 2.0)
+    """
+    global _span_processor
+    if _span_processor is None:
+        default_path = os.path.join(os.path.dirname(__file__), "traces", "spans.jsonl")
+        exporter = JSONLinesSpanExporter(os.getenv("TRACE_EXPORT_PATH", default_path))
+        _span_processor = BatchSpanProcessor(
+            exporter,
+            max_batch_size=int(os.getenv("TRACE_BATCH_SIZE", "256")),
+            schedule_delay_secs=float(os.getenv("TRACE_FLUSH_SECS", "2.0")),
+        )
+        atexit.register(_span_processor.shutdown)
+    return _span_processor
+
+
+def create_turn_tracer(session_id: Optional[str] = None) -> TurnTracingObserver:
+    """
+    Build a per-session tracing observer attached to the shared processor.
+
+    TRACE_SAMPLE_RATIO (default: 1.0) sets the fraction of turns recorded.
+    """
+    sampler = TurnSampler(float(os.getenv("TRACE_SAMPLE_RATIO", "1.0")))
+    return TurnTracingObserver(get_span_processor(), session_id=session_id, sampler=sampler)
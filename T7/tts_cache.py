@@ -0,0 +1 @@
+../shared/tts_cache.py
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Background warm-up for the bot process.
+
+Importing pipecat's services, transports and the ONNX/torch stack takes
+seconds. Instead of paying that before the HTTP listener is up, the entry
+point starts the runner immediately and this module imports the heavy
+modules (and warms the VAD / Smart Turn models and the optional local
+Whisper) on a background thread, then pre-synthesizes the flow's scripted
+lines into the TTS cache.
+bot() awaits wait_until_ready() before building its pipeline, so a caller
+who connects during warm-up simply waits for it instead of failing.
+"""
+
+import asyncio
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from loguru import logger
+
+# Imported in this order on the warm-up thread. The first entries are the
+# expensive ones (torch / onnxruntime / transformers via the model pool).
+HEAVY_MODULES = [
+    "model_pool",
+    "client_pool",
+    "tracing",
+    "pipecat.pipeline.pipeline",
+    "pipecat.pipeline.runner",
+    "pipecat.pipeline.task",
+    "pipecat.processors.aggregators.llm_response_universal",
+    "pipecat.processors.aggregators.llm_context",
+    "pipecat.observers.loggers.llm_log_observer",
+    "pipecat.observers.loggers.transcription_log_observer",
+    "pipecat.observers.turn_tracking_observer",
+    "pipecat.observers.loggers.user_bot_latency_log_observer",
+    "pipecat.transports.smallwebrtc.transport",
+    "pipecat.transports.base_transport",
+    "pipecat_flows",
+    "nodes",
+    "pipeline_pool",
+]
+
+# With INFERENCE_SIDECAR=1 warm-up starts this process's sidecar. The
+# pre-fork parent turns this off: each forked worker starts its own.
+start_sidecar = True
+
+# Upper bound on how long pre-synthesis (presynth.py) may hold up readiness
+PRESYNTH_TIMEOUT_SECS = 15.0
+
+_future: Optional[Future] = None
+_lock = threading.Lock()
+
+# Seconds spent importing each module on the warm-up thread (cumulative,
+# so a module that was already pulled in by an earlier one shows ~0)
+import_times: Dict[str, float] = {}
+
+
+def _presynthesize():
+    """Put the flow's scripted lines in the TTS cache; a failure only costs cache hits."""
+    from presynth import presynthesize_flow
+
+    try:
+        asyncio.run(asyncio.wait_for(presynthesize_flow(), PRESYNTH_TIMEOUT_SECS))
+    except Exception as e:
+        logger.warning(f"Pre-synthesis failed: {e!r}")
+
+
+def _warm_up(future: Future):
+    start = time.perf_counter()
+    try:
+        from thread_budget import get_thread_budget
+
+        # Before the imports, so OpenMP/MKL and torch start with the budget
+        get_thread_budget().apply_to_process()
+
+        for name in HEAVY_MODULES:
+            t0 = time.perf_counter()
+            importlib.import_module(name)
+            import_times[name] = time.perf_counter() - t0
+
+        from sidecar import get_sidecar_client, sidecar_enabled
+
+        if sidecar_enabled():
+            # Models live in the sidecar; it warms them before reporting ready
+            if start_sidecar:
+                get_sidecar_client()
+        else:
+            from model_pool import get_model_registry
+
+            get_model_registry().warm_up()
+
+        from local_stt import get_local_stt_router
+
+        local_stt = get_local_stt_router()
+        if local_stt is not None:
+            # Short turns go to the local model only once it is loaded
+            local_stt.model.warm_up()
+
+        if os.getenv("TTS_PRESYNTH", "1") != "0":
+            _presynthesize()
+    except BaseException as e:
+        logger.exception(f"Warm-up failed: {e}")
+        future.set_exception(e)
+        return
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Warm-up complete in {elapsed:.2f}s")
+    future.set_result(elapsed)
+
+
+def start_background_warmup() -> Future:
+    """Start warm-up on a daemon thread (idempotent) and return its future."""
+    global _future
+    with _lock:
+        if _future is None:
+            _future = Future()
+            threading.Thread(target=_warm_up, args=(_future,), name="warmup", daemon=True).start()
+        return _future
+
+
+async def wait_until_ready():
+    """Await warm-up from the event loop, starting it if nobody has yet."""
+    await asyncio.wrap_future(start_background_warmup())
@@ -14,7 +14,6 @@ from pipecat.processors.aggregators.llm_response_universal import (
 from pipecat.runner.types import RunnerArguments
 from pipecat.services.groq.stt import GroqSTTService
 from pipecat.services.groq.llm import GroqLLMService
-from pipecat.services.cartesia.tts import CartesiaTTSService
 from pipecat.transports.smallwebrtc.transport import (
     SmallWebRTCTransport,
     TransportParams,
@@ -28,6 +27,8 @@ from pipecat_flows import (
     NodeConfig,
 )
 
+from tts_cache import CachedCartesiaTTSService
+
 load_dotenv()
 
 # -----------------------------
@@ -142,7 +143,7 @@ async def bot(runner_args: RunnerArguments):
         model="llama-3.1-8b-instant",
     )
 
-    tts = CartesiaTTSService(
+    tts = CachedCartesiaTTSService(
         api_key=os.getenv("CARTESIA_API_KEY"),
         voice_id=os.getenv("CARTESIA_VOICE"),
         text_filters=[MarkdownTextFilter()],
@@ -0,0 +1,241 @@
+"""
+Token-budgeted conversation context, compacted into a running summary
+"""
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from pipecat.frames.frames import Frame, LLMContextFrame
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+# Same estimate for every message: ~4 characters per token plus the chat template's per-message overhead
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+MENU_ITEMS = [
+    "Chicken Tikka Pizza",
+    "Chicken Fajita Pizza",
+    "Patty Burger",
+    "Zinger Burger",
+    "Nuggets",
+    "Fries",
+    "Pepsi",
+    "Coke",
+    "Tea",
+]
+_QUANTITY = r"(?:(?P<qty>\d+|a|an|one|two|three|four|five)\s+)?"
+_SIZE = r"(?:(?P<size>small|medium|large|regular)\s+)?"
+_ITEM = re.compile(
+    r"\b" + _QUANTITY + _SIZE + r"(?P<item>" + "|".join(re.escape(item) for item in MENU_ITEMS) + r")s?\b",
+    re.IGNORECASE,
+)
+_PHONE = re.compile(r"(?:\+92[\s-]?|\b0)\d{3}[\s-]?\d{7}\b")
+_ADDRESS = re.compile(r"[^.!?]*\b(?:house|street|block|phase|sector|road|lane|flat|apartment|colony|town)\b[^.!?]*", re.IGNORECASE)
+_CONFIRMED = re.compile(r"\border (?:is|has been) (?:confirmed|placed)\b", re.IGNORECASE)
+_NUMBERS = {"a": "1", "an": "1", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5"}
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*")
+# Before an item: whether it is being removed or added. A clause break ends a removal.
+_ACTION = re.compile(
+    r"(?P<remove>\b(?:no|without|remove|removed|cancel|cancelled|canceled|skip|drop|minus|instead of"
+    r"|don't want|do not want|take off|taken off|take out)\b)"
+    r"|(?P<add>\b(?:add|added|adding|plus|also|get|have|want|like|make it|instead)\b)"
+    r"|(?P<stop>[,;:]|\bbut\b)",
+    re.IGNORECASE,
+)
+# Assistant sentences that restate the whole order, or change it
+_RESTATED = re.compile(r"\b(?:your order (?:is|comes to|will be)|to confirm|so that's|you(?:'ve| have)? ordered)\b", re.IGNORECASE)
+_CHANGED = re.compile(r"\b(?:i've added|i have added|i'll add|added|adding|removed|taken off|cancelled|canceled)\b", re.IGNORECASE)
+# A question is an order only with one of these ("Can I get ...?"), otherwise it asks about the menu
+_ORDER_QUESTION = re.compile(r"\b(?:(?:can|could|may) (?:i|we) (?:get|have|order)|i(?:'d| would) like|\badd\b)", re.IGNORECASE)
+
+
+def estimate_tokens(message: dict) -> int:
+    """Approximate prompt tokens of one chat message"""
+    content = message.get("content") or ""
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    return MESSAGE_OVERHEAD_TOKENS + len(content) // CHARS_PER_TOKEN
+
+
+class ConversationSummary:
+    """
+    What the removed turns established: the order so far, address and phone,
+    read from the message text with patterns so no LLM call is needed
+
+    Items come from the user's requests and from the assistant's
+    confirmations ("I've added ...", "your order is ..."); removals ("no
+    fries", "remove the Pepsi") take items out, and the assistant's other
+    lines, such as menu listings, are ignored
+    """
+
+    def __init__(self):
+        self.items: Dict[str, str] = {}
+        self.address: Optional[str] = None
+        self.phone: Optional[str] = None
+        self.confirmed = False
+        self.turns = 0
+
+    def absorb(self, message: dict):
+        """Fold one removed message into the summary"""
+        text = message.get("content")
+        if not isinstance(text, str) or message.get("role") not in ("user", "assistant"):
+            return
+        self.turns += 1
+        for sentence in _SENTENCE.findall(text):
+            if message["role"] == "user":
+                if sentence.rstrip().endswith("?") and not _ORDER_QUESTION.search(sentence):
+                    continue
+                self._apply(sentence)
+            elif _RESTATED.search(sentence):
+                # The assistant read back the whole order: it replaces what was gathered so far
+                self.items = {}
+                self._apply(sentence)
+            elif _CHANGED.search(sentence):
+                self._apply(sentence)
+        phone = _PHONE.search(text)
+        if phone:
+            self.phone = phone.group(0)
+        address = [a.strip() for a in _ADDRESS.findall(text) if re.search(r"\d", a)]
+        if address:
+            self.address = address[-1]
+        if _CONFIRMED.search(text):
+            self.confirmed = True
+
+    def _apply(self, sentence: str):
+        """
+        Add or remove the items one sentence mentions
+
+        Args:
+            sentence: One sentence of a user request or assistant confirmation
+        """
+        removing = False
+        position = 0
+        for match in _ITEM.finditer(sentence):
+            actions = list(_ACTION.finditer(sentence, position, match.start()))
+            if actions:
+                removing = actions[-1].lastgroup == "remove"
+            position = match.end()
+            item = match["item"].title()
+            if removing:
+                self.items.pop(item, None)
+                continue
+            qty = match["qty"] and _NUMBERS.get(match["qty"].lower(), match["qty"])
+            size = match["size"] and match["size"].capitalize()
+            # A later mention (size change, quantity change) replaces the earlier one
+            self.items[item] = " ".join(part for part in (qty, size, item) if part)
+
+    def message(self) -> dict:
+        order = ", ".join(self.items.values()) or "nothing yet"
+        lines = [
+            f"Summary of the {self.turns} earliest messages of this call (removed to keep the prompt short):",
+            f"- Order so far: {order}",
+            f"- Address: {self.address or 'not given yet'}",
+            f"- Phone: {self.phone or 'not given yet'}",
+            f"- Order confirmed: {'yes' if self.confirmed else 'no'}",
+            "Continue from the recent messages below.",
+        ]
+        return {"role": "system", "content": "\n".join(lines)}
+
+
+class ContextBudgetManager(FrameProcessor):
+    """
+    Sits between the user context aggregator and the LLM and keeps the
+    prompt under a token budget
+    """
+
+    def __init__(self, budget_tokens: int = 2000, keep_messages: int = 6, pinned_messages: int = 1, **kwargs):
+        """
+        Initialize the context manager
+
+        Args:
+            budget_tokens: Estimated prompt tokens above which older turns are compacted
+            keep_messages: Most recent messages always sent verbatim
+            pinned_messages: Leading messages (system prompt, session context) never compacted
+        """
+        super().__init__(**kwargs)
+        self.budget_tokens = budget_tokens
+        self.keep_messages = keep_messages
+        self.pinned_messages = pinned_messages
+        self.summary = ConversationSummary()
+        self.curve: List[dict] = []
+
+        # (message, tokens) for the context's messages, in order, so each message is counted once
+        self._counted: List[Tuple[dict, int]] = []
+        self._summary_message: Optional[dict] = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, LLMContextFrame):
+            self.compact(frame.context)
+        await self.push_frame(frame, direction)
+
+    def _count(self, messages: List[dict]) -> List[int]:
+        """Token estimate per message, reusing the counts of messages seen before"""
+        reused = 0
+        while (
+            reused < len(self._counted)
+            and reused < len(messages)
+            and self._counted[reused][0] is messages[reused]
+        ):
+            reused += 1
+        self._counted = self._counted[:reused] + [(m, estimate_tokens(m)) for m in messages[reused:]]
+        return [tokens for _, tokens in self._counted]
+
+    def compact(self, context: LLMContext):
+        """
+        Fold the oldest turns into the summary if the prompt is over budget
+
+        Compacts the context in place: the folded messages are replaced by the
+        summary message with set_messages(), so the change is permanent and
+        visible to everything holding the context, including the user and
+        assistant aggregators. That is what keeps the history short, since
+        later turns are appended to the compacted list and the summary only
+        absorbs each message once; the removed messages survive only in
+        self.summary.
+
+        Args:
+            context: The context the LLMContextFrame carries to the LLM
+        """
+        messages = context.get_messages()
+        counts = self._count(messages)
+        prompt_tokens = sum(counts)
+        sent_tokens = prompt_tokens
+        compacted = False
+
+        # The pinned messages (and the summary after them, once there is one) stay first
+        pinned = self.pinned_messages
+        if len(messages) > pinned and messages[pinned] is self._summary_message:
+            pinned += 1
+        cut = len(messages) - self.keep_messages
+        # Start the kept window on a user message so no reply is kept without its question
+        while cut > pinned and messages[cut].get("role") != "user":
+            cut -= 1
+
+        if prompt_tokens > self.budget_tokens and cut > pinned:
+            for message in messages[pinned:cut]:
+                self.summary.absorb(message)
+            self._summary_message = self.summary.message()
+            context.set_messages(messages[:self.pinned_messages] + [self._summary_message] + messages[cut:])
+            sent_tokens = sum(self._count(context.get_messages()))
+            compacted = True
+            logger.debug(
+                f"Context compacted: {cut - pinned} messages folded into the summary, "
+                f"{prompt_tokens} -> {sent_tokens} tokens"
+            )
+
+        self.curve.append({
+            "turn": len(self.curve) + 1,
+            "messages": len(context.get_messages()),
+            "prompt_tokens": prompt_tokens,
+            "sent_tokens": sent_tokens,
+            "compacted": compacted,
+        })
+
+    def save_curve(self, path: str):
+        """Write the per-turn prompt size curve as JSON"""
+        peak = max((point["sent_tokens"] for point in self.curve), default=0)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"budget_tokens": self.budget_tokens, "peak_sent_tokens": peak, "turns": self.curve}, f, indent=2)
@@ -0,0 +1,214 @@
+"""
+Local intent classification in front of the flow's router node.
+
+The greet node's only job is to pick one of a few transition functions.
+Through the LLM that costs a full round trip (the tool call) before the next
+node's own LLM call can even start. IntentRouter sits between STT and the
+user context aggregator and does the easy cases on the CPU:
+
+- IntentClassifier scores each intent by the keyword phrases found in the
+  transcript (a phrase weighs its number of words). A match inside a longer
+  match, of any intent, adds nothing: "order" counts for nothing in "order
+  status". The scores become a confidence, top / (top + runner-up + 1):
+  one keyword alone is 0.5, a two-word phrase 0.67, and competing intents
+  pull it down. The default threshold, 0.5, is met exactly when the best
+  intent matched more words than any other, so one uncontested keyword
+  routes and a tie never does.
+- While the flow is on the router node, every TranscriptionFrame is
+  classified. Above min_confidence (and with the function's arguments
+  found in the transcript) the router calls the node's own handler, sets
+  the returned node, and re-queues the transcription behind the flow's
+  context update so the new node answers it in a single LLM call. If the
+  handler stays on the router node (no next node), or for anything else,
+  the transcription passes through unchanged and the LLM answers as before.
+
+The classifier is plain compiled regexes built once per process (see each
+bot's nodes.py). T7's eval_intent_router.py reports accuracy and latency
+saved.
+"""
+
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import Frame, TranscriptionFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat_flows import FlowManager, NodeConfig
+
+# Best intent strictly ahead of the runner-up, see the module docstring
+DEFAULT_MIN_CONFIDENCE = 0.5
+
+
+@dataclass
+class Intent:
+    """
+    One routable intent.
+
+    Args:
+        function: Name of the router node's function that takes this path
+        phrases: Keyword phrases (case-insensitive, whole words)
+        arguments: Builds the function's arguments from the transcript;
+            returning None means they are missing and the LLM must ask
+    """
+
+    function: str
+    phrases: List[str]
+    arguments: Optional[Callable[[str], Optional[dict]]] = None
+
+
+@dataclass
+class IntentMatch:
+    function: Optional[str]
+    confidence: float
+    arguments: Optional[dict] = None
+    scores: Dict[str, int] = field(default_factory=dict)
+
+
+class IntentClassifier:
+    """
+    Keyword phrase classifier.
+
+    Args:
+        intents: Intents to tell apart
+        min_confidence: Confidence needed to route without the LLM
+    """
+
+    def __init__(self, intents: List[Intent], min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.intents = intents
+        self.min_confidence = min_confidence
+        self._patterns = [
+            (
+                intent,
+                [
+                    (re.compile(r"\b" + r"\s+".join(map(re.escape, phrase.split())) + r"\b", re.IGNORECASE),
+                     len(phrase.split()))
+                    for phrase in intent.phrases
+                ],
+            )
+            for intent in intents
+        ]
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Matched words per intent."""
+        # Longest matches first. One inside a longer match adds nothing, whichever
+        # intent it belongs to ("menu" in "see the menu", "order" in "order
+        # status"); the same words matched by two intents count for both.
+        matches = sorted(
+            (
+                (m.span(), intent.function)
+                for intent, patterns in self._patterns
+                for pattern, _ in patterns
+                for m in pattern.finditer(text)
+            ),
+            key=lambda match: match[0][0] - match[0][1],
+        )
+        scores = {intent.function: 0 for intent in self.intents}
+        kept = []
+        for (start, end), function in matches:
+            if any(
+                s <= start and end <= e and (e - s > end - start or f == function)
+                for (s, e), f in kept
+            ):
+                continue
+            kept.append(((start, end), function))
+            scores[function] += len(text[start:end].split())
+        return scores
+
+    def classify(self, text: str) -> IntentMatch:
+        scores = self.scores(text)
+        ranked = sorted(self._patterns, key=lambda entry: scores[entry[0].function], reverse=True)
+        best = ranked[0][0]
+        top = scores[best.function]
+        if top == 0:
+            return IntentMatch(None, 0.0, scores=scores)
+        runner_up = scores[ranked[1][0].function] if len(ranked) > 1 else 0
+        arguments = best.arguments(text) if best.arguments else {}
+        return IntentMatch(best.function, top / (top + runner_up + 1), arguments, scores)
+
+    def routable(self, match: IntentMatch) -> bool:
+        return (
+            match.function is not None
+            and match.confidence >= self.min_confidence
+            and match.arguments is not None
+        )
+
+
+class IntentRouter(FrameProcessor):
+    """
+    Takes the router node's transition locally when the classifier is sure.
+
+    Args:
+        router_node: The router node's config (its handlers do the transitions)
+        classifier: Classifier for the node's functions
+    """
+
+    def __init__(self, router_node: NodeConfig, classifier: IntentClassifier, **kwargs):
+        super().__init__(**kwargs)
+        self.router_node = router_node["name"]
+        self.classifier = classifier
+        self.flow_manager: Optional[FlowManager] = None
+
+        self.routed = 0
+        self.fallbacks = 0
+        self.classify_ms: Deque[float] = deque(maxlen=1000)
+
+        self._handlers = {function.name: function.handler for function in router_node["functions"]}
+        self._requeued: set = set()
+
+    def attach_flow_manager(self, flow_manager: FlowManager):
+        self.flow_manager = flow_manager
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if (
+            isinstance(frame, TranscriptionFrame)
+            and self.flow_manager is not None
+            and self.flow_manager.current_node == self.router_node
+            and frame.id not in self._requeued
+        ):
+            if await self._route(frame):
+                return
+        self._requeued.discard(frame.id)
+        await self.push_frame(frame, direction)
+
+    async def _route(self, frame: TranscriptionFrame) -> bool:
+        start = time.perf_counter()
+        match = self.classifier.classify(frame.text)
+        self.classify_ms.append((time.perf_counter() - start) * 1000)
+
+        handler = self._handlers.get(match.function)
+        if handler is None or not self.classifier.routable(match):
+            self.fallbacks += 1
+            logger.debug(f"{self}: [{frame.text}] -> LLM ({match.function}, {match.confidence:.2f})")
+            return False
+
+        logger.debug(f"{self}: [{frame.text}] -> {match.function} ({match.confidence:.2f})")
+        _, next_node = await handler(match.arguments, self.flow_manager)
+        if next_node is None:
+            # The handler stays on this node: the LLM answers the transcription here
+            self.fallbacks += 1
+            logger.debug(f"{self}: {match.function} stayed on {self.router_node}, passing to the LLM")
+            return False
+        self.routed += 1
+        # The transcription below triggers the new node's LLM call, the
+        # node must not start one of its own
+        await self.flow_manager.set_node_from_config({**next_node, "respond_immediately": False})
+
+        # The node's context update was queued at the top of the pipeline;
+        # queue the transcription behind it so the new node answers it
+        self._requeued.add(frame.id)
+        await self.flow_manager.task.queue_frame(frame)
+        return True
+
+    def snapshot(self) -> dict:
+        timings = sorted(self.classify_ms)
+        return {
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "p50_classify_ms": round(timings[len(timings) // 2], 4) if timings else None,
+        }
@@ -0,0 +1,221 @@
+"""
+Deploy-time pre-synthesis of the flow's scripted lines.
+
+Terminal nodes mostly say fixed text: a task message like "Say 'Okay
+thanks' and hang up." or a tts_say action. Without pre-synthesis the first
+caller to reach each of them pays a cold Cartesia round trip. This step
+puts those lines in the TTS phrase cache ahead of time:
+
+- reachable_factories() walks the bot's nodes.py (next to the link to this
+  file, see shared/README.md) statically from create_greet_node(),
+  following every create_*_node() call in a factory's body (its transition
+  handlers included). Factories that need arguments are walked too, no node
+  is actually built.
+- extract_utterances() takes from each reachable factory the quoted text
+  after Say / Ask / Tell them / Tell the customer, and the text of tts_say
+  actions. Quotes with f-string fields or [placeholders] are dynamic and
+  are skipped. So are "Say something like" and "e.g." examples, because
+  the LLM paraphrases them.
+- cache_texts() turns each utterance into the strings the TTS service will
+  be asked for. LLM output reaches run_tts one sentence at a time, so quoted
+  lines are split into sentences (or, in a bot with clause_aggregator.py,
+  into its chunks with TTS_CHUNKING=clause), and a line whose last chunk
+  has no final punctuation is also cached with a period. tts_say text is
+  spoken whole.
+
+T6 runs this at startup (bot_flow.py) and T7 in warm-up, before the worker
+reports ready; TTS_PRESYNTH=0 turns it off in both. It can also run as a
+build step from the bot's directory:
+
+Usage:
+    python presynth.py [--dry-run] [--voice VOICE_ID] [--sample-rate 24000]
+"""
+
+import argparse
+import ast
+import asyncio
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+try:
+    from clause_aggregator import chunking_params, split_chunks
+except ImportError:
+    # Bots without clause chunking send TTS whole sentences
+    chunking_params = split_chunks = None
+
+NODES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nodes.py")
+ROOT_FACTORY = "create_greet_node"
+
+# Stands in for f-string fields while scanning, so quotes containing them can be dropped
+_FIELD = "\x00"
+
+_SPOKEN_QUOTE = re.compile(
+    r"\b(?:Say|Ask|Tell them|Tell the customer):?\s*"
+    r"(?P<q>['\"])(?P<text>.+?)(?P=q)(?![A-Za-z])"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _factories(tree: ast.Module) -> Dict[str, ast.FunctionDef]:
+    return {
+        node.name: node
+        for node in tree.body
+        if isinstance(node, ast.FunctionDef) and node.name.startswith("create_") and node.name.endswith("_node")
+    }
+
+
+def reachable_factories(path: str = NODES_PATH, root: str = ROOT_FACTORY) -> List[str]:
+    """Names of the node factories reachable from root, in walk order."""
+    with open(path) as f:
+        factories = _factories(ast.parse(f.read()))
+    seen = [root]
+    pending = [root]
+    while pending:
+        for node in ast.walk(factories[pending.pop(0)]):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id in factories
+                and node.func.id not in seen
+            ):
+                seen.append(node.func.id)
+                pending.append(node.func.id)
+    return seen
+
+
+def _string_value(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value if isinstance(part, ast.Constant) else _FIELD for part in node.values
+        )
+    return None
+
+
+def _is_static(text: str) -> bool:
+    return _FIELD not in text and not re.search(r"[\[\]{}]", text)
+
+
+def extract_utterances(
+    path: str = NODES_PATH, factories: Optional[List[str]] = None
+) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Static utterances per factory.
+
+    Returns:
+        Factory name -> [(kind, text)], kind being "say" (LLM task) or "tts_say"
+    """
+    with open(path) as f:
+        definitions = _factories(ast.parse(f.read()))
+    factories = factories if factories is not None else reachable_factories(path)
+
+    utterances = {}
+    for name in factories:
+        found = []
+        for node in ast.walk(definitions[name]):
+            if isinstance(node, ast.Dict):
+                fields = {
+                    key.value: value
+                    for key, value in zip(node.keys, node.values)
+                    if isinstance(key, ast.Constant)
+                }
+                action_type = fields.get("type")
+                text = _string_value(fields["text"]) if "text" in fields else None
+                if (
+                    isinstance(action_type, ast.Constant)
+                    and action_type.value == "tts_say"
+                    and text
+                    and _FIELD not in text
+                ):
+                    found.append(("tts_say", text))
+                continue
+            text = _string_value(node)
+            if text is None:
+                continue
+            for match in _SPOKEN_QUOTE.finditer(text):
+                if _is_static(match["text"]):
+                    found.append(("say", match["text"]))
+        if found:
+            utterances[name] = found
+    return utterances
+
+
+def cache_texts(kind: str, text: str) -> List[str]:
+    """The run_tts() inputs one utterance will produce."""
+    text = text.strip()
+    if not text:
+        return []
+    if kind == "tts_say":
+        return [text]
+    params = chunking_params() if chunking_params is not None else None
+    if params is None:
+        chunks = _SENTENCE_END.split(text)
+    else:
+        chunks = split_chunks(text, **params)
+    texts = [chunk for chunk in chunks if chunk]
+    # Only the last chunk can end the line; earlier clause chunks end without punctuation by design
+    if texts and texts[-1][-1] not in ".!?":
+        texts.append(f"{texts[-1]}.")
+    return texts
+
+
+def flow_texts(path: str = NODES_PATH) -> List[str]:
+    """Every text to pre-synthesize for the flow in path, without duplicates."""
+    texts = []
+    for found in extract_utterances(path).values():
+        for kind, text in found:
+            texts.extend(t for t in cache_texts(kind, text) if t not in texts)
+    return texts
+
+
+def default_voice() -> Optional[str]:
+    """The bot's voice: TTS_VOICE_ID in its main.py (T7), else CARTESIA_VOICE (T6)."""
+    try:
+        from main import TTS_VOICE_ID
+    except ImportError:
+        return os.getenv("CARTESIA_VOICE")
+    return TTS_VOICE_ID
+
+
+async def presynthesize_flow(
+    voice_id: Optional[str] = None,
+    sample_rate: int = 24000,
+    path: str = NODES_PATH,
+) -> Dict[str, str]:
+    """Pre-synthesize the flow's static lines into the process phrase cache."""
+    from tts_cache import CachedCartesiaTTSService
+
+    api_key = os.getenv("CARTESIA_API_KEY")
+    if not api_key:
+        logger.warning("CARTESIA_API_KEY is not set, skipping pre-synthesis")
+        return {}
+    tts = CachedCartesiaTTSService(api_key=api_key, voice_id=voice_id or default_voice())
+    statuses = await tts.presynthesize(flow_texts(path), sample_rate=sample_rate)
+    counts = {status: list(statuses.values()).count(status) for status in set(statuses.values())}
+    logger.info(f"Pre-synthesis: {counts}")
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-synthesize the flow's static lines")
+    parser.add_argument("--voice", default=None, help="Cartesia voice (defaults to the bot's)")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be synthesized")
+    args = parser.parse_args()
+
+    utterances = extract_utterances()
+    statuses = {} if args.dry_run else asyncio.run(presynthesize_flow(args.voice, args.sample_rate))
+    print(f"{'factory':<34} | {'kind':<7} | {'status':<11} | text")
+    print("-" * 90)
+    for name in reachable_factories():
+        for kind, text in utterances.get(name, []):
+            for cache_text in cache_texts(kind, text):
+                print(f"{name:<34} | {kind:<7} | {statuses.get(cache_text, '-'):<11} | {cache_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+Persistent TTS phrase cache.
+
+A lot of what the bot says is fixed text: scripted closing lines, tts_say
+post-actions, short confirmations. CartesiaTTSService re-synthesizes every
+one of them on every call. The cache stores the PCM instead:
+
+- key: voice_id, model, language, speed, emotion, Sonic-3 generation
+  config (volume / speed / emotion), sample rate and the normalized text (Unicode NFC, whitespace collapsed; case and punctuation
+  are kept because they change the prosody)
+- an in-memory LRU bounded in bytes, over an on-disk store that is also
+  bounded in bytes and evicts the least recently used files (file mtime is
+  the recency, so it survives restarts)
+- hit / miss / fill / eviction counters for metrics
+
+CachedCartesiaTTSService serves hits without any network round trip,
+streamed in short chunks through the same ordered audio contexts the
+websocket path uses. Misses go to Cartesia as usual. A text that misses
+fill_after_misses times is synthesized once more in the background over
+Cartesia's HTTP endpoint and stored, so frequent lines warm up by
+themselves. presynthesize() fills a list of known lines up front, such as
+a flow's scripted lines at deploy time.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, List, Optional
+
+import aiohttp
+from loguru import logger
+
+from pipecat.frames.frames import Frame, TTSAudioRawFrame, TTSStartedFrame
+from pipecat.services.cartesia.tts import CartesiaTTSService
+
+CARTESIA_HTTP_URL = "https://api.cartesia.ai/tts/bytes"
+CARTESIA_HTTP_VERSION = "2025-04-16"
+
+# Audio of a hit is pushed in chunks of this length
+STREAM_CHUNK_SECS = 0.04
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def phrase_key(
+    text: str,
+    voice_id: str,
+    sample_rate: int,
+    model: str = "sonic-3",
+    language: str = "en",
+    speed: Optional[str] = None,
+    emotion: Optional[list] = None,
+    generation_config: Optional[dict] = None,
+) -> str:
+    """Cache key for one utterance with the settings that change its audio."""
+    fields = {
+        "text": normalize_text(text),
+        "voice": voice_id,
+        "rate": sample_rate,
+        "model": model,
+        "lang": language,
+        "speed": speed,
+        "emotion": emotion,
+    }
+    # Only when set, so keys of phrases cached without one stay valid
+    if generation_config:
+        fields["generation"] = generation_config
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class PhraseCache:
+    """
+    Memory LRU over a size-bounded directory of raw PCM files.
+
+    Args:
+        cache_dir: Directory of the on-disk store
+        max_memory_bytes: PCM kept in memory
+        max_disk_bytes: PCM kept on disk
+        fill_after_misses: Misses of one key before it is synthesized for the cache
+        max_chars: Longer texts are never cached (they are unlikely to repeat)
+        max_tracked_misses: Keys whose misses are counted; the least recently missed are forgotten
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        fill_after_misses: int = 2,
+        max_chars: int = 200,
+        max_tracked_misses: int = 4096,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.fill_after_misses = fill_after_misses
+        self.max_chars = max_chars
+        self.max_tracked_misses = max_tracked_misses
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.evictions = 0
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._miss_counts: "OrderedDict[str, int]" = OrderedDict()  # key -> misses, least recent first
+        self._filling: set = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pcm"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(text) <= self.max_chars
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """PCM for key from memory or disk, or None (counted as a miss)."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+            if key not in self._disk:
+                self.misses += 1
+                self._count_miss(key)
+                return None
+            self._disk.move_to_end(key)
+        # Off the event loop, like put()
+        return await asyncio.to_thread(self._read_disk, key)
+
+    def _count_miss(self, key: str):
+        self._miss_counts[key] = self._miss_counts.pop(key, 0) + 1
+        while len(self._miss_counts) > self.max_tracked_misses:
+            self._miss_counts.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def _remember(self, key: str, audio: bytes):
+        if key in self._memory:
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def put(self, key: str, audio: bytes):
+        """Store PCM in memory and on disk, evicting the oldest files over budget."""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, path)
+        with self._lock:
+            self._remember(key, audio)
+            self._disk_bytes += len(audio) - self._disk.pop(key, 0)
+            self._disk[key] = len(audio)
+            self._miss_counts.pop(key, None)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def contains(self, key: str) -> bool:
+        """True if key is cached (not counted as a lookup)."""
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def should_fill(self, key: str) -> bool:
+        """True once per key when it has missed often enough to be worth caching."""
+        with self._lock:
+            if key in self._filling or self._miss_counts.get(key, 0) < self.fill_after_misses:
+                return False
+            self._filling.add(key)
+            return True
+
+    def fill_done(self, key: str):
+        with self._lock:
+            self._filling.discard(key)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "fills": self.fills,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_mb": round(self._memory_bytes / 1e6, 2),
+                "disk_entries": len(self._disk),
+                "disk_mb": round(self._disk_bytes / 1e6, 2),
+            }
+
+
+async def synthesize_phrase(
+    session: aiohttp.ClientSession,
+    api_key: str,
+    text: str,
+    voice_id: str,
+    sample_rate: int,
+    model: str = "sonic-3",
+    language: str = "en",
+    speed: Optional[str] = None,
+    emotion: Optional[list] = None,
+    generation_config: Optional[dict] = None,
+    url: str = CARTESIA_HTTP_URL,
+) -> bytes:
+    """Raw 16-bit mono PCM for text from Cartesia's HTTP endpoint."""
+    voice = {"mode": "id", "id": voice_id}
+    if emotion:
+        voice["__experimental_controls"] = {"emotion": emotion}
+    payload = {
+        "model_id": model,
+        "transcript": normalize_text(text),
+        "voice": voice,
+        "output_format": {"container": "raw", "encoding": "pcm_s16le", "sample_rate": sample_rate},
+        "language": language,
+    }
+    if speed:
+        payload["speed"] = speed
+    if generation_config:
+        payload["generation_config"] = generation_config
+    headers = {
+        "Cartesia-Version": CARTESIA_HTTP_VERSION,
+        "X-API-Key": api_key,
+        "Content-Type": "application/json",
+    }
+    async with session.post(url, json=payload, headers=headers) as response:
+        if response.status != 200:
+            raise RuntimeError(f"Cartesia returned {response.status}: {await response.text()}")
+        return await response.read()
+
+
+class CachedCartesiaTTSService(CartesiaTTSService):
+    """
+    CartesiaTTSService that serves repeated phrases from a PhraseCache.
+
+    Args:
+        phrase_cache: Cache to use (defaults to the process one)
+        **kwargs: Passed to CartesiaTTSService
+    """
+
+    def __init__(self, *, phrase_cache: Optional[PhraseCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._phrase_cache = phrase_cache or get_tts_cache()
+        self._fill_session: Optional[aiohttp.ClientSession] = None
+        self._fill_tasks: set = set()
+
+    def phrase_key(self, text: str, sample_rate: Optional[int] = None) -> str:
+        return phrase_key(
+            text,
+            voice_id=self._voice_id,
+            sample_rate=sample_rate or self.sample_rate,
+            model=self.model_name,
+            language=self._settings["language"],
+            speed=self._settings["speed"],
+            emotion=self._settings["emotion"],
+            generation_config=self._generation_config(),
+        )
+
+    def _generation_config(self) -> Optional[dict]:
+        config = self._settings.get("generation_config")
+        return config.model_dump(exclude_none=True) if config else None
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        cache = self._phrase_cache
+        if not cache.cacheable(text):
+            async for frame in super().run_tts(text):
+                yield frame
+            return
+
+        key = self.phrase_key(text)
+        audio = await cache.get(key)
+        if audio is None:
+            if cache.should_fill(key):
+                self._fill_in_background(key, text)
+            async for frame in super().run_tts(text):
+                yield frame
+            return
+
+        logger.debug(f"{self}: Cached TTS [{text}]")
+        # Cached audio gets its own audio context. Close the streaming one
+        # first so contexts (and sentences) keep their order.
+        if self._context_id:
+            await self.flush_audio()
+        await self.start_ttfb_metrics()
+        yield TTSStartedFrame()
+        context_id = str(uuid.uuid4())
+        await self.create_audio_context(context_id)
+        await self.stop_ttfb_metrics()
+
+        # The whole phrase as one "word", so the assistant aggregator still
+        # receives its text
+        await self.start_word_timestamps()
+        await self.add_word_timestamps([(normalize_text(text), 0.0)])
+        chunk_bytes = int(self.sample_rate * STREAM_CHUNK_SECS) * 2
+        for offset in range(0, len(audio), chunk_bytes):
+            await self.append_to_audio_context(
+                context_id,
+                TTSAudioRawFrame(
+                    audio=audio[offset:offset + chunk_bytes],
+                    sample_rate=self.sample_rate,
+                    num_channels=1,
+                ),
+            )
+        await self.add_word_timestamps([("TTSStoppedFrame", 0), ("Reset", 0)])
+        await self.remove_audio_context(context_id)
+        yield None
+
+    def _fill_in_background(self, key: str, text: str):
+        task = asyncio.create_task(self._fill(key, text))
+        self._fill_tasks.add(task)
+        task.add_done_callback(self._fill_tasks.discard)
+
+    async def presynthesize(
+        self, texts: List[str], sample_rate: int, concurrency: int = 4
+    ) -> Dict[str, str]:
+        """
+        Synthesize the texts that are not cached yet, with this service's
+        voice and settings. Usable before the service is started.
+
+        Returns:
+            Each text's status: "cached", "synthesized" or "failed"
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def presynthesize_one(text: str) -> str:
+            key = self.phrase_key(text, sample_rate)
+            if self._phrase_cache.contains(key):
+                return "cached"
+            async with semaphore:
+                return "synthesized" if await self._fill(key, text, sample_rate) else "failed"
+
+        try:
+            statuses = await asyncio.gather(*(presynthesize_one(text) for text in texts))
+        finally:
+            if self._fill_session is not None:
+                await self._fill_session.close()
+                self._fill_session = None
+        return dict(zip(texts, statuses))
+
+    async def _fill(self, key: str, text: str, sample_rate: Optional[int] = None) -> bool:
+        try:
+            if self._fill_session is None:
+                self._fill_session = aiohttp.ClientSession()
+            audio = await synthesize_phrase(
+                self._fill_session,
+                self._api_key,
+                text,
+                voice_id=self._voice_id,
+                sample_rate=sample_rate or self.sample_rate,
+                model=self.model_name,
+                language=self._settings["language"],
+                speed=self._settings["speed"],
+                emotion=self._settings["emotion"],
+                generation_config=self._generation_config(),
+            )
+            await asyncio.to_thread(self._phrase_cache.put, key, audio)
+            self._phrase_cache.fills += 1
+            logger.debug(f"{self}: Cached [{text}] ({len(audio)} bytes)")
+            return True
+        except Exception as e:
+            logger.warning(f"{self}: Could not cache [{text}]: {e}")
+            return False
+        finally:
+            self._phrase_cache.fill_done(key)
+
+    async def _disconnect(self):
+        await super()._disconnect()
+        for task in list(self._fill_tasks):
+            task.cancel()
+        if self._fill_session is not None:
+            await self._fill_session.close()
+            self._fill_session = None
+
+
+_cache: Optional[PhraseCache] = None
+
+
+def get_tts_cache() -> PhraseCache:
+    """Process-wide phrase cache configured from TTS_CACHE_* variables."""
+    global _cache
+    if _cache is None:
+        _cache = PhraseCache(
+            # Next to the importing bot's link to this file (abspath keeps symlinks), so each bot has its own
+            cache_dir=os.getenv(
+                "TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache")
+            ),
+            max_memory_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", "32")) * 1024 * 1024),
+            max_disk_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", "256")) * 1024 * 1024),
+            fill_after_misses=int(os.getenv("TTS_CACHE_FILL_AFTER", "2")),
+            max_chars=int(os.getenv("TTS_CACHE_MAX_CHARS", "200")),
+            max_tracked_misses=int(os.getenv("TTS_CACHE_TRACKED_MISSES", "4096")),
+        )
+    return _cache
@@ -0,0 +1,17 @@
+"""
+The bots run from their own directories with flat imports, so the tests put
+T7 (which links the shared modules) and shared/ on the import path the same
+way. Run from the repository root:
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for directory in ("shared", "T7"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
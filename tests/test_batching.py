@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def submit_all(batcher, items):
+    """Submit items from one thread each, return (results, errors) by item."""
+    results, errors = {}, {}
+
+    def call(item):
+        try:
+            results[item] = batcher.submit(item)
+        except Exception as e:
+            errors[item] = e
+
+    threads = [threading.Thread(target=call, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads), "a caller was left waiting"
+    return results, errors
+
+
+def test_each_caller_gets_its_own_result():
+    batcher = MicroBatcher(lambda items: [item * 10 for item in items], max_batch=4, max_wait_ms=20)
+    results, errors = submit_all(batcher, range(10))
+    assert errors == {}
+    assert results == {item: item * 10 for item in range(10)}
+    stats = batcher.stats()
+    assert stats["items"] == 10
+    assert max(stats["batch_sizes"]) <= 4
+
+
+def test_failed_batch_fails_every_caller():
+    def run_batch(items):
+        raise ValueError("model failed")
+
+    results, errors = submit_all(MicroBatcher(run_batch, max_wait_ms=20), range(3))
+    assert results == {}
+    assert sorted(errors) == [0, 1, 2]
+    assert all(isinstance(e, ValueError) for e in errors.values())
+
+
+def test_wrong_result_count_fails_every_caller():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch=8, max_wait_ms=50)
+    results, errors = submit_all(batcher, range(3))
+    assert results == {}
+    assert sorted(errors) == [0, 1, 2]
+    assert all(isinstance(e, RuntimeError) for e in errors.values())
+
+
+def test_batcher_keeps_running_after_a_failure():
+    calls = []
+
+    def run_batch(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise ValueError("first batch fails")
+        return items
+
+    batcher = MicroBatcher(run_batch, max_batch=1)
+    with pytest.raises(ValueError):
+        batcher.submit("a")
+    assert batcher.submit("b") == "b"
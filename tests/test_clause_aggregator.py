@@ -0,0 +1,40 @@
+import asyncio
+
+from clause_aggregator import ClauseTextAggregator, split_chunks
+
+
+def test_first_chunk_cut_at_clause():
+    assert split_chunks("Yes, of course, I can help with that order right away.") == [
+        "Yes, of course,", "I can help with that order right away."
+    ]
+
+
+def test_first_chunk_needs_min_words_before_a_clause():
+    assert split_chunks("Sure, I can help with that. Anything else?") == [
+        "Sure, I can help with that.", "Anything else?"
+    ]
+
+
+def test_first_chunk_cut_before_conjunction():
+    assert split_chunks("Dr. Khan will call you back shortly and then confirm the booking.") == [
+        "Dr. Khan will call you back shortly", "and then confirm the booking."
+    ]
+
+
+def test_later_chunks_wait_for_min_words():
+    text = "Sure thing. Your burger is ready. It comes with fries and a drink of your choice today."
+    assert split_chunks(text) == [
+        "Sure thing.", "Your burger is ready. It comes with fries and a drink of your choice today."
+    ]
+
+
+def test_streamed_text_matches_whole_text():
+    text = "Yes, of course, I can help with that order right away. Anything else?"
+    aggregator = ClauseTextAggregator()
+    chunks = []
+    for i in range(0, len(text), 3):
+        chunks += aggregator.feed(text[i:i + 3])
+    rest = asyncio.run(aggregator.flush())
+    assert chunks + [rest.text] == split_chunks(text)
+    # flush starts the next reply from scratch
+    assert aggregator.feed("Hi, how are you today? ") == ["Hi, how are you today?"]
@@ -0,0 +1,77 @@
+from pipecat.processors.aggregators.llm_context import LLMContext
+
+from context_manager import ContextBudgetManager, ConversationSummary
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+def assistant(text):
+    return {"role": "assistant", "content": text}
+
+
+def test_summary_collects_items_address_and_phone():
+    summary = ConversationSummary()
+    summary.absorb(user("I want two large Zinger Burgers and a Pepsi."))
+    summary.absorb(user("Deliver to house 12, street 5. My number is 0300 1234567."))
+    assert summary.items == {"Zinger Burger": "2 Large Zinger Burger", "Pepsi": "1 Pepsi"}
+    assert summary.address == "Deliver to house 12, street 5"
+    assert summary.phone == "0300 1234567"
+    assert summary.turns == 2
+
+
+def test_summary_removes_items():
+    summary = ConversationSummary()
+    summary.absorb(user("Two Zinger Burgers with Fries and a Coke."))
+    summary.absorb(user("Actually no fries, and remove the Coke."))
+    assert summary.items == {"Zinger Burger": "2 Zinger Burger"}
+
+
+def test_restatement_replaces_the_order():
+    summary = ConversationSummary()
+    summary.absorb(user("A Patty Burger and Nuggets please."))
+    summary.absorb(assistant("To confirm, your order is one Patty Burger and a Tea."))
+    assert summary.items == {"Patty Burger": "1 Patty Burger", "Tea": "1 Tea"}
+
+
+def test_menu_listing_and_menu_questions_are_ignored():
+    summary = ConversationSummary()
+    summary.absorb(user("Do you have Chicken Fajita Pizza?"))
+    summary.absorb(assistant("We have Chicken Tikka Pizza, Zinger Burger and Fries."))
+    assert summary.items == {}
+    summary.absorb(user("Can I get a Chicken Fajita Pizza?"))
+    assert summary.items == {"Chicken Fajita Pizza": "1 Chicken Fajita Pizza"}
+
+
+def test_compaction_folds_old_turns_and_records_it():
+    messages = [{"role": "system", "content": "You take food orders."}]
+    for _ in range(4):
+        messages += [user("I want two Zinger Burgers please. " * 3), assistant("Added. " * 10)]
+    context = LLMContext(messages)
+    manager = ContextBudgetManager(budget_tokens=100, keep_messages=2)
+
+    manager.compact(context)
+    compacted = context.get_messages()
+    assert compacted[0] == messages[0]
+    assert compacted[1]["role"] == "system" and "2 Zinger Burger" in compacted[1]["content"]
+    assert compacted[2:] == messages[-2:]
+    assert manager.curve[-1]["compacted"] is True
+    assert manager.curve[-1]["sent_tokens"] < manager.curve[-1]["prompt_tokens"]
+
+    # Under budget now: nothing changes and the summary stays in place
+    manager.compact(context)
+    assert context.get_messages() == compacted
+    assert manager.curve[-1]["compacted"] is False
+
+
+def test_under_budget_context_is_untouched():
+    messages = [{"role": "system", "content": "You take food orders."}, user("Hi"), assistant("Hello!")]
+    context = LLMContext(list(messages))
+    manager = ContextBudgetManager(budget_tokens=1000)
+    manager.compact(context)
+    assert context.get_messages() == messages
+    assert manager.curve == [
+        {"turn": 1, "messages": 3, "prompt_tokens": manager.curve[0]["prompt_tokens"],
+         "sent_tokens": manager.curve[0]["prompt_tokens"], "compacted": False}
+    ]
@@ -0,0 +1,52 @@
+from intent_router import DEFAULT_MIN_CONFIDENCE, Intent, IntentClassifier
+
+INTENTS = [
+    Intent("place_order", ["order", "buy", "i want"]),
+    Intent("ask_info", ["menu", "see the menu", "opening hours"]),
+    Intent("check_status", ["order status", "where is my order"]),
+    Intent("make_reservation", ["book", "table", "reservation"],
+           arguments=lambda text: {"party": 2} if "two" in text else None),
+]
+
+
+def classifier():
+    return IntentClassifier(INTENTS)
+
+
+def test_single_keyword_routes_at_default_threshold():
+    match = classifier().classify("I'd like to order something")
+    assert match.function == "place_order"
+    assert match.confidence == DEFAULT_MIN_CONFIDENCE
+    assert classifier().routable(match)
+
+
+def test_longer_phrase_of_another_intent_absorbs_keyword():
+    scores = classifier().scores("what is my order status")
+    assert scores["check_status"] == 2
+    assert scores["place_order"] == 0
+    assert classifier().classify("what is my order status").function == "check_status"
+
+
+def test_keyword_inside_phrase_of_same_intent_counts_once():
+    assert classifier().scores("can I see the menu")["ask_info"] == 3
+
+
+def test_tie_does_not_route():
+    match = classifier().classify("can I buy from the menu")
+    assert match.confidence < DEFAULT_MIN_CONFIDENCE
+    assert not classifier().routable(match)
+
+
+def test_no_keywords():
+    match = classifier().classify("hello there")
+    assert match.function is None
+    assert match.confidence == 0.0
+    assert not classifier().routable(match)
+
+
+def test_missing_arguments_fall_back_to_llm():
+    match = classifier().classify("book a table")
+    assert match.function == "make_reservation"
+    assert match.arguments is None
+    assert not classifier().routable(match)
+    assert classifier().routable(classifier().classify("book a table for two"))
@@ -0,0 +1,61 @@
+import asyncio
+import io
+import wave
+
+from local_stt import SAMPLE_RATE, LocalSTTRouter
+
+
+class FakeWhisper:
+    def __init__(self, loaded=True, fail=False):
+        self.loaded = loaded
+        self.fail = fail
+        self.calls = 0
+
+    def transcribe(self, audio):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model failed")
+        return "one pepsi"
+
+
+def wav(secs):
+    out = io.BytesIO()
+    with wave.open(out, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(b"\0\0" * int(SAMPLE_RATE * secs))
+    return out.getvalue()
+
+
+def test_short_audio_is_transcribed_locally():
+    router = LocalSTTRouter(FakeWhisper(), max_secs=2.0)
+    assert asyncio.run(router.transcribe(wav(1.0))).text == "one pepsi"
+    assert router.local == 1
+
+
+def test_routes_on_speech_not_buffered_audio():
+    # 1 s of speech inside 3 s of audio (pre-roll and trailing silence included)
+    router = LocalSTTRouter(FakeWhisper(), max_secs=2.0)
+    assert asyncio.run(router.transcribe(wav(3.0), speech_secs=1.0)).text == "one pepsi"
+    assert asyncio.run(router.transcribe(wav(1.0), speech_secs=2.5)) is None
+    assert (router.local, router.remote) == (1, 1)
+
+
+def test_long_audio_goes_remote():
+    model = FakeWhisper()
+    router = LocalSTTRouter(model, max_secs=2.0)
+    assert asyncio.run(router.transcribe(wav(3.0))) is None
+    assert model.calls == 0
+    assert router.remote == 1
+
+
+def test_unloaded_model_goes_remote():
+    router = LocalSTTRouter(FakeWhisper(loaded=False), max_secs=2.0)
+    assert asyncio.run(router.transcribe(wav(0.5))) is None
+
+
+def test_model_error_falls_back_to_remote():
+    router = LocalSTTRouter(FakeWhisper(fail=True), max_secs=2.0)
+    assert asyncio.run(router.transcribe(wav(0.5))) is None
+    assert router.fallbacks == 1
@@ -0,0 +1,35 @@
+import pytest
+
+from presynth import cache_texts
+
+
+@pytest.fixture(autouse=True)
+def sentence_chunking(monkeypatch):
+    monkeypatch.delenv("TTS_CHUNKING", raising=False)
+
+
+def test_empty_text_has_nothing_to_cache():
+    assert cache_texts("say", "") == []
+    assert cache_texts("say", "   ") == []
+    assert cache_texts("tts_say", " ") == []
+
+
+def test_tts_say_is_spoken_whole():
+    assert cache_texts("tts_say", " One moment. Let me check. ") == ["One moment. Let me check."]
+
+
+def test_sentences_and_period_variant():
+    assert cache_texts("say", "Hello there. How can I help") == [
+        "Hello there.", "How can I help", "How can I help."
+    ]
+
+
+def test_no_period_variant_after_final_punctuation():
+    assert cache_texts("say", "Okay thanks!") == ["Okay thanks!"]
+
+
+def test_clause_chunks(monkeypatch):
+    monkeypatch.setenv("TTS_CHUNKING", "clause")
+    assert cache_texts("say", "Yes, of course, I can help with that order right away") == [
+        "Yes, of course,", "I can help with that order right away", "I can help with that order right away."
+    ]
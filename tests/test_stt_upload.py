@@ -0,0 +1,43 @@
+import io
+import wave
+
+from stt_upload import UploadPolicy, read_wav
+
+
+def wav(secs, rate=16000):
+    out = io.BytesIO()
+    with wave.open(out, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\0\0" * int(rate * secs))
+    return out.getvalue()
+
+
+def test_fixed_codec():
+    assert UploadPolicy(codec="flac").choose(3.0) == "flac"
+
+
+def test_auto_prefers_small_uploads_on_slow_links():
+    assert UploadPolicy(uplink_kbps=100).choose(3.0) == "opus"
+    assert UploadPolicy(uplink_kbps=1_000_000).choose(3.0) == "wav"
+
+
+def test_expected_time_grows_with_audio():
+    policy = UploadPolicy()
+    assert policy.expected_ms("wav", 2.0) > policy.expected_ms("wav", 1.0)
+
+
+def test_wav_request_is_sent_unchanged():
+    policy = UploadPolicy(codec="wav")
+    body = wav(1.0)
+    encoded = policy.encode(body)
+    assert encoded.data == body
+    assert (encoded.filename, encoded.codec, encoded.audio_secs) == ("audio.wav", "wav", 1.0)
+    assert policy.snapshot()["requests"]["wav"] == 1
+    assert policy.snapshot()["sent_ratio"] == 1.0
+
+
+def test_read_wav():
+    pcm, rate = read_wav(wav(0.5, rate=8000))
+    assert (len(pcm), rate) == (8000, 8000)
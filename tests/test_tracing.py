@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+import tracing
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    EndFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.observers.base_observer import FramePushed
+from pipecat.processors.frame_processor import FrameDirection
+
+
+class Clock:
+    """time.time_ns() stand-in: every push happens one millisecond after the last."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1_000_000
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tracing.time, "time_ns", clock)
+    return clock
+
+
+@pytest.fixture
+def tracer():
+    collector = tracing.InMemorySpanCollector()
+    processor = tracing.BatchSpanProcessor(collector, schedule_delay_secs=60)
+    observer = tracing.TurnTracingObserver(processor, session_id="pc-1")
+    observer.collector = collector
+    yield observer
+    processor.shutdown()
+
+
+def push(tracer, *frames):
+    for frame in frames:
+        asyncio.run(tracer.on_push_frame(FramePushed(None, None, frame, FrameDirection.DOWNSTREAM, 0)))
+
+
+def turns(tracer):
+    tracer.processor.force_flush()
+    return [span for span in tracer.collector.spans if span["name"] == "turn"]
+
+
+def user_turn(text="one pepsi"):
+    return [
+        VADUserStartedSpeakingFrame(),
+        UserStartedSpeakingFrame(),
+        VADUserStoppedSpeakingFrame(),
+        UserStoppedSpeakingFrame(),
+        TranscriptionFrame(text, "user", "now"),
+    ]
+
+
+def test_turn_spans_carry_session_and_stages(tracer, clock):
+    push(tracer, *user_turn(), LLMFullResponseStartFrame(), LLMFullResponseEndFrame(),
+         BotStartedSpeakingFrame(), BotStoppedSpeakingFrame(), EndFrame())
+    tracer.processor.force_flush()
+    spans = {span["name"]: span for span in tracer.collector.spans}
+    assert set(spans) == {"turn", "vad.endpointing", "stt", "llm"}
+    turn = spans["turn"]
+    assert turn["attributes"]["session.id"] == "pc-1"
+    assert all(span["trace_id"] == turn["trace_id"] for span in spans.values())
+    assert spans["stt"]["attributes"]["transcript.chars"] == len("one pepsi")
+    assert "turn.user_stop_to_bot_start_ms" in turn["attributes"]
+
+
+def test_turn_ends_at_the_last_bot_stop(tracer, clock):
+    # A filler line, then the answer: the turn lasts until the second stop
+    push(tracer, *user_turn(), BotStartedSpeakingFrame(), BotStoppedSpeakingFrame(),
+         BotStartedSpeakingFrame(), BotStoppedSpeakingFrame())
+    last_stop = clock.now
+    push(tracer, *user_turn("thanks"))
+    (turn,) = turns(tracer)
+    assert turn["status"] == "OK"
+    assert turn["end_time_unix_nano"] == last_stop
+
+
+def test_barge_in_interrupts_the_turn(tracer, clock):
+    push(tracer, *user_turn(), BotStartedSpeakingFrame())
+    push(tracer, VADUserStartedSpeakingFrame())
+    barge_in = clock.now
+    # The interrupted reply stops inside the new turn; it must not end it
+    push(tracer, BotStoppedSpeakingFrame(), UserStartedSpeakingFrame(), VADUserStoppedSpeakingFrame(),
+         UserStoppedSpeakingFrame(), BotStartedSpeakingFrame(), BotStoppedSpeakingFrame())
+    answer_stop = clock.now
+    push(tracer, EndFrame())
+    first, second = turns(tracer)
+    assert (first["status"], first["end_time_unix_nano"]) == ("INTERRUPTED", barge_in)
+    assert (second["status"], second["end_time_unix_nano"]) == ("OK", answer_stop)
+
+
+def test_pause_before_any_reply_keeps_the_turn(tracer, clock):
+    push(tracer, *user_turn(), VADUserStartedSpeakingFrame(), VADUserStoppedSpeakingFrame(), EndFrame())
+    assert len(turns(tracer)) == 1
+    assert tracer.turn_count == 1
+
+
+def test_each_frame_counts_once(tracer, clock):
+    frame = VADUserStartedSpeakingFrame()
+    push(tracer, frame, VADUserStoppedSpeakingFrame(), BotStartedSpeakingFrame(), BotStoppedSpeakingFrame())
+    # Later hops of the first frame are not a new turn
+    push(tracer, frame)
+    assert tracer.turn_count == 1
+
+
+def test_unsampled_turns_are_not_exported(tracer, clock):
+    tracer.sampler = tracing.TurnSampler(0.0)
+    push(tracer, *user_turn(), BotStartedSpeakingFrame(), BotStoppedSpeakingFrame(), EndFrame())
+    tracer.processor.force_flush()
+    assert tracer.collector.spans == []
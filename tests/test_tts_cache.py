@@ -0,0 +1,81 @@
+import asyncio
+
+from tts_cache import PhraseCache, normalize_text, phrase_key
+
+VOICE = "voice-1"
+
+
+def test_key_ignores_whitespace_differences():
+    assert normalize_text("  Hello,\n  world ") == "Hello, world"
+    assert phrase_key("Hello,  world", VOICE, 24000) == phrase_key(" Hello, world\n", VOICE, 24000)
+
+
+def test_key_changes_with_audio_settings():
+    base = phrase_key("Hello", VOICE, 24000)
+    assert phrase_key("Hello", VOICE, 16000) != base
+    assert phrase_key("Hello", "voice-2", 24000) != base
+    assert phrase_key("Hello", VOICE, 24000, speed="fast") != base
+    assert phrase_key("hello", VOICE, 24000) != base
+
+
+def test_generation_config_is_part_of_the_key():
+    base = phrase_key("Hello", VOICE, 24000)
+    slow = phrase_key("Hello", VOICE, 24000, generation_config={"speed": 0.8})
+    assert slow != base
+    assert slow != phrase_key("Hello", VOICE, 24000, generation_config={"speed": 1.2})
+    # Unset (or empty) keeps the keys of phrases cached before the setting existed
+    assert phrase_key("Hello", VOICE, 24000, generation_config=None) == base
+    assert phrase_key("Hello", VOICE, 24000, generation_config={}) == base
+
+
+def test_memory_and_disk_hits(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    key = phrase_key("Hello", VOICE, 24000)
+    assert asyncio.run(cache.get(key)) is None
+    cache.put(key, b"\x01\x02")
+    assert asyncio.run(cache.get(key)) == b"\x01\x02"
+    assert cache.memory_hits == 1
+
+    # A new process finds the file on disk
+    reopened = PhraseCache(str(tmp_path))
+    assert reopened.contains(key)
+    assert asyncio.run(reopened.get(key)) == b"\x01\x02"
+    assert reopened.disk_hits == 1
+    assert asyncio.run(reopened.get(key)) == b"\x01\x02"
+    assert reopened.memory_hits == 1
+
+
+def test_fill_after_repeated_misses(tmp_path):
+    cache = PhraseCache(str(tmp_path), fill_after_misses=2)
+    asyncio.run(cache.get("k"))
+    assert not cache.should_fill("k")
+    asyncio.run(cache.get("k"))
+    assert cache.should_fill("k")
+    # Only one fill at a time per key
+    assert not cache.should_fill("k")
+    cache.fill_done("k")
+
+
+def test_tracked_misses_are_bounded(tmp_path):
+    cache = PhraseCache(str(tmp_path), fill_after_misses=1, max_tracked_misses=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(cache.get(key))
+    assert not cache.should_fill("a")
+    assert cache.should_fill("c")
+
+
+def test_disk_budget_evicts_oldest(tmp_path):
+    cache = PhraseCache(str(tmp_path), max_disk_bytes=4)
+    cache.put("a", b"12")
+    cache.put("b", b"34")
+    cache.put("c", b"56")
+    assert not (tmp_path / "a.pcm").exists()
+    assert cache.contains("c")
+    assert cache.evictions == 1
+
+
+def test_cacheable_length(tmp_path):
+    cache = PhraseCache(str(tmp_path), max_chars=10)
+    assert cache.cacheable("Hello")
+    assert not cache.cacheable("")
+    assert not cache.cacheable("x" * 11)
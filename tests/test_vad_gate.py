@@ -0,0 +1,48 @@
+import numpy as np
+
+from vad_gate import EnergyGate
+
+WINDOW = 512
+
+
+def silence():
+    return np.zeros(WINDOW, dtype=np.float32)
+
+
+def voice():
+    return (0.3 * np.sin(np.arange(WINDOW) * 2 * np.pi * 200 / 16000)).astype(np.float32)
+
+
+def hiss(level=0.01):
+    return (level * np.where(np.arange(WINDOW) % 2, 1.0, -1.0)).astype(np.float32)
+
+
+def test_measure():
+    level_db, zcr = EnergyGate.measure(voice())
+    assert -15 < level_db < -10
+    assert zcr < 0.05
+    assert EnergyGate.measure(hiss())[1] > 0.9
+
+
+def test_starts_closed_and_skips_silence():
+    gate = EnergyGate()
+    assert gate.should_skip(silence())
+    assert gate.should_skip(hiss())
+
+
+def test_voice_opens_gate_until_hangover():
+    gate = EnergyGate(hangover_windows=3)
+    assert not gate.should_skip(voice())
+    assert [gate.should_skip(silence()) for _ in range(4)] == [False, False, True, True]
+
+
+def test_replay_keeps_last_skipped_windows():
+    gate = EnergyGate(hangover_windows=1, replay_windows=2)
+    windows = [silence() + i * 1e-6 for i in range(3)]
+    for window in windows:
+        assert gate.should_skip(window)
+    assert not gate.should_skip(voice())
+    replay = gate.take_replay()
+    assert [w[0] for w in replay] == [windows[1][0], windows[2][0]]
+    assert gate.take_replay() == []
+    assert gate.inferences == gate.windows - gate.skipped + 2